@@ -0,0 +1,208 @@
+"""Batch-convert recorded videos into landmark recordings.
+
+Every video becomes a recording (recording.py's format, one record per
+frame, timestamped in seconds from the start of the video) that the
+games can --replay and that loads with recording.load_recording():
+
+    python batch_landmarks.py sessions/ --kind pose --out landmarks/
+    python batch_landmarks.py a.mp4 b.mp4 --kind hands pose --workers 4
+
+Videos are shared out over a pool of worker processes, largest first,
+each worker building its MediaPipe graphs once and reusing them from one
+video to the next. A worker streams frames through one set of reusable
+buffers and writes records as it goes, so its memory does not grow with
+video length, and it is replaced after --videos-per-worker videos so
+what MediaPipe does accumulate is given back.
+
+A recording is written to `<output>.part` and renamed when its video is
+done. Run the same command again after an interruption: finished videos
+are skipped and partial ones carry on from their last whole record.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+from capture import FramePreprocessor, build_graph
+from frame_sources import VideoFileSource
+from perf import peak_rss_kb
+from recording import LandmarkRecorder
+from tracking_daemon import CombinedGraph
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")
+
+
+# ------------------ JOBS ------------------
+def find_videos(paths, out=None):
+    """(video, output) pairs for the files and directories in `paths`.
+
+    Directories are searched recursively. Recordings go next to their
+    video, or under `out`, keeping the layout below a directory argument.
+    """
+    jobs = []
+    for path in paths:
+        if os.path.isdir(path):
+            videos = sorted(os.path.join(folder, name)
+                            for folder, _, names in os.walk(path) for name in names
+                            if name.lower().endswith(VIDEO_EXTENSIONS))
+            root = path
+        else:
+            videos, root = [path], os.path.dirname(path)
+        for video in videos:
+            stem = os.path.splitext(video)[0]
+            if out is not None:
+                stem = os.path.join(out, os.path.relpath(stem, root))
+            jobs.append((video, os.path.normpath(stem + ".lmk")))
+    return jobs
+
+
+# ------------------ WORKER ------------------
+class VideoWorker:
+    """Runs one process's MediaPipe graphs over whole videos."""
+
+    def __init__(self, kinds, max_hands=2, mirror=True, inference_width=0, resume=True,
+                 **options):
+        self.graphs = [build_graph(kind, max_hands, **options) for kind in kinds]
+        self.graph = self.graphs[0] if len(self.graphs) == 1 else CombinedGraph(self.graphs)
+        self.max_hands = max_hands
+        self.mirror = mirror
+        self.resume = resume
+        self.prep = FramePreprocessor(inference_width)
+
+    def process(self, video, output):
+        """Write the recording for one video; return (frames, new frames)."""
+        source = VideoFileSource(video, realtime=False)
+        partial = output + ".part"
+        recorder = LandmarkRecorder(partial, self.max_hands, resume=self.resume)
+        start = recorder.count
+        try:
+            if start:
+                source.skip(start)
+            # Tracking state is per video.
+            for graph in self.graphs:
+                graph.reset()
+            index = start
+            while True:
+                raw = self.prep.read(source)
+                if raw is None:
+                    break
+                # Mirrored like the games' camera frames, so a recording
+                # replays the way a live session would have looked.
+                frame = self.prep.mirror(raw) if self.mirror else raw
+                recorder.write(index / source.fps, self.graph.process(self.prep.to_rgb(frame)))
+                index += 1
+        finally:
+            recorder.close()
+            # Read times of a file are decode times, not capture latency.
+            source.latencies.clear()
+            source.release()
+        os.replace(partial, output)
+        return index, index - start
+
+
+_worker = None
+
+
+def _start_worker(kinds, max_hands, mirror, inference_width, resume, options):
+    global _worker
+    _worker = VideoWorker(kinds, max_hands, mirror, inference_width, resume, **options)
+
+
+def _process(job):
+    video, output = job
+    start = time.perf_counter()
+    try:
+        frames, new = _worker.process(video, output)
+    except Exception as e:
+        return video, None, f"{type(e).__name__}: {e}"
+    return video, (frames, new, time.perf_counter() - start, peak_rss_kb()), None
+
+
+# ------------------ MAIN ------------------
+def main():
+    parser = argparse.ArgumentParser(description="Convert videos into landmark recordings "
+                                                 "on a pool of worker processes.")
+    parser.add_argument("videos", nargs="+",
+                        help="video files, or directories to search for them")
+    parser.add_argument("--out", metavar="DIR",
+                        help="write recordings under DIR (default: next to each video)")
+    parser.add_argument("--kind", nargs="+", choices=["hands", "pose"], default=["pose"],
+                        help="graphs to run on every frame (default pose)")
+    parser.add_argument("--max-hands", type=int, default=2, help="hands to track (default 2)")
+    parser.add_argument("--model-complexity", type=int, choices=[0, 1, 2], default=1,
+                        help="MediaPipe model complexity (default 1)")
+    parser.add_argument("--inference-width", type=int, default=0, metavar="PX",
+                        help="downscale frames to this width before inference")
+    parser.add_argument("--no-mirror", action="store_true",
+                        help="track the frames as recorded instead of mirrored like the games")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--videos-per-worker", type=int, default=20, metavar="N",
+                        help="replace each worker after N videos to bound its memory "
+                             "(default 20, 0 for never)")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="convert every video again instead of resuming")
+    args = parser.parse_args()
+    if args.model_complexity == 2 and "hands" in args.kind:
+        parser.error("hand tracking only has model complexity 0 and 1")
+
+    jobs = find_videos(args.videos, args.out)
+    seen = set()
+    for _, output in jobs:
+        if os.path.abspath(output) in seen:
+            parser.error(f"two videos would both be converted to {output}")
+        seen.add(os.path.abspath(output))
+    todo = [job for job in jobs if args.overwrite or not os.path.exists(job[1])]
+    print(f"{len(jobs)} videos, {len(jobs) - len(todo)} already converted", file=sys.stderr)
+    if not todo:
+        return
+    for _, output in todo:
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    # Longest first, so one long video is not left running on its own at the end.
+    todo.sort(key=lambda job: os.path.getsize(job[0]), reverse=True)
+
+    workers = max(1, min(args.workers, len(todo)))
+    options = {"model_complexity": args.model_complexity}
+    # "spawn": workers start from a clean interpreter rather than a copy
+    # of this one.
+    ctx = multiprocessing.get_context("spawn")
+    pool = ctx.Pool(workers, initializer=_start_worker,
+                    initargs=(args.kind, args.max_hands, not args.no_mirror,
+                              args.inference_width, not args.overwrite, options),
+                    maxtasksperchild=args.videos_per_worker or None)
+    start = time.perf_counter()
+    total = failed = 0
+    try:
+        for done, (video, stats, error) in enumerate(pool.imap_unordered(_process, todo), 1):
+            prefix = f"[{done}/{len(todo)}] {video}"
+            if error:
+                failed += 1
+                print(f"{prefix}: failed: {error}", file=sys.stderr)
+                continue
+            frames, new, seconds, rss_kb = stats
+            total += new
+            resumed = f", resumed at {frames - new}" if new < frames else ""
+            print(f"{prefix}: {frames} frames{resumed}, {new / max(seconds, 1e-9):.1f} fps, "
+                  f"worker peak RSS {rss_kb // 1024} MB", file=sys.stderr)
+    except BaseException as e:
+        # Stop the workers on any way out; their partial recordings stay
+        # for the next run to resume.
+        pool.terminate()
+        pool.join()
+        if isinstance(e, KeyboardInterrupt):
+            print("interrupted; run again to resume", file=sys.stderr)
+            sys.exit(130)
+        raise
+    pool.close()
+    pool.join()
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(todo) - failed} videos, {total} frames in {elapsed:.1f} s: "
+          f"{total / elapsed:.1f} frames/s on {workers} workers", file=sys.stderr)
+    if failed:
+        sys.exit(f"{failed} videos failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Headless frame-time benchmark for the games.
+
+Runs each game under SDL's dummy video and audio drivers, fed by a landmark
+recording (or a synthetic one generated here), and reports p50/p95/p99
+frame time, per-stage cost and peak RSS. The games run at a steady --fps
+(default 60, as in play), so they see the recording at its own rate and
+run their fixed simulation steps; frame time is each frame's own work,
+without the frame-cap sleep. Results are written as JSON so runs can be
+compared:
+
+    python bench.py --frames 600 --out before.json
+    python bench.py --frames 600 --out after.json --baseline before.json
+
+With --source the games run their whole capture and MediaPipe pipeline on
+recorded video (or an image directory, or synthetic frames) instead:
+
+    python bench.py --frames 300 --source "file:clip.mp4?loop=1"
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from landmarks import array_to_results
+from recording import LandmarkRecorder
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# name -> script and extra arguments
+TARGETS = {
+    "fruit-slicer": ["exercise.py", "--exercise", "0"],
+    "dodge-obstacles": ["exercise.py", "--exercise", "1"],
+    "circle-trace": ["exercise.py", "--exercise", "2"],
+    "speed-tapper": ["exercise.py", "--exercise", "3"],
+    "fruit-slicer-4p": ["exercise.py", "--exercise", "0", "--players", "4"],
+    "dino": ["game.py"],
+    "gesture": ["game1.py"],
+    "hand-mouse": ["test2.py", "--headless"],
+}
+
+# This loop blocks on the tracker, so it replays as fast as it can. The
+# others read results from a background worker and replay in real time.
+TRACKER_PACED = {"hand-mouse"}
+
+# These get a synthetic stream with this many hands (the rest get one).
+GROUP_HANDS = {"fruit-slicer-4p": 4}
+
+
+# ------------------ SYNTHETIC STREAM ------------------
+def synthetic_hand(t, size=0.15):
+    """21 hand landmarks for a wrist moving on a Lissajous path.
+
+    The hand points up, so it counts as raised in the upper half of the
+    frame, and the thumb pinches the index tip once every two seconds.
+    """
+    wx = 0.5 + 0.3 * math.sin(2 * math.pi * t / 4.0)
+    wy = 0.5 + 0.3 * math.sin(2 * math.pi * t / 3.0)
+    hand = np.zeros((21, 3), dtype=np.float32)
+    hand[0] = (wx, wy, 0.0)
+    for finger in range(4):
+        base = 5 + 4 * finger
+        fx = wx + (finger - 1.5) * 0.2 * size
+        for joint in range(4):
+            hand[base + joint] = (fx, wy - (0.4 + 0.2 * joint) * size, -0.01 * joint)
+    for joint in range(4):
+        hand[1 + joint] = (wx - (0.3 + 0.15 * joint) * size, wy - (0.2 + 0.15 * joint) * size, 0.0)
+    if (t % 2.0) < 0.3:
+        hand[4] = hand[8]
+    return hand
+
+
+def synthetic_pose(t):
+    """33 pose landmarks with the arms cycling through up/left/right/both."""
+    pose = np.zeros((33, 4), dtype=np.float32)
+    pose[:, :2] = 0.5
+    pose[:, 3] = 1.0
+    pose[0, :2] = (0.5, 0.25)
+    pose[11, :2] = (0.6, 0.4)   # left shoulder
+    pose[12, :2] = (0.4, 0.4)   # right shoulder
+    pose[23, :2] = (0.58, 0.7)  # left hip
+    pose[24, :2] = (0.42, 0.7)  # right hip
+    phase = int(t / 1.5) % 4
+    left_up = phase in (1, 3)
+    right_up = phase in (2, 3)
+    pose[13, :2] = (0.65, 0.3 if left_up else 0.5)
+    pose[14, :2] = (0.35, 0.3 if right_up else 0.5)
+    pose[15, :2] = (0.65, 0.2 if left_up else 0.6)
+    pose[16, :2] = (0.35, 0.2 if right_up else 0.6)
+    return pose
+
+
+def write_synthetic_recording(path, count, rate=30.0, hand_count=1):
+    """Write `count` synthetic hand + pose results sampled at `rate` Hz.
+
+    With several hands, each follows the same path a little later.
+    """
+    with LandmarkRecorder(path, max_hands=hand_count) as recorder:
+        for i in range(count):
+            t = i / rate
+            arr = np.stack([synthetic_hand(t + 0.8 * k) for k in range(hand_count)])
+            hands = array_to_results("hands", arr, hand_count)
+            pose = array_to_results("pose", synthetic_pose(t)[np.newaxis], 1)
+            recorder.write(t, SimpleNamespace(multi_hand_landmarks=hands.multi_hand_landmarks,
+                                              pose_landmarks=pose.pose_landmarks))
+
+
+# ------------------ RUNNER ------------------
+def run_target(name, recording, frames, timeout, source=None, fps=60):
+    """Run one game headlessly and return its stats report.
+
+    With a frame source URI the game runs its full camera pipeline
+    (MediaPipe included) on those frames instead of replaying landmarks.
+    """
+    script, *extra = TARGETS[name]
+    with tempfile.TemporaryDirectory() as tmp:
+        stats_path = os.path.join(tmp, "stats.json")
+        cmd = [sys.executable, script, *extra, "--max-frames", str(frames),
+               "--stats", stats_path]
+        if source:
+            cmd += ["--source", source]
+        else:
+            cmd += ["--replay", recording]
+            if name in TRACKER_PACED:
+                cmd.append("--replay-fast")
+        if name != "hand-mouse":
+            cmd += ["--fps", str(fps)]
+        env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+        proc = subprocess.run(cmd, cwd=HERE, env=env, capture_output=True,
+                              text=True, timeout=timeout)
+        if proc.returncode != 0 or not os.path.exists(stats_path):
+            return {"error": proc.stderr.strip().splitlines()[-5:]}
+        with open(stats_path) as f:
+            return json.load(f)
+
+
+def print_table(results, baseline=None):
+    print(f"{'target':<18}{'frames':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'RSS MB':>10}")
+    for name, report in results.items():
+        if "error" in report:
+            print(f"{name:<18}  FAILED: {' / '.join(report['error'])}")
+            continue
+        ft = report["frame_ms"]
+        row = f"{name:<18}{report['frames']:>8}"
+        for key in ("p50", "p95", "p99"):
+            row += f"{ft.get(key, float('nan')):>10.2f}"
+        row += f"{report['peak_rss_kb'] / 1024:>10.1f}"
+        old = (baseline or {}).get(name)
+        if old and "frame_ms" in old and "p95" in old["frame_ms"]:
+            row += f"   p95 {ft['p95'] - old['frame_ms']['p95']:+.2f} ms vs baseline"
+        print(row)
+        for stage, s in report["stages_ms"].items():
+            if s["count"]:
+                print(f"    {stage:<14}{s['count']:>8}{s['p50']:>10.3f}{s['p95']:>10.3f}{s['p99']:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless frame-time benchmark")
+    parser.add_argument("--recording", help="landmark recording to replay "
+                                            "(default: a synthetic stream)")
+    parser.add_argument("--frames", type=int, default=600, help="frames per target")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="frame rate the games run at (default 60)")
+    parser.add_argument("--only", nargs="+", choices=sorted(TARGETS),
+                        help="benchmark only these targets")
+    parser.add_argument("--source", metavar="URI",
+                        help="run the full tracking pipeline on this frame source, e.g. "
+                             "file:clip.mp4?loop=1 (default: replay landmarks)")
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="earlier results JSON to compare p95 against")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds per target")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        recordings = {}
+        for name in args.only or TARGETS:
+            hand_count = GROUP_HANDS.get(name, 1)
+            if args.recording:
+                recordings[hand_count] = os.path.abspath(args.recording)
+            elif hand_count not in recordings:
+                recordings[hand_count] = os.path.join(tmp, "synthetic-%d.lmk" % hand_count)
+                write_synthetic_recording(recordings[hand_count], args.frames + 30,
+                                          hand_count=hand_count)
+
+        results = {}
+        for name in args.only or TARGETS:
+            print(f"running {name}...", file=sys.stderr)
+            results[name] = run_target(name, recordings[GROUP_HANDS.get(name, 1)],
+                                       args.frames, args.timeout, args.source, args.fps)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "frames": args.frames,
+        "fps": args.fps,
+        "recording": args.recording or "synthetic",
+        "source": args.source,
+        "results": results,
+    }
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    print_table(results, baseline)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
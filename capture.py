@@ -0,0 +1,407 @@
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from frame_sources import open_source
+from startup import StartupReport
+
+# A single tracking result: the (mirrored, BGR) camera frame, the MediaPipe
+# results for it, the monotonic time it was produced, a sequence number
+# that increases with every published result, how long capture plus
+# inference took and the monotonic time the camera frame behind the
+# results was read (earlier than timestamp by the inference latency).
+Detection = namedtuple("Detection", ["frame", "results", "timestamp", "seq", "duration",
+                                     "frame_time"])
+
+
+# ------------------ LATEST-VALUE SLOT ------------------
+class LatestValue:
+    """Single-slot mailbox: writers overwrite, readers never block."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = None
+
+    def publish(self, value):
+        with self._lock:
+            self._value = value
+
+    def get(self):
+        with self._lock:
+            return self._value
+
+
+# ------------------ INPUT PREPROCESSING ------------------
+class FramePreprocessor:
+    """Mirror and color-convert camera frames into reusable buffers.
+
+    Every step writes into a preallocated array through OpenCV's dst=
+    argument, so a steady-state frame allocates nothing. Mirrored BGR
+    frames rotate through a small ring: a frame returned by mirror() stays
+    valid until `slots - 1` more frames have been mirrored, which lets the
+    game loop keep using the published frame while the next one is
+    captured. If inference_width is set, the RGB frame handed to MediaPipe
+    is downscaled to that width (keeping the aspect ratio); landmarks are
+    normalized, so nothing else changes.
+    """
+
+    def __init__(self, inference_width=0, slots=3):
+        self.inference_width = inference_width
+        self.slots = slots
+        self.raw = None
+        self._ring = None
+        self._next = 0
+        self._rgb = None
+        self._rgb_view = None
+
+    def _allocate(self, shape):
+        self._ring = np.empty((self.slots,) + tuple(shape), dtype=np.uint8)
+        self._next = 0
+        self._allocate_rgb(shape)
+
+    def _allocate_rgb(self, shape):
+        height, width = shape[:2]
+        if self.inference_width and self.inference_width < width:
+            height = max(1, round(height * self.inference_width / width))
+            width = self.inference_width
+        self._rgb = np.empty((height, width, 3), dtype=np.uint8)
+        self._rgb_view = self._rgb.view()
+        self._rgb_view.flags.writeable = False
+
+    def read(self, source):
+        """Read the next frame (from a FrameSource or cv2.VideoCapture) into the reusable buffer."""
+        ret, frame = source.read(self.raw)
+        if ret:
+            self.raw = frame
+        return frame if ret else None
+
+    def mirror(self, frame):
+        """Flip a BGR frame horizontally into the next ring slot."""
+        if self._ring is None or self._ring.shape[1:] != frame.shape:
+            self._allocate(frame.shape)
+        out = self._ring[self._next]
+        self._next = (self._next + 1) % self.slots
+        return cv2.flip(frame, 1, dst=out)
+
+    def to_rgb(self, frame, dst=None):
+        """Convert a mirrored BGR frame to the RGB inference input.
+
+        Writes into `dst` if given (it must already have the inference
+        shape), otherwise into an internal buffer returned as a read-only
+        view so MediaPipe can use it without copying.
+        """
+        if self._rgb is None:
+            self._allocate_rgb(frame.shape)
+        out = self._rgb if dst is None else dst
+        if out.shape != frame.shape:
+            cv2.resize(frame, (out.shape[1], out.shape[0]), dst=out,
+                       interpolation=cv2.INTER_LINEAR)
+            cv2.cvtColor(out, cv2.COLOR_BGR2RGB, dst=out)
+        else:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=out)
+        return self._rgb_view if dst is None else out
+
+    def set_inference_width(self, width):
+        """Change the inference width from the next frame on."""
+        if width != self.inference_width:
+            self.inference_width = width
+            self._rgb = None
+
+    def inference_shape(self, shape):
+        """Shape of the RGB inference input for frames of `shape`."""
+        if self._rgb is None or self._ring.shape[1:] != tuple(shape):
+            self._allocate(shape)
+        return self._rgb.shape
+
+
+# ------------------ TRACKERS ------------------
+class CameraTracker:
+    """Reads a frame source (the webcam by default) and runs a MediaPipe graph on every frame.
+
+    set_quality() switches to a quality.QualityLevel: a different model
+    complexity (rebuilding the graph with graph_factory), inference width,
+    or inference on only every Nth camera frame, where the frames in
+    between are read and dropped so the camera never falls behind. The
+    switch happens at the start of the next read(), on whichever thread
+    calls it. busy_time adds up the seconds spent in inference. `source`
+    is a frame_sources URI or an opened FrameSource.
+    """
+
+    def __init__(self, graph, source="camera:0", inference_width=0, graph_factory=None):
+        self.graph = graph
+        self.graph_factory = graph_factory
+        self.source = open_source(source) if isinstance(source, (str, int)) else source
+        self.prep = FramePreprocessor(inference_width)
+        # Monotonic time the frame behind the last results was captured.
+        self.frame_time = time.monotonic()
+        self.busy_time = 0.0
+        self.model_complexity = 1  # MediaPipe's default
+        self.infer_every = 1
+        self._frame_count = 0
+        self._pending = None
+
+    @property
+    def finished(self):
+        # Trackers set this once read() will never return anything again.
+        return self.source.finished
+
+    def set_quality(self, level):
+        self._pending = level
+
+    def _apply_quality(self, level):
+        if level.model_complexity != self.model_complexity and self.graph_factory:
+            try:
+                graph = self.graph_factory(level.model_complexity)
+            except (OSError, RuntimeError) as e:
+                # MediaPipe downloads some models on first use; without
+                # them, keep this graph and stop switching models.
+                print(f"keeping model_complexity {self.model_complexity}: {e}", file=sys.stderr)
+                self.graph_factory = None
+            else:
+                self.graph.close()
+                self.graph = graph
+                self.model_complexity = level.model_complexity
+        self.prep.set_inference_width(level.inference_width)
+        self.infer_every = level.infer_every
+
+    def warm_up(self):
+        """Run one inference on a blank frame of the inference size.
+
+        MediaPipe sets up its model on the first process() call; doing it
+        here keeps that out of the first real frame.
+        """
+        width, height = self.source.frame_size
+        width, height = width or 640, height or 480
+        rgb = np.zeros(self.prep.inference_shape((height, width, 3)), dtype=np.uint8)
+        start = time.perf_counter()
+        self.graph.process(rgb)
+        self.busy_time += time.perf_counter() - start
+
+    def read(self):
+        """Return (frame, results) for the next camera frame, or None."""
+        level, self._pending = self._pending, None
+        if level is not None:
+            self._apply_quality(level)
+        raw = self.prep.read(self.source)
+        if raw is None:
+            return None
+        self._frame_count += 1
+        if self._frame_count % self.infer_every:
+            return None
+        self.frame_time = self.source.frame_time
+        frame = self.prep.mirror(raw)
+        start = time.perf_counter()
+        results = self.graph.process(self.prep.to_rgb(frame))
+        self.busy_time += time.perf_counter() - start
+        return frame, results
+
+    def close(self):
+        self.source.release()
+        self.graph.close()
+
+
+def build_graph(kind, max_items=1, roi=False, **options):
+    """Construct a MediaPipe Hands or Pose graph.
+
+    With roi=True a single-hand graph is wrapped in roi.RoiHands, which
+    runs inference on a crop around the previous hand.
+    """
+    import mediapipe as mp
+    if kind == "hands":
+        graph = mp.solutions.hands.Hands(max_num_hands=max_items, **options)
+        if roi and max_items == 1:
+            from roi import RoiHands
+            crop_graph = mp.solutions.hands.Hands(max_num_hands=1, **options)
+            return RoiHands(graph, crop_graph)
+        return graph
+    return mp.solutions.pose.Pose(**options)
+
+
+def add_tracking_arguments(parser):
+    """Add the command-line options shared by the games."""
+    parser.add_argument("--source", default="camera:0", metavar="URI",
+                        help="where frames come from: camera:INDEX[?width=&height=&fps="
+                             "&fourcc=MJPG&buffersize=1], a video file (file:PATH"
+                             "[?loop=1&realtime=0]), an image directory (images:DIR"
+                             "[?fps=30]) or synthetic:[?width=&height=&fps=] "
+                             "(default camera:0)")
+    parser.add_argument("--inference", choices=["thread", "process"], default="thread",
+                        help="run MediaPipe on a background thread (default) or in a "
+                             "separate process fed through shared memory")
+    parser.add_argument("--inference-rate", type=float, default=0, metavar="HZ",
+                        help="cap how often inference runs to save CPU (default: as "
+                             "often as the camera delivers frames)")
+    parser.add_argument("--inference-width", type=int, default=0, metavar="PX",
+                        help="downscale frames to this width before inference "
+                             "(default: full camera resolution)")
+    parser.add_argument("--roi", action="store_true",
+                        help="single-hand games: run inference on a crop around the "
+                             "last hand, falling back to the full frame when it is lost")
+    parser.add_argument("--preview-rate", type=float, default=30, metavar="HZ",
+                        help="how often the camera preview refreshes (default 30, "
+                             "0 for every new frame)")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="play a landmark recording instead of using the camera")
+    parser.add_argument("--replay-fast", action="store_true",
+                        help="replay as fast as possible instead of in real time")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record every landmark result to PATH")
+    parser.add_argument("--connect", metavar="ADDRESS",
+                        help="take landmarks from a running tracking_daemon.py (its "
+                             "socket path or host:port) instead of opening the camera")
+
+
+def open_tracker(args, kind, max_items=1, report=None, **options):
+    """Create the tracker selected on the command line.
+
+    Camera and model setup are timed as stages of `report`, a
+    startup.StartupReport; the camera opens while the graph is built.
+    """
+    report = report or StartupReport()
+    if kind == "hands" and args.roi:
+        options["roi"] = True
+    if args.replay:
+        from recording import ReplayTracker
+        tracker = ReplayTracker(args.replay, realtime=not args.replay_fast)
+    elif args.connect:
+        from tracking_daemon import DaemonTracker
+        tracker = DaemonTracker(args.connect)
+    elif args.inference == "process":
+        from inference_process import ProcessTracker
+        tracker = ProcessTracker(kind, max_items, source=args.source,
+                                 inference_width=args.inference_width, **options)
+    else:
+        def graph_factory(model_complexity):
+            return build_graph(kind, max_items, model_complexity=model_complexity, **options)
+        def open_camera():
+            with report.stage("camera"):
+                return open_source(args.source)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            camera = pool.submit(open_camera)
+            try:
+                with report.stage("model"):
+                    graph = build_graph(kind, max_items, **options)
+            except BaseException:
+                if camera.exception() is None:
+                    camera.result().release()
+                raise
+            tracker = CameraTracker(graph, camera.result(),
+                                    inference_width=args.inference_width,
+                                    graph_factory=graph_factory)
+
+    if args.record:
+        from recording import LandmarkRecorder, RecordingTracker
+        tracker = RecordingTracker(tracker, LandmarkRecorder(args.record, max_items))
+    return tracker
+
+
+# ------------------ BACKGROUND WORKER ------------------
+class CaptureWorker(threading.Thread):
+    """Runs capture + inference off the game loop.
+
+    Only the newest result is kept; a result the game loop never looked at is
+    simply overwritten, so slow inference drops frames instead of queuing
+    them and the game loop never waits on the camera. A non-zero max_rate
+    caps how many results per second are produced.
+
+    `tracker` may also be a function that opens one. It then runs on this
+    thread, alongside loading the `preload` LazyModules and followed by
+    the tracker's warm_up(), so the window can paint while the camera and
+    model start; `ready` is set once it is done, and every phase is timed
+    in `report`. `finished` is set, and the worker exits, once the
+    tracker has nothing more to read (the end of a replay or video).
+    """
+
+    def __init__(self, tracker, max_rate=0, report=None, preload=()):
+        super().__init__(daemon=True)
+        self.opener = tracker if callable(tracker) else None
+        self.tracker = None if self.opener else tracker
+        self.min_interval = 1.0 / max_rate if max_rate else 0.0
+        self.report = report or StartupReport()
+        self._print_report = report is not None
+        self.preload = preload
+        self.slot = LatestValue()
+        self.ready = threading.Event()
+        self.finished = threading.Event()
+        self.error = None
+        self._running = threading.Event()
+        self._running.set()
+        self._seq = 0
+        if self.tracker is not None:
+            self.ready.set()
+
+    def _preload(self):
+        with self.report.stage("mediapipe"):
+            for module in self.preload:
+                module.load()
+
+    def _open(self):
+        try:
+            # The imports overlap with opening the camera; building the
+            # graph just waits for them.
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                loaded = pool.submit(self._preload)
+                tracker = self.opener()
+                loaded.result()
+            warm_up = getattr(tracker, "warm_up", None)
+            if warm_up is not None:
+                with self.report.stage("warm-up"):
+                    warm_up()
+        except Exception as e:
+            self.error = e
+            return False
+        if not self._running.is_set():  # stopped while opening
+            tracker.close()
+            return False
+        self.tracker = tracker
+        self.ready.set()
+        return True
+
+    def check(self):
+        """Re-raise the error that stopped the tracker from opening, if any."""
+        if self.error is not None:
+            raise self.error
+
+    def run(self):
+        if self.tracker is None and not self._open():
+            return
+        while self._running.is_set():
+            start = time.perf_counter()
+            waited = getattr(self.tracker, "wait_time", 0.0)
+            item = self.tracker.read()
+            if item is None:
+                if self.tracker.finished:
+                    self.finished.set()
+                    break
+                time.sleep(0.001)
+                continue
+            frame, results = item
+            self._seq += 1
+            if self._seq == 1:
+                self.report.mark("first frame")
+                if self._print_report:
+                    self.report.print()
+            elapsed = time.perf_counter() - start
+            # Replays sleep in read() to keep their pace; that is not work.
+            duration = elapsed - (getattr(self.tracker, "wait_time", 0.0) - waited)
+            self.slot.publish(Detection(frame, results, time.monotonic(), self._seq, duration,
+                                        self.tracker.frame_time))
+            if elapsed < self.min_interval:
+                time.sleep(self.min_interval - elapsed)
+
+    def latest(self):
+        """Return the newest Detection, or None before the first result."""
+        return self.slot.get()
+
+    def stop(self):
+        """Stop the worker and release the tracker."""
+        self._running.clear()
+        if self.is_alive():
+            self.join(timeout=1.0)
+        if self.tracker is not None:
+            self.tracker.close()
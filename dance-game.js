@@ -31,6 +31,9 @@ class DanceGame {
         this.poseDetector = null;
         this.currentPose = null;
         this.poseHistory = [];
+        // index.html?tracker=ws://localhost:8765 takes poses from
+        // tracking_daemon.py instead of running MediaPipe in the page
+        this.trackerUrl = new URLSearchParams(window.location.search).get('tracker');
         
         // Game timing
         this.bpm = 120;
@@ -47,6 +50,10 @@ class DanceGame {
     }
     
     async initPoseDetection() {
+        if (this.trackerUrl) {
+            this.connectTracker();
+            return;
+        }
         try {
             const pose = new Pose.Pose({
                 locateFile: (file) => {
@@ -83,6 +90,18 @@ class DanceGame {
         }
     }
     
+    connectTracker() {
+        // The daemon sends only its newest result, shaped like MediaPipe's
+        // onResults argument; reconnect if it restarts.
+        const socket = new WebSocket(this.trackerUrl);
+        socket.onmessage = (event) => {
+            this.currentPose = JSON.parse(event.data).poseLandmarks;
+        };
+        socket.onclose = () => {
+            setTimeout(() => this.connectTracker(), 1000);
+        };
+    }
+    
     generatePoseSequence() {
         // Generate a sequence of dance moves
         const poses = [
@@ -120,6 +139,7 @@ class DanceGame {
     }
     
     async startCamera() {
+        if (this.trackerUrl) return; // the tracking daemon owns the camera
         try {
             const stream = await navigator.mediaDevices.getUserMedia({
                 video: { width: 640, height: 480 },
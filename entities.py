@@ -0,0 +1,137 @@
+import numpy as np
+
+# Entity flag bits
+ALIVE = 1
+SLICED = 2
+
+
+# ------------------ SWEPT COLLISION ------------------
+def _contacts(x, y, radius, starts, ends):
+    """(circles, segments) mask of which segments pass through which circles."""
+    x = np.asarray(x, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float32)
+    radius = np.asarray(radius, dtype=np.float32)
+    ax, ay = starts[:, 0], starts[:, 1]
+    abx, aby = ends[:, 0] - ax, ends[:, 1] - ay
+    length2 = np.maximum(abx * abx + aby * aby, 1e-6)
+
+    # Offset of every circle centre from every segment start: (circles, segments)
+    apx = x[:, np.newaxis] - ax
+    apy = y[:, np.newaxis] - ay
+    t = np.clip((apx * abx + apy * aby) / length2, 0.0, 1.0)
+    dx = apx - t * abx
+    dy = apy - t * aby
+    return dx * dx + dy * dy < (radius * radius)[:, np.newaxis]
+
+
+def sweep_owners(x, y, radius, starts, ends, owners):
+    """Owner of the first segment touching each circle, or -1 for none.
+
+    starts and ends are (segments, 2) arrays and owners says whose path
+    (e.g. which player) each segment belongs to, so the paths of every
+    player are checked against every circle in the same single pass. A
+    zero-length segment is a point, for checking positions.
+    """
+    if len(starts) == 0:
+        return np.full(np.shape(x), -1)
+    contact = _contacts(x, y, radius, starts, ends)
+    first = contact.argmax(axis=1)
+    return np.where(contact.any(axis=1), np.asarray(owners)[first], -1)
+
+
+# ------------------ ENTITY POOL ------------------
+class EntityPool:
+    """Struct-of-arrays store for the moving circles in the mini-games.
+
+    Every entity is a slot in parallel NumPy columns; dead slots go on a
+    free list and are reused by spawn(). Movement, culling and collision
+    each run as one array operation over all live entities instead of a
+    Python loop over dicts. px/py hold the position before the last step,
+    so drawing can interpolate between simulation steps.
+    """
+
+    COLUMNS = ("x", "y", "px", "py", "vx", "vy", "size", "timer", "kind", "flags")
+
+    def __init__(self, capacity=32):
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.px = np.zeros(capacity, dtype=np.float32)
+        self.py = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.timer = np.zeros(capacity, dtype=np.float32)  # lifetime, slice frame, ...
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.flags = np.zeros(capacity, dtype=np.uint8)
+        self.free = list(range(capacity - 1, -1, -1))
+
+    def _grow(self):
+        old = len(self.x)
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate([column, np.zeros_like(column)]))
+        self.free.extend(range(2 * old - 1, old - 1, -1))
+
+    def spawn(self, x, y, vx=0, vy=0, size=0, kind=0, timer=0):
+        """Add an entity and return its slot index."""
+        if not self.free:
+            self._grow()
+        i = self.free.pop()
+        self.x[i], self.y[i], self.vx[i], self.vy[i] = x, y, vx, vy
+        self.px[i], self.py[i] = x, y
+        self.size[i], self.kind[i], self.timer[i] = size, kind, timer
+        self.flags[i] = ALIVE
+        return i
+
+    def kill(self, mask):
+        """Free every live entity selected by a boolean mask."""
+        dead = np.flatnonzero(mask & self.alive)
+        self.flags[dead] = 0
+        self.free.extend(dead.tolist())
+        return len(dead)
+
+    def clear(self):
+        self.flags[:] = 0
+        self.free = list(range(len(self.x) - 1, -1, -1))
+
+    @property
+    def alive(self):
+        return (self.flags & ALIVE) != 0
+
+    def has(self, flag):
+        """Mask of live entities with `flag` set."""
+        return (self.flags & (flag | ALIVE)) == (flag | ALIVE)
+
+    def indices(self):
+        """Slot indices of the live entities."""
+        return np.flatnonzero(self.alive)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive))
+
+    # ---------- batched updates ----------
+    def step(self, gravity=0.0):
+        """Move every live entity by its velocity, then apply gravity."""
+        alive = self.alive
+        self.px[alive] = self.x[alive]
+        self.py[alive] = self.y[alive]
+        self.x[alive] += self.vx[alive]
+        self.y[alive] += self.vy[alive]
+        if gravity:
+            self.vy[alive] += gravity
+
+    def positions(self, alpha):
+        """x and y of every slot, `alpha` of the way from the previous step."""
+        return (self.px + (self.x - self.px) * alpha,
+                self.py + (self.y - self.py) * alpha)
+
+    def outside(self, left, right, top, bottom):
+        """Mask of live entities outside the given bounds."""
+        return self.alive & ((self.x < left) | (self.x > right) |
+                             (self.y < top) | (self.y > bottom))
+
+    def swept_by(self, starts, ends, owners, margin=0.0):
+        """Per slot, the owner of the first segment touching it (-1 if none or dead)."""
+        owner = sweep_owners(self.x, self.y, self.size + margin, starts, ends, owners)
+        owner[~self.alive] = -1
+        return owner
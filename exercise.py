@@ -1,9 +1,36 @@
+# First, so the startup report's clock covers the imports below.
+from startup import LazyModule, StartupReport, draw_loading, wait_until_ready
+
 import pygame
-import mediapipe as mp
-import cv2
 import sys
+import argparse
 import random
 import math
+import time
+
+import numpy as np
+
+from capture import CaptureWorker, add_tracking_arguments, open_tracker
+from entities import SLICED, EntityPool, sweep_owners
+from filters import add_filter_arguments
+from landmarks import hand_frames
+from perf import FrameStats, add_benchmark_arguments
+from players import MAX_PLAYERS, HandPlayers
+from preview import PreviewCompositor
+from text_cache import render_text
+from timestep import SIM_RATE, FixedTimestep
+
+parser = argparse.ArgumentParser(description="One-Hand Exercise Game")
+add_tracking_arguments(parser)
+add_benchmark_arguments(parser)
+add_filter_arguments(parser)
+parser.add_argument("--exercise", type=int, choices=range(4),
+                    help="skip the menu and start this exercise (0-3)")
+parser.add_argument("--players", type=int, choices=range(1, MAX_PLAYERS + 1), default=1,
+                    help="players in front of the camera, one hand each (default 1)")
+args = parser.parse_args()
+startup = StartupReport()
+startup.mark("imports")
 
 pygame.init()
 
@@ -15,6 +42,7 @@ HEIGHT = 600
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 clock = pygame.time.Clock()
 pygame.display.set_caption("One-Hand Exercise Game")
+startup.mark("window")
 
 # ------------------ COLORS ------------------
 WHITE = (255, 255, 255)
@@ -27,6 +55,7 @@ PURPLE = (200, 50, 255)
 ORANGE = (255, 150, 50)
 PINK = (255, 100, 180)
 BG_COLOR = (240, 248, 255)
+PLAYER_COLORS = [BLUE, ORANGE, GREEN, PURPLE]
 
 # ------------------ FONTS ------------------
 font_huge = pygame.font.Font(None, 72)
@@ -38,26 +67,40 @@ font_small = pygame.font.Font(None, 24)
 current_exercise = 0
 exercises = ["Fruit Slicer", "Dodge Obstacles", "Circle Trace", "Speed Tapper"]
 score = 0
+player_scores = np.zeros(MAX_PLAYERS, dtype=np.int64)  # points each player earned
 timer = 45  # seconds per exercise
-frame_count = 0
+step_count = 0  # simulation steps since the exercise started
 game_state = "menu"  # menu, playing, complete
 
 # ------------------ MEDIAPIPE HAND ------------------
-mp_hands = mp.solutions.hands
-mp_drawing = mp.solutions.drawing_utils
-cap = cv2.VideoCapture(0)
-hands = mp_hands.Hands(max_num_hands=1,
+# MediaPipe, the camera and the model all load on the capture worker; the
+# menu is drawn meanwhile, with their progress in the camera panel.
+mp_hands = LazyModule("mediapipe.python.solutions.hands")
+mp_drawing = LazyModule("mediapipe.python.solutions.drawing_utils")
+
+def open_hand_tracker():
+    return open_tracker(args, "hands", max_items=args.players, report=startup,
                         min_detection_confidence=0.7,
                         min_tracking_confidence=0.7)
 
-# ------------------ SMOOTHING ------------------
-hand_smoothing_buffer = []
-smoothing_window = 5  # Number of frames to average
+# Capture and inference run on a background thread so the game loop keeps
+# its 60 FPS no matter how slow the camera or MediaPipe are.
+worker = CaptureWorker(open_hand_tracker, args.inference_rate, startup,
+                       preload=[mp_hands, mp_drawing])
+worker.start()
+
+# ------------------ PLAYERS ------------------
+# Tracking results arrive at the inference rate; each player's hand is
+# sampled at the moment each frame is shown (interpolating between the
+# last two results, or extrapolating past the newest) and the wrist is
+# smoothed from there, for all players in one batch.
+players = HandPlayers(args.players, GAME_WIDTH, HEIGHT, args.filter)
 
 # ------------------ EXERCISE 1: FRUIT SLICER ------------------
-fruits = []
+fruits = EntityPool()
 fruit_spawn_timer = 0
 slices = 0
+FRUIT_COLORS = [RED, ORANGE, GREEN]  # apple, orange, watermelon
 
 def spawn_fruit():
     """Spawn a fruit to slice."""
@@ -72,32 +115,26 @@ def spawn_fruit():
         x, y = random.randint(100, GAME_WIDTH - 100), HEIGHT
         vx, vy = random.randint(-3, 3), random.randint(-15, -10)
     
-    fruits.append({
-        'x': x, 'y': y, 'vx': vx, 'vy': vy,
-        'size': 40,
-        'type': random.choice(['apple', 'orange', 'watermelon']),
-        'sliced': False
-    })
-
-def check_slice(hand_x, hand_y, hand_trail):
-    """Check if hand slices any fruit."""
-    global fruits, score, slices
-    for fruit in fruits:
-        if not fruit['sliced']:
-            dist = math.sqrt((hand_x - fruit['x'])**2 + (hand_y - fruit['y'])**2)
-            if dist < fruit['size'] + 20:
-                fruit['sliced'] = True
-                score += 10
-                slices += 1
-                return True
-    return False
+    fruits.spawn(x, y, vx, vy, size=40, kind=random.randrange(len(FRUIT_COLORS)))
+
+def check_slice(segments):
+    """Check if the players' paths since the last check slice any fruit."""
+    global score, slices
+    owner = fruits.swept_by(*segments, margin=20)
+    hit = (owner >= 0) & ~fruits.has(SLICED)
+    count = int(hit.sum())
+    if count:
+        fruits.flags[hit] |= SLICED
+        fruits.timer[hit] = step_count  # step the fruit was sliced
+        score += 10 * count
+        slices += count
+        np.add.at(player_scores, owner[hit], 10)
+    return count > 0
 
 # ------------------ EXERCISE 2: DODGE OBSTACLES ------------------
-obstacles = []
+obstacles = EntityPool()
 obstacle_spawn_timer = 0
 dodges = 0
-player_x = GAME_WIDTH // 2
-player_y = HEIGHT // 2
 hits = 0
 
 def spawn_obstacle():
@@ -118,10 +155,7 @@ def spawn_obstacle():
         x, y = random.randint(50, GAME_WIDTH - 50), HEIGHT
         vx, vy = 0, -speed
     
-    obstacles.append({
-        'x': x, 'y': y, 'vx': vx, 'vy': vy,
-        'size': 40
-    })
+    obstacles.spawn(x, y, vx, vy, size=40)
 
 # ------------------ EXERCISE 3: CIRCLE TRACE ------------------
 circles = []
@@ -236,7 +270,7 @@ def generate_circles():
             circles.append({'x': int(x), 'y': int(y), 'size': 45, 'hit': False})
 
 # ------------------ EXERCISE 4: SPEED TAPPER ------------------
-tap_targets = []
+tap_targets = EntityPool(8)
 tap_timer = 0
 taps = 0
 
@@ -244,84 +278,93 @@ def spawn_tap_target():
     """Spawn a target to tap quickly."""
     x = random.randint(100, GAME_WIDTH - 100)
     y = random.randint(100, HEIGHT - 100)
-    tap_targets.append({
-        'x': x, 'y': y, 'size': 60,
-        'lifetime': 90  # 1.5 seconds to tap
-    })
+    tap_targets.spawn(x, y, size=60, timer=90)  # 1.5 seconds to tap
 
 # ------------------ DRAWING FUNCTIONS ------------------
 def draw_menu():
     """Draw main menu."""
-    title = font_huge.render("Exercise Game!", True, BLUE)
+    title = render_text(font_huge, "Exercise Game!", BLUE)
     screen.blit(title, (GAME_WIDTH//2 - title.get_width()//2, 100))
     
-    instruction = font_medium.render("Raise your hand to start!", True, BLACK)
+    instruction = render_text(font_medium, "Raise your hand to start!", BLACK)
     screen.blit(instruction, (GAME_WIDTH//2 - instruction.get_width()//2, 200))
     
     # Exercise list
     y_offset = 280
     for i, ex in enumerate(exercises):
         color = GREEN if i == current_exercise else BLACK
-        ex_text = font_small.render(f"{i+1}. {ex}", True, color)
+        ex_text = render_text(font_small, f"{i+1}. {ex}", color)
         screen.blit(ex_text, (GAME_WIDTH//2 - ex_text.get_width()//2, y_offset))
         y_offset += 35
 
 def draw_hud():
     """Draw heads-up display."""
     # Exercise name
-    ex_name = font_large.render(exercises[current_exercise], True, BLUE)
+    ex_name = render_text(font_large, exercises[current_exercise], BLUE)
     screen.blit(ex_name, (20, 20))
     
     # Score
-    score_text = font_medium.render(f"Score: {score}", True, GREEN)
+    score_text = render_text(font_medium, f"Score: {score}", GREEN)
     screen.blit(score_text, (20, 80))
     
     # Timer
-    time_remaining = max(0, timer - frame_count // 60)
-    timer_text = font_medium.render(f"Time: {time_remaining}s", True, RED if time_remaining < 10 else BLACK)
+    time_remaining = max(0, timer - step_count // SIM_RATE)
+    timer_text = render_text(font_medium, f"Time: {time_remaining}s", RED if time_remaining < 10 else BLACK)
     screen.blit(timer_text, (20, 120))
     
     # Exercise-specific stats
     if current_exercise == 0:
-        stat_text = font_small.render(f"Slices: {slices}", True, ORANGE)
+        stat_text = render_text(font_small, f"Slices: {slices}", ORANGE)
     elif current_exercise == 1:
-        stat_text = font_small.render(f"Hits: {hits} | Survived: {dodges}", True, RED)
+        stat_text = render_text(font_small, f"Hits: {hits} | Survived: {dodges}", RED)
     elif current_exercise == 2:
         shape_info = shape_patterns[current_shape]
-        stat_text = font_small.render(f"Shape: {shape_info['name']} | Progress: {traces}", True, shape_info['color'])
+        stat_text = render_text(font_small, f"Shape: {shape_info['name']} | Progress: {traces}", shape_info['color'])
         screen.blit(stat_text, (20, 160))
-        completion_text = font_small.render(f"{circle_index}/{len(circles)} points", True, PURPLE)
+        completion_text = render_text(font_small, f"{circle_index}/{len(circles)} points", PURPLE)
         stat_text = completion_text
     else:
-        stat_text = font_small.render(f"Taps: {taps}", True, PINK)
+        stat_text = render_text(font_small, f"Taps: {taps}", PINK)
     screen.blit(stat_text, (20, 190))
+    
+    # Points per player
+    if args.players > 1:
+        x_offset = 20
+        for p in range(args.players):
+            player_text = render_text(font_small, f"P{p+1}: {player_scores[p]}", PLAYER_COLORS[p])
+            screen.blit(player_text, (x_offset, 220))
+            x_offset += player_text.get_width() + 20
 
-def draw_fruits():
-    """Draw fruits to slice."""
-    for fruit in fruits:
-        if fruit['sliced']:
+def draw_fruits(alpha):
+    """Draw fruits to slice, `alpha` of a step past the last update."""
+    sliced = fruits.has(SLICED)
+    xs, ys = fruits.positions(alpha)
+    for i in fruits.indices():
+        x, y, size = int(xs[i]), int(ys[i]), int(fruits.size[i])
+        color = FRUIT_COLORS[fruits.kind[i]]
+        if sliced[i]:
             # Draw sliced fruit pieces
-            offset = (frame_count - fruit.get('slice_frame', frame_count)) * 3
-            color = {'apple': RED, 'orange': ORANGE, 'watermelon': GREEN}[fruit['type']]
-            pygame.draw.circle(screen, color, (int(fruit['x'] - offset), int(fruit['y'] - offset)), 20)
-            pygame.draw.circle(screen, color, (int(fruit['x'] + offset), int(fruit['y'] + offset)), 20)
+            offset = int(step_count - fruits.timer[i]) * 3
+            pygame.draw.circle(screen, color, (x - offset, y - offset), 20)
+            pygame.draw.circle(screen, color, (x + offset, y + offset), 20)
         else:
             # Draw whole fruit
-            color = {'apple': RED, 'orange': ORANGE, 'watermelon': GREEN}[fruit['type']]
-            pygame.draw.circle(screen, color, (int(fruit['x']), int(fruit['y'])), fruit['size'])
-            pygame.draw.circle(screen, WHITE, (int(fruit['x']), int(fruit['y'])), fruit['size'], 3)
+            pygame.draw.circle(screen, color, (x, y), size)
+            pygame.draw.circle(screen, WHITE, (x, y), size, 3)
 
-def draw_obstacles():
-    """Draw obstacles to dodge."""
-    for obs in obstacles:
+def draw_obstacles(alpha):
+    """Draw obstacles to dodge, `alpha` of a step past the last update."""
+    xs, ys = obstacles.positions(alpha)
+    for i in obstacles.indices():
+        x, y, size = int(xs[i]), int(ys[i]), int(obstacles.size[i])
         # Draw danger zone
-        pygame.draw.circle(screen, (255, 200, 200), (int(obs['x']), int(obs['y'])), obs['size'] + 10)
-        pygame.draw.circle(screen, RED, (int(obs['x']), int(obs['y'])), obs['size'])
-        pygame.draw.circle(screen, (150, 0, 0), (int(obs['x']), int(obs['y'])), obs['size'] // 2)
+        pygame.draw.circle(screen, (255, 200, 200), (x, y), size + 10)
+        pygame.draw.circle(screen, RED, (x, y), size)
+        pygame.draw.circle(screen, (150, 0, 0), (x, y), size // 2)
 
-def draw_player(x, y):
+def draw_player(x, y, color=BLUE):
     """Draw player."""
-    pygame.draw.circle(screen, BLUE, (int(x), int(y)), 25)
+    pygame.draw.circle(screen, color, (int(x), int(y)), 25)
     pygame.draw.circle(screen, WHITE, (int(x), int(y)), 25, 3)
     pygame.draw.circle(screen, BLACK, (int(x), int(y)), 5)
 
@@ -357,13 +400,13 @@ def draw_circles():
                            (circle['x'] + 10, circle['y'] - 10), 3)
         elif i == circle_index:
             # Current target - pulsing with number
-            pulse = 1 + 0.3 * math.sin(frame_count * 0.15)
+            pulse = 1 + 0.3 * math.sin(step_count * 0.15)
             size = int(circle['size'] * pulse)
             pygame.draw.circle(screen, YELLOW, (circle['x'], circle['y']), size)
             pygame.draw.circle(screen, shape_info['color'], (circle['x'], circle['y']), size, 5)
             # Draw arrow pointing to it
             arrow_offset = 80
-            arrow_angle = frame_count * 0.1
+            arrow_angle = step_count * 0.1
             arrow_x = circle['x'] + arrow_offset * math.cos(arrow_angle)
             arrow_y = circle['y'] + arrow_offset * math.sin(arrow_angle)
             pygame.draw.circle(screen, YELLOW, (int(arrow_x), int(arrow_y)), 8)
@@ -372,32 +415,41 @@ def draw_circles():
             pygame.draw.circle(screen, (200, 200, 200), (circle['x'], circle['y']), circle['size'])
             pygame.draw.circle(screen, BLACK, (circle['x'], circle['y']), circle['size'], 2)
             # Draw number
-            num_text = font_small.render(str(i + 1), True, BLACK)
+            num_text = render_text(font_small, str(i + 1), BLACK)
             screen.blit(num_text, (circle['x'] - num_text.get_width()//2, 
                                   circle['y'] - num_text.get_height()//2))
     
     # Draw shape name at top
-    shape_title = font_large.render(f"Trace: {shape_info['name']}", True, shape_info['color'])
+    shape_title = render_text(font_large, f"Trace: {shape_info['name']}", shape_info['color'])
     screen.blit(shape_title, (GAME_WIDTH//2 - shape_title.get_width()//2, 30))
 
 def draw_tap_targets():
     """Draw tap targets."""
-    for target in tap_targets:
-        life_ratio = target['lifetime'] / 90
+    for i in tap_targets.indices():
+        x, y, size = int(tap_targets.x[i]), int(tap_targets.y[i]), int(tap_targets.size[i])
+        life_ratio = float(tap_targets.timer[i]) / 90
         
         # Shrinking circle
-        current_size = int(target['size'] * life_ratio)
+        current_size = int(size * life_ratio)
         
         # Draw target
-        pygame.draw.circle(screen, PINK, (target['x'], target['y']), target['size'])
-        pygame.draw.circle(screen, WHITE, (target['x'], target['y']), current_size, 5)
+        pygame.draw.circle(screen, PINK, (x, y), size)
+        pygame.draw.circle(screen, WHITE, (x, y), current_size, 5)
         
         # Timer bar
         pygame.draw.arc(screen, RED, 
-                       (target['x'] - target['size'], target['y'] - target['size'],
-                        target['size'] * 2, target['size'] * 2),
+                       (x - size, y - size, size * 2, size * 2),
                        0, 2 * math.pi * life_ratio, 6)
 
+def draw_player_tags():
+    """Label each player's cursor when several are playing."""
+    if args.players == 1:
+        return
+    for p in players.indices():
+        x, y = players.cursor[p]
+        tag = render_text(font_small, f"P{p+1}", PLAYER_COLORS[p])
+        screen.blit(tag, (x - tag.get_width() // 2, y - 45))
+
 def draw_complete():
     """Draw completion screen."""
     overlay = pygame.Surface((GAME_WIDTH, HEIGHT))
@@ -405,25 +457,24 @@ def draw_complete():
     overlay.fill(WHITE)
     screen.blit(overlay, (0, 0))
     
-    complete_text = font_huge.render("Complete!", True, GREEN)
+    complete_text = render_text(font_huge, "Complete!", GREEN)
     screen.blit(complete_text, (GAME_WIDTH//2 - complete_text.get_width()//2, HEIGHT//2 - 150))
     
-    score_text = font_large.render(f"Score: {score}", True, BLUE)
+    score_text = render_text(font_large, f"Score: {score}", BLUE)
     screen.blit(score_text, (GAME_WIDTH//2 - score_text.get_width()//2, HEIGHT//2 - 50))
     
-    instruction = font_small.render("Raise hand to continue", True, BLACK)
+    instruction = render_text(font_small, "Raise hand to continue", BLACK)
     screen.blit(instruction, (GAME_WIDTH//2 - instruction.get_width()//2, HEIGHT//2 + 100))
 
 def reset_exercise():
     """Reset current exercise."""
-    global fruits, obstacles, circles, tap_targets, frame_count
+    global circles, step_count
     global slices, dodges, traces, taps, hits, circle_index, trace_progress
     global fruit_spawn_timer, obstacle_spawn_timer, tap_timer
-    global player_x, player_y
     
-    fruits = []
-    obstacles = []
-    tap_targets = []
+    fruits.clear()
+    obstacles.clear()
+    tap_targets.clear()
     slices = 0
     dodges = 0
     traces = 0
@@ -431,120 +482,40 @@ def reset_exercise():
     hits = 0
     circle_index = 0
     trace_progress = 0
-    frame_count = 0
+    step_count = 0
     fruit_spawn_timer = 0
     obstacle_spawn_timer = 0
     tap_timer = 0
-    player_x = GAME_WIDTH // 2
-    player_y = HEIGHT // 2
+    player_scores[:] = 0
     
     if current_exercise == 2:
         generate_circles()
 
-# ------------------ GAME LOOP ------------------
-hand_up_timer = 0
-hand_trail = []
-smoothed_hand_x = GAME_WIDTH // 2
-smoothed_hand_y = HEIGHT // 2
-
-while True:
-    # ---------- PROCESS CAMERA ----------
-    ret, frame = cap.read()
-    if not ret:
-        continue
-    
-    frame = cv2.flip(frame, 1)
-    frame_height, frame_width = frame.shape[:2]
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = hands.process(rgb)
-    
-    # Draw hand landmarks on frame
-    hand_detected = False
-    hand_x, hand_y = smoothed_hand_x, smoothed_hand_y  # Use smoothed values as default
-    hand_raised = False
-    
-    if results.multi_hand_landmarks:
-        hand_detected = True
-        hand_landmarks = results.multi_hand_landmarks[0]
-        
-        mp_drawing.draw_landmarks(
-            frame, 
-            hand_landmarks, 
-            mp_hands.HAND_CONNECTIONS,
-            mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=3),
-            mp_drawing.DrawingSpec(color=(0, 255, 255), thickness=2)
-        )
-        
-        # Get hand position
-        wrist = hand_landmarks.landmark[mp_hands.HandLandmark.WRIST]
-        middle_tip = hand_landmarks.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_TIP]
-        
-        # Convert to game coordinates (NO FLIP - direct mapping)
-        raw_x = int(wrist.x * GAME_WIDTH)
-        raw_y = int(wrist.y * HEIGHT)
-        
-        # Add to smoothing buffer
-        hand_smoothing_buffer.append((raw_x, raw_y))
-        if len(hand_smoothing_buffer) > smoothing_window:
-            hand_smoothing_buffer.pop(0)
-        
-        # Calculate smoothed position
-        if len(hand_smoothing_buffer) > 0:
-            avg_x = sum(pos[0] for pos in hand_smoothing_buffer) / len(hand_smoothing_buffer)
-            avg_y = sum(pos[1] for pos in hand_smoothing_buffer) / len(hand_smoothing_buffer)
-            
-            # Apply exponential smoothing for even smoother movement
-            alpha = 0.3  # Smoothing factor (0 = no change, 1 = instant change)
-            smoothed_hand_x = int(alpha * avg_x + (1 - alpha) * smoothed_hand_x)
-            smoothed_hand_y = int(alpha * avg_y + (1 - alpha) * smoothed_hand_y)
-        
-        hand_x = smoothed_hand_x
-        hand_y = smoothed_hand_y
-        
-        # Check if hand is raised
-        hand_raised = wrist.y < 0.5 and middle_tip.y < wrist.y
-        
-        # Track hand trail for slicing (use smoothed positions)
-        hand_trail.append((hand_x, hand_y))
-        if len(hand_trail) > 15:
-            hand_trail.pop(0)
-    else:
-        hand_trail = []
-        # Clear smoothing buffer when hand not detected
-        if len(hand_smoothing_buffer) > 0:
-            hand_smoothing_buffer = []
+# ------------------ SIMULATION STEP ------------------
+def update_game():
+    """Advance the game by one fixed 1/SIM_RATE s step."""
+    global game_state, current_exercise, score, step_count, hand_up_timer
+    global fruit_spawn_timer, obstacle_spawn_timer, tap_timer
+    global hits, dodges, traces, circle_index, taps
     
     if hand_raised:
         hand_up_timer += 1
     else:
         hand_up_timer = 0
     
-    # ---------- GAME EVENTS ----------
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            cap.release()
-            pygame.quit()
-            sys.exit()
-    
-    # ---------- GAME STATE MACHINE ----------
     if game_state == "menu":
-        screen.fill(BG_COLOR)
-        draw_menu()
-        
         if hand_up_timer > 30:  # ~0.5 seconds
             game_state = "playing"
             reset_exercise()
             hand_up_timer = 0
     
     elif game_state == "playing":
-        frame_count += 1
+        step_count += 1
         
         # Check timer
-        if frame_count >= timer * 60:
+        if step_count >= timer * SIM_RATE:
             game_state = "complete"
         
-        screen.fill(BG_COLOR)
-        
         # ---------- EXERCISE-SPECIFIC LOGIC ----------
         if current_exercise == 0:  # Fruit Slicer
             # Spawn fruits
@@ -554,109 +525,65 @@ while True:
                 fruit_spawn_timer = 0
             
             # Update fruits
-            for fruit in fruits[:]:
-                fruit['x'] += fruit['vx']
-                fruit['y'] += fruit['vy']
-                fruit['vy'] += 0.5  # gravity
-                
-                # Remove off-screen fruits
-                if (fruit['x'] < -100 or fruit['x'] > GAME_WIDTH + 100 or
-                    fruit['y'] > HEIGHT + 100):
-                    fruits.remove(fruit)
-                
-                # Mark slice frame
-                if fruit['sliced'] and 'slice_frame' not in fruit:
-                    fruit['slice_frame'] = frame_count
+            fruits.step(gravity=0.5)
             
-            # Check slices
-            if hand_detected:
-                check_slice(hand_x, hand_y, hand_trail)
-            
-            draw_fruits()
+            # Remove off-screen fruits
+            fruits.kill(fruits.outside(-100, GAME_WIDTH + 100, -math.inf, HEIGHT + 100))
             
-            # Draw hand trail
-            if len(hand_trail) > 1:
-                pygame.draw.lines(screen, YELLOW, False, hand_trail, 5)
-            
-            # Draw hand cursor
-            if hand_detected:
-                pygame.draw.circle(screen, ORANGE, (hand_x, hand_y), 15, 3)
+            # Check slices
+            if len(players):
+                check_slice(sweep_segments)
         
         elif current_exercise == 1:  # Dodge Obstacles
             # Spawn obstacles
             obstacle_spawn_timer += 1
-            spawn_rate = max(30, 60 - frame_count // 100)
+            spawn_rate = max(30, 60 - step_count // 100)
             if obstacle_spawn_timer > spawn_rate:
                 spawn_obstacle()
                 obstacle_spawn_timer = 0
             
-            # Update player position
-            if hand_detected:
-                player_x = hand_x
-                player_y = hand_y
-            
             # Update obstacles
-            for obs in obstacles[:]:
-                obs['x'] += obs['vx']
-                obs['y'] += obs['vy']
-                
-                # Check collision
-                dist = math.sqrt((player_x - obs['x'])**2 + (player_y - obs['y'])**2)
-                if dist < 25 + obs['size']:
-                    hits += 1
-                    obstacles.remove(obs)
-                    score = max(0, score - 5)
-                    continue
-                
-                # Remove off-screen
-                if (obs['x'] < -100 or obs['x'] > GAME_WIDTH + 100 or
-                    obs['y'] < -100 or obs['y'] > HEIGHT + 100):
-                    obstacles.remove(obs)
-                    dodges += 1
-                    score += 5
+            obstacles.step()
             
-            draw_obstacles()
-            draw_player(player_x, player_y)
+            # Check collision against every player at once
+            owner = obstacles.swept_by(*players.position_segments(), margin=25)
+            collided = obstacles.kill(owner >= 0)
+            hits += collided
+            score = max(0, score - 5 * collided)
+            np.subtract.at(player_scores, owner[owner >= 0], 5)
+            np.maximum(player_scores, 0, out=player_scores)
+            
+            # Remove off-screen
+            dodged = obstacles.kill(obstacles.outside(-100, GAME_WIDTH + 100, -100, HEIGHT + 100))
+            dodges += dodged
+            score += 5 * dodged
         
         elif current_exercise == 2:  # Circle Trace
-            if hand_detected and circle_index < len(circles):
+            # A fast stroke may pass several points in order between two
+            # tracking results, so keep advancing while any path hits them.
+            while len(players) and circle_index < len(circles):
                 current_circle = circles[circle_index]
-                dist = math.sqrt((hand_x - current_circle['x'])**2 + 
-                               (hand_y - current_circle['y'])**2)
+                owner = sweep_owners([current_circle['x']], [current_circle['y']],
+                                     [current_circle['size']], *sweep_segments)[0]
+                if owner < 0:
+                    break
                 
-                if dist < current_circle['size']:
-                    if not current_circle['hit']:
-                        current_circle['hit'] = True
-                        score += 15
-                    
-                    # Automatically advance to next circle
-                    circle_index += 1
-                    
-                    # Check if shape is complete
-                    if circle_index >= len(circles):
-                        score += 50  # Bonus for completing shape
-                        traces += 1
-                        # Generate new shape
-                        generate_circles()
-                        circle_index = 0
-            
-            draw_circles()
-            
-            # Draw hand cursor with trail
-            if len(hand_trail) > 1:
-                # Draw fading trail
-                for i in range(len(hand_trail) - 1):
-                    alpha = int(255 * (i + 1) / len(hand_trail))
-                    color = (*shape_patterns[current_shape]['color'][:3], alpha) if i > len(hand_trail) - 5 else (150, 150, 150)
-                    start = hand_trail[i]
-                    end = hand_trail[i + 1]
-                    pygame.draw.line(screen, shape_patterns[current_shape]['color'], start, end, 3)
-            
-            # Draw hand cursor
-            if hand_detected:
-                pygame.draw.circle(screen, shape_patterns[current_shape]['color'], (hand_x, hand_y), 20, 4)
-                pygame.draw.circle(screen, WHITE, (hand_x, hand_y), 12)
-                pygame.draw.circle(screen, shape_patterns[current_shape]['color'], (hand_x, hand_y), 5)
+                if not current_circle['hit']:
+                    current_circle['hit'] = True
+                    score += 15
+                    player_scores[owner] += 15
+                
+                # Automatically advance to next circle
+                circle_index += 1
+                
+                # Check if shape is complete
+                if circle_index >= len(circles):
+                    score += 50  # Bonus for completing shape
+                    traces += 1
+                    # Generate new shape
+                    generate_circles()
+                    circle_index = 0
+                    break
         
         elif current_exercise == 3:  # Speed Tapper
             # Spawn targets
@@ -666,69 +593,204 @@ while True:
                 tap_timer = 0
             
             # Update targets
-            for target in tap_targets[:]:
-                target['lifetime'] -= 1
-                
-                # Check tap
-                if hand_detected:
-                    dist = math.sqrt((hand_x - target['x'])**2 + 
-                                   (hand_y - target['y'])**2)
-                    if dist < target['size']:
-                        tap_targets.remove(target)
-                        score += 10
-                        taps += 1
-                        continue
+            tap_targets.timer[tap_targets.alive] -= 1
+            
+            # Check tap
+            if len(players):
+                owner = tap_targets.swept_by(*sweep_segments)
+                tapped = tap_targets.kill(owner >= 0)
+                score += 10 * tapped
+                taps += tapped
+                np.add.at(player_scores, owner[owner >= 0], 10)
+            
+            # Remove expired
+            tap_targets.kill(tap_targets.alive & (tap_targets.timer <= 0))
+    
+    elif game_state == "complete":
+        if hand_up_timer > 30:
+            current_exercise = (current_exercise + 1) % len(exercises)
+            game_state = "menu"
+            score = 0
+            player_scores[:] = 0
+            hand_up_timer = 0
+
+def draw_game(alpha):
+    """Draw the game area; moving objects are drawn `alpha` of a step on."""
+    screen.fill(BG_COLOR)
+    
+    if game_state == "menu":
+        draw_menu()
+    
+    elif game_state == "playing":
+        if current_exercise == 0:  # Fruit Slicer
+            draw_fruits(alpha)
+            
+            for p in players.indices():
+                # Draw hand trail
+                hand_trail = players.trail_points(p)
+                if len(hand_trail) > 1:
+                    pygame.draw.lines(screen, YELLOW, False, hand_trail, 5)
                 
-                # Remove expired
-                if target['lifetime'] <= 0:
-                    tap_targets.remove(target)
+                # Draw hand cursor
+                hand_x, hand_y = players.cursor[p]
+                pygame.draw.circle(screen, ORANGE, (hand_x, hand_y), 15, 3)
+        
+        elif current_exercise == 1:  # Dodge Obstacles
+            draw_obstacles(alpha)
+            for p in players.placed_indices():
+                draw_player(*players.cursor[p], PLAYER_COLORS[p])
+        
+        elif current_exercise == 2:  # Circle Trace
+            draw_circles()
             
+            for p in players.indices():
+                # Draw hand cursor with trail
+                hand_trail = players.trail_points(p)
+                if len(hand_trail) > 1:
+                    # Draw fading trail
+                    for i in range(len(hand_trail) - 1):
+                        fade = int(255 * (i + 1) / len(hand_trail))
+                        color = (*shape_patterns[current_shape]['color'][:3], fade) if i > len(hand_trail) - 5 else (150, 150, 150)
+                        start = hand_trail[i]
+                        end = hand_trail[i + 1]
+                        pygame.draw.line(screen, shape_patterns[current_shape]['color'], start, end, 3)
+                
+                # Draw hand cursor
+                hand_x, hand_y = players.cursor[p]
+                pygame.draw.circle(screen, shape_patterns[current_shape]['color'], (hand_x, hand_y), 20, 4)
+                pygame.draw.circle(screen, WHITE, (hand_x, hand_y), 12)
+                pygame.draw.circle(screen, shape_patterns[current_shape]['color'], (hand_x, hand_y), 5)
+        
+        elif current_exercise == 3:  # Speed Tapper
             draw_tap_targets()
             
             # Draw hand cursor
-            if hand_detected:
+            for p in players.indices():
+                hand_x, hand_y = players.cursor[p]
                 pygame.draw.circle(screen, PINK, (hand_x, hand_y), 20, 3)
                 pygame.draw.circle(screen, WHITE, (hand_x, hand_y), 15)
         
+        draw_player_tags()
         draw_hud()
     
     elif game_state == "complete":
-        screen.fill(BG_COLOR)
         draw_complete()
+
+# ------------------ GAME LOOP ------------------
+hand_up_timer = 0
+hand_raised = False
+# Every player's path since the last step, as segments, so fast swipes
+# between tracking results still hit what they pass over.
+sweep_segments = players.sweep_segments()
+last_seq = 0
+preview = PreviewCompositor((CAMERA_WIDTH, HEIGHT), args.preview_rate)
+status_bg = pygame.Surface((CAMERA_WIDTH - 20, 60)).convert()
+status_bg.set_alpha(200)
+status_bg.fill((0, 0, 0))
+stats = FrameStats.from_args(args)
+stats.startup = startup
+timestep = FixedTimestep()
+
+if args.exercise is not None:
+    # Straight into an exercise: its timer waits for tracking.
+    wait_until_ready(worker, screen, font_small, clock)
+    current_exercise = args.exercise
+    game_state = "playing"
+    reset_exercise()
+
+while stats.next_frame():
+    # ---------- PROCESS CAMERA ----------
+    # Only the newest result from the worker is used; when there is no new
+    # one this frame, the previous hand state carries over.
+    worker.check()
+    detection = worker.latest()
+    if detection is not None and detection.seq != last_seq:
+        last_seq = detection.seq
+        results = detection.results
+        stats.record("tracker", detection.duration)
         
-        if hand_up_timer > 30:
-            current_exercise = (current_exercise + 1) % len(exercises)
-            game_state = "menu"
-            score = 0
-            hand_up_timer = 0
+        # Refresh the camera preview; landmarks are drawn on the small copy
+        if preview.update(detection.frame) and results.multi_hand_landmarks:
+            for hand_landmarks in results.multi_hand_landmarks:
+                mp_drawing.draw_landmarks(
+                    preview.pixels, 
+                    hand_landmarks, 
+                    mp_hands.HAND_CONNECTIONS,
+                    mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=3),
+                    mp_drawing.DrawingSpec(color=(0, 255, 255), thickness=2)
+                )
+        
+        # Landmarks carry the time their frame was captured; each hand goes
+        # to the player it was nearest to last time
+        players.observe(hand_frames(results, detection.frame_time), detection.frame_time)
+    
+    # Every player's hand at the time this frame is shown
+    now = time.monotonic()
+    players.update(now, now + args.predict_ms / 1000.0)
+    hand_raised = bool(players.raised.any())
+    stats.lap("input")
+    
+    # ---------- GAME EVENTS ----------
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            worker.stop()
+            pygame.quit()
+            sys.exit()
+    
+    # ---------- SIMULATION ----------
+    # Fixed 1/60 s steps on the monotonic clock, however fast frames are
+    # drawn; the hand is checked against everything it passed since the
+    # last step.
+    steps = timestep.steps()
+    sweep_segments = players.sweep_segments()
+    for _ in range(steps):
+        update_game()
+    if steps:
+        players.clear_sweeps()
+    stats.lap("update")
+    
+    # ---------- DRAW GAME ----------
+    draw_game(timestep.alpha)
+    stats.lap("render")
     
     # ---------- DRAW CAMERA FEED ----------
-    camera_display = cv2.resize(frame, (CAMERA_WIDTH, HEIGHT))
-    camera_surface = pygame.surfarray.make_surface(camera_display.swapaxes(0, 1))
-    screen.blit(camera_surface, (GAME_WIDTH, 0))
+    if preview.has_frame:
+        screen.blit(preview.surface, (GAME_WIDTH, 0))
+    else:
+        pygame.draw.rect(screen, BLACK, (GAME_WIDTH, 0, CAMERA_WIDTH, HEIGHT))
+        if not worker.ready.is_set():
+            draw_loading(screen, pygame.Rect(GAME_WIDTH, 0, CAMERA_WIDTH, HEIGHT - 80),
+                         font_small, startup)
     
     # Draw border
     pygame.draw.rect(screen, BLACK, (GAME_WIDTH, 0, CAMERA_WIDTH, HEIGHT), 3)
     
     # Hand detection status
-    status_bg = pygame.Surface((CAMERA_WIDTH - 20, 60))
-    status_bg.set_alpha(200)
-    status_bg.fill((0, 0, 0))
     screen.blit(status_bg, (GAME_WIDTH + 10, HEIGHT - 70))
     
-    if hand_detected:
+    if len(players) and args.players > 1:
+        status_text = f"Players: {len(players)}/{args.players}"
+        color = (0, 255, 0) if hand_raised else (255, 255, 255)
+    elif len(players):
         status_text = "Hand Detected!"
         color = (0, 255, 0) if hand_raised else (255, 255, 255)
     else:
         status_text = "Show your hand"
         color = (255, 100, 100)
     
-    status = font_small.render(status_text, True, color)
+    status = render_text(font_small, status_text, color)
     screen.blit(status, (GAME_WIDTH + CAMERA_WIDTH//2 - status.get_width()//2, HEIGHT - 55))
     
     if hand_raised:
-        raised_text = font_small.render("RAISED!", True, (0, 255, 0))
+        raised_text = render_text(font_small, "RAISED!", (0, 255, 0))
         screen.blit(raised_text, (GAME_WIDTH + CAMERA_WIDTH//2 - raised_text.get_width()//2, HEIGHT - 30))
     
+    stats.lap("camera")
+    
     pygame.display.update()
-    clock.tick(60)
\ No newline at end of file
+    stats.lap("present")
+    stats.tick(clock, args.fps)
+
+stats.finish()
+worker.stop()
+pygame.quit()
\ No newline at end of file
@@ -0,0 +1,188 @@
+import math
+
+import numpy as np
+
+# Longest time predict() extrapolates past the last measurement. Beyond
+# this a constant-velocity guess overshoots more than it helps.
+MAX_HORIZON = 0.1
+
+
+# ------------------ ONE-EURO FILTER ------------------
+def _smoothing_factor(cutoff, dt):
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    """Speed-adaptive low-pass filter (Casiez et al., CHI 2012).
+
+    Cuts jitter hard while the input is nearly still and opens up as it
+    speeds up, so slow movements are smooth and fast ones lag little.
+    Works on arrays of any shape; every element is filtered on its own.
+    Defaults are tuned for normalized (0..1) landmark coordinates.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=20.0, d_cutoff=2.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self, index=None):
+        """Forget the estimate; with index, only those elements of it.
+
+        Reset elements are marked NaN and restart from their next
+        measurement, while the others keep filtering as before.
+        """
+        if index is not None and self.value is not None:
+            self.value[index] = np.nan
+            return
+        self.value = None
+        self.velocity = None
+        self.t = None
+
+    def update(self, measurement, t):
+        """Feed a measurement taken at time t (seconds); return the estimate."""
+        z = np.asarray(measurement, dtype=np.float64)
+        if self.value is None:
+            self.value = z.copy()
+            self.velocity = np.zeros_like(z)
+            self.t = t
+            return self.value
+        dt = t - self.t
+        if dt <= 0:
+            return self.value
+
+        restart = np.isnan(self.value)
+        self.velocity += _smoothing_factor(self.d_cutoff, dt) * ((z - self.value) / dt - self.velocity)
+        cutoff = self.min_cutoff + self.beta * np.abs(self.velocity)
+        self.value += _smoothing_factor(cutoff, dt) * (z - self.value)
+        if restart.any():
+            self.value[restart] = z[restart]
+            self.velocity[restart] = 0
+        self.t = t
+        return self.value
+
+    def predict(self, t):
+        """Estimate at time t, extrapolated along the smoothed velocity."""
+        if self.value is None:
+            return None
+        horizon = min(max(t - self.t, 0.0), MAX_HORIZON)
+        return self.value + self.velocity * horizon
+
+
+# ------------------ KALMAN FILTER ------------------
+class KalmanFilter:
+    """Constant-velocity Kalman filter, one independent axis per element.
+
+    State is position and velocity per element, with the 2x2 covariance
+    kept as three arrays so every axis updates in the same NumPy pass.
+    accel_noise is the white-noise acceleration density of the motion
+    model and measurement_noise the landmark jitter (standard deviation),
+    both in normalized units.
+    """
+
+    def __init__(self, accel_noise=1.0, measurement_noise=0.008):
+        self.q = accel_noise
+        self.r = measurement_noise ** 2
+        self.reset()
+
+    def reset(self, index=None):
+        """Forget the estimate; with index, only those elements (see OneEuroFilter)."""
+        if index is not None and self.value is not None:
+            self.value[index] = np.nan
+            return
+        self.value = None
+        self.velocity = None
+        self.t = None
+
+    def update(self, measurement, t):
+        """Feed a measurement taken at time t (seconds); return the estimate."""
+        z = np.asarray(measurement, dtype=np.float64)
+        if self.value is None:
+            self.value = z.copy()
+            self.velocity = np.zeros_like(z)
+            self.p00 = np.full_like(z, self.r)
+            self.p01 = np.zeros_like(z)
+            self.p11 = np.ones_like(z)
+            self.t = t
+            return self.value
+        dt = t - self.t
+        if dt <= 0:
+            return self.value
+
+        restart = np.isnan(self.value)
+        # Time update: x' = F x, P' = F P F^T + Q
+        self.value += self.velocity * dt
+        self.p00 += 2 * dt * self.p01 + dt * dt * self.p11 + self.q * dt ** 3 / 3
+        self.p01 += dt * self.p11 + self.q * dt ** 2 / 2
+        self.p11 += self.q * dt
+
+        # Measurement update (position only)
+        s = self.p00 + self.r
+        k0 = self.p00 / s
+        k1 = self.p01 / s
+        residual = z - self.value
+        self.value += k0 * residual
+        self.velocity += k1 * residual
+        self.p11 -= k1 * self.p01
+        self.p01 *= 1 - k0
+        self.p00 *= 1 - k0
+        if restart.any():
+            self.value[restart] = z[restart]
+            self.velocity[restart] = 0
+            self.p00[restart] = self.r
+            self.p01[restart] = 0
+            self.p11[restart] = 1
+        self.t = t
+        return self.value
+
+    def predict(self, t):
+        """Estimate at time t, extrapolated along the estimated velocity."""
+        if self.value is None:
+            return None
+        horizon = min(max(t - self.t, 0.0), MAX_HORIZON)
+        return self.value + self.velocity * horizon
+
+
+# ------------------ NO FILTER ------------------
+class PassThroughFilter:
+    """Raw measurements, for comparing against the real filters."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self, index=None):
+        if index is None:
+            self.value = None
+            self.t = None
+
+    def update(self, measurement, t):
+        self.value = np.asarray(measurement, dtype=np.float64)
+        self.t = t
+        return self.value
+
+    def predict(self, t):
+        return self.value
+
+
+FILTERS = {
+    "one-euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+    "none": PassThroughFilter,
+}
+
+
+def make_filter(name, **params):
+    """Construct a filter by its command-line name."""
+    return FILTERS[name](**params)
+
+
+def add_filter_arguments(parser, default="one-euro"):
+    """Add --filter and --predict-ms to a game's argument parser."""
+    parser.add_argument("--filter", choices=sorted(FILTERS), default=default,
+                        help="hand position filter (default %s)" % default)
+    parser.add_argument("--predict-ms", type=float, default=0, metavar="MS",
+                        help="extrapolate the hand this far past the frame time to hide "
+                             "display latency; negative values draw it in the past, "
+                             "interpolating between results (default 0)")
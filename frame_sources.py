@@ -0,0 +1,294 @@
+"""Frame sources: where camera frames come from, selected by URI.
+
+    camera:0?width=1280&height=720&fps=30&fourcc=MJPG&buffersize=1
+    camera:/dev/video2
+    file:clip.mp4?loop=1&realtime=0
+    images:frames/?fps=30&loop=1
+    synthetic:?width=640&height=480&fps=30
+
+A bare number is a camera index, a directory an image sequence and any
+other path a video file. Every source has cv2.VideoCapture's read() and
+release(), so FramePreprocessor reads them all the same way, and keeps
+the latency of its recent frames: how old each frame was when read()
+returned it.
+"""
+import glob
+import os
+import sys
+import time
+from collections import deque
+from urllib.parse import parse_qsl, urlsplit
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+LATENCY_HISTORY = 240  # frames kept for the latency report
+
+
+# ------------------ BASE ------------------
+class FrameSource:
+    """Pacing and latency bookkeeping shared by the backends.
+
+    Subclasses implement _grab(image), returning (ok, frame, captured):
+    `captured` is the monotonic time the frame was taken if the backend
+    knows it, else None, in which case the frame is taken to be as old
+    as the read itself. With realtime=True and a non-zero fps, frames
+    are paced like a camera would deliver them.
+    """
+
+    # Set once read() will never return another frame.
+    finished = False
+
+    def __init__(self, name, fps=0.0, realtime=True):
+        self.name = name
+        self.fps = fps
+        self.realtime = realtime
+        self.frame_size = (0, 0)
+        self.frame_time = time.monotonic()
+        self.latencies = deque(maxlen=LATENCY_HISTORY)
+        self._next_due = None
+
+    def _grab(self, image):
+        raise NotImplementedError
+
+    def read(self, image=None):
+        """Return (ok, frame), like cv2.VideoCapture.read()."""
+        if self.realtime and self.fps:
+            now = time.monotonic()
+            if self._next_due is None or now - self._next_due > 1.0:
+                self._next_due = now  # first frame, or fell far behind
+            elif self._next_due > now:
+                time.sleep(self._next_due - now)
+            self._next_due += 1.0 / self.fps
+        start = time.monotonic()
+        ok, frame, captured = self._grab(image)
+        if not ok:
+            return False, None
+        now = time.monotonic()
+        self.frame_time = captured if captured is not None else start
+        self.latencies.append(now - self.frame_time)
+        return True, frame
+
+    def latency_ms(self):
+        """p50 and p95 latency of recent frames in milliseconds, or None."""
+        if not self.latencies:
+            return None
+        p50, p95 = np.percentile(np.asarray(self.latencies) * 1000.0, [50, 95])
+        return round(float(p50), 2), round(float(p95), 2)
+
+    def describe(self):
+        width, height = self.frame_size
+        fps = f", {self.fps:g} fps" if self.fps else ""
+        return f"{self.name} ({width}x{height}{fps})"
+
+    def release(self):
+        latency = self.latency_ms()
+        if latency is not None:
+            print(f"capture {self.describe()}: latency p50 {latency[0]} ms, "
+                  f"p95 {latency[1]} ms", file=sys.stderr)
+
+
+# ------------------ CAMERA ------------------
+class CameraSource(FrameSource):
+    """A live camera, with the capture mode negotiated up front.
+
+    On Linux the V4L2 backend is used directly. FOURCC is set before the
+    resolution (V4L2 picks the modes of the current format), and
+    `buffersize` frames are queued in the driver; the default of 1 means
+    read() gets the newest frame rather than one that sat in a queue.
+    0 for width, height, fps or buffersize keeps the driver's choice.
+    Where the backend timestamps buffers (V4L2 does, on the monotonic
+    clock), latency is measured from that timestamp.
+    """
+
+    def __init__(self, device=0, width=0, height=0, fps=0.0, fourcc="", buffersize=1):
+        super().__init__(f"camera:{device}", realtime=False)
+        api = cv2.CAP_V4L2 if sys.platform.startswith("linux") else cv2.CAP_ANY
+        self.cap = cv2.VideoCapture(device, api)
+        if not self.cap.isOpened() and api != cv2.CAP_ANY:
+            self.cap = cv2.VideoCapture(device)
+        self.fourcc = ""
+        self.buffersize = 0
+        if not self.cap.isOpened():
+            # Like cv2.VideoCapture: no error here, read() just fails.
+            print(f"{self.name}: cannot open camera", file=sys.stderr)
+            return
+        if fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        if width:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if fps:
+            self.cap.set(cv2.CAP_PROP_FPS, fps)
+        if buffersize:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, buffersize)
+
+        # What the driver actually agreed to.
+        self.frame_size = (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                           int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        # Backends that cannot say report -1 or 0.
+        self.fps = max(0.0, self.cap.get(cv2.CAP_PROP_FPS))
+        code = int(self.cap.get(cv2.CAP_PROP_FOURCC))
+        self.fourcc = "".join(chr((code >> 8 * i) & 0xFF) for i in range(4)).strip("\0 ")
+        self.buffersize = max(0, int(self.cap.get(cv2.CAP_PROP_BUFFERSIZE)))
+        if fourcc and self.fourcc != fourcc:
+            print(f"{self.name}: asked for {fourcc}, got {self.fourcc or 'unknown'}",
+                  file=sys.stderr)
+        if (width and width != self.frame_size[0]) or (height and height != self.frame_size[1]):
+            print(f"{self.name}: asked for {width}x{height}, got "
+                  f"{self.frame_size[0]}x{self.frame_size[1]}", file=sys.stderr)
+
+    def _grab(self, image):
+        ok, frame = self.cap.read(image)
+        if not ok:
+            return False, None, None
+        # POS_MSEC is the buffer timestamp; only trust it if it reads as a
+        # plausible age on our clock.
+        stamp = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        age = time.monotonic() - stamp
+        return True, frame, stamp if 0.0 <= age < 1.0 else None
+
+    def describe(self):
+        width, height = self.frame_size
+        return (f"{self.name} ({width}x{height}, {self.fps:g} fps, "
+                f"{self.fourcc or 'default format'}, {self.buffersize or 'default'} buffers)")
+
+    def release(self):
+        super().release()
+        self.cap.release()
+
+
+# ------------------ FILES ------------------
+class VideoFileSource(FrameSource):
+    """A video file, paced at its own frame rate unless realtime=False."""
+
+    def __init__(self, path, loop=False, realtime=True):
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise OSError(f"cannot open video {path!r}")
+        super().__init__(f"file:{path}", self.cap.get(cv2.CAP_PROP_FPS) or 30.0, realtime)
+        self.loop = loop
+        self.frame_size = (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                           int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+
+    def _grab(self, image):
+        ok, frame = self.cap.read(image)
+        if not ok and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.cap.read(image)
+        if not ok:
+            self.finished = True
+        return ok, frame, None
+
+    def skip(self, count):
+        """Drop the next `count` frames; return how many there were."""
+        for skipped in range(count):
+            if not self.cap.grab():
+                self.finished = True
+                return skipped
+        return count
+
+    def release(self):
+        super().release()
+        self.cap.release()
+
+
+class ImageSequenceSource(FrameSource):
+    """The images in a directory, in name order, as frames."""
+
+    def __init__(self, directory, fps=30.0, loop=False, realtime=True):
+        super().__init__(f"images:{directory}", fps, realtime)
+        self.paths = sorted(path for path in glob.glob(os.path.join(directory, "*"))
+                            if path.lower().endswith(IMAGE_EXTENSIONS))
+        if not self.paths:
+            raise OSError(f"no images in {directory!r}")
+        self.loop = loop
+        self.index = 0
+        first = cv2.imread(self.paths[0])
+        if first is None:
+            raise OSError(f"cannot read {self.paths[0]!r}")
+        self.frame_size = (first.shape[1], first.shape[0])
+
+    def _grab(self, image):
+        if self.index >= len(self.paths):
+            if not self.loop:
+                self.finished = True
+                return False, None, None
+            self.index = 0
+        frame = cv2.imread(self.paths[self.index])
+        self.index += 1
+        if frame is None:
+            return False, None, None
+        if image is not None and image.shape == frame.shape:
+            image[:] = frame
+            frame = image
+        return True, frame, None
+
+
+class SyntheticSource(FrameSource):
+    """Generated frames (a ball circling over a gradient), for CI and profiling.
+
+    Deterministic: frame n always looks the same.
+    """
+
+    def __init__(self, width=640, height=480, fps=30.0, realtime=True):
+        super().__init__("synthetic", fps, realtime)
+        self.frame_size = (width, height)
+        ramp = np.linspace(40, 200, width, dtype=np.float32)
+        self._background = np.empty((height, width, 3), dtype=np.uint8)
+        self._background[:] = np.stack([ramp[::-1], np.full_like(ramp, 90), ramp], axis=1)
+        self.index = 0
+
+    def _grab(self, image):
+        height, width = self._background.shape[:2]
+        if image is None or image.shape != self._background.shape:
+            image = np.empty_like(self._background)
+        np.copyto(image, self._background)
+        angle = self.index * 2.0 * np.pi / 90.0
+        center = (int(width / 2 + width / 4 * np.cos(angle)),
+                  int(height / 2 + height / 4 * np.sin(angle)))
+        cv2.circle(image, center, max(4, height // 12), (255, 255, 255), -1)
+        cv2.putText(image, str(self.index), (10, height - 10), cv2.FONT_HERSHEY_SIMPLEX,
+                    0.8, (255, 255, 255), 2)
+        self.index += 1
+        return True, image, None
+
+
+# ------------------ URIS ------------------
+def _flag(value):
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+def open_source(uri):
+    """Open the frame source a URI (or bare camera index or path) names."""
+    uri = str(uri)
+    parts = urlsplit(uri)
+    scheme = parts.scheme
+    if len(scheme) <= 1:  # a plain path (or a Windows drive letter)
+        if uri.isdigit():
+            return CameraSource(int(uri))
+        scheme = "images" if os.path.isdir(uri) else "file"
+        parts = urlsplit(f"{scheme}:{uri}")
+    target = parts.path
+    params = dict(parse_qsl(parts.query))
+    realtime = _flag(params.get("realtime", "1"))
+    loop = _flag(params.get("loop", "0"))
+
+    if scheme == "camera":
+        device = int(target) if target.isdigit() else (target or 0)
+        return CameraSource(device, width=int(params.get("width", 0)),
+                            height=int(params.get("height", 0)),
+                            fps=float(params.get("fps", 0)),
+                            fourcc=params.get("fourcc", "").upper(),
+                            buffersize=int(params.get("buffersize", 1)))
+    if scheme == "file":
+        return VideoFileSource(target, loop=loop, realtime=realtime)
+    if scheme == "images":
+        return ImageSequenceSource(target, fps=float(params.get("fps", 30)), loop=loop,
+                                   realtime=realtime)
+    if scheme == "synthetic":
+        return SyntheticSource(int(params.get("width", 640)), int(params.get("height", 480)),
+                               fps=float(params.get("fps", 30)), realtime=realtime)
+    raise ValueError(f"unknown frame source {uri!r} (camera:, file:, images: or synthetic:)")
@@ -1,8 +1,27 @@
+# First, so the startup report's clock covers the imports below.
+from startup import LazyModule, StartupReport, wait_until_ready
+
 import pygame
-import mediapipe as mp
-import cv2
 import sys
+import argparse
 import random
+import time
+
+from capture import CaptureWorker, add_tracking_arguments, open_tracker
+from filters import add_filter_arguments, make_filter
+from landmarks import WRIST, hand_frames
+from perf import FrameStats, add_benchmark_arguments
+from preview import PreviewCompositor
+from text_cache import render_text
+from timestep import FixedTimestep, lerp
+
+parser = argparse.ArgumentParser(description="Hand Gesture Dino Game")
+add_tracking_arguments(parser)
+add_benchmark_arguments(parser)
+add_filter_arguments(parser)
+args = parser.parse_args()
+startup = StartupReport()
+startup.mark("imports")
 
 pygame.init()
 
@@ -14,6 +33,7 @@ HEIGHT = 400
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 clock = pygame.time.Clock()
 pygame.display.set_caption("Hand Gesture Dino Game")
+startup.mark("window")
 
 # ------------------ COLORS ------------------
 WHITE = (255, 255, 255)
@@ -35,6 +55,7 @@ ground_y = 300
 dino_w = 50
 dino_h = 50
 dino_y = ground_y
+prev_dino_y = dino_y  # before the last simulation step, for drawing
 velocity_y = 0
 gravity = 0.8
 jump_power = -16
@@ -43,7 +64,7 @@ is_jumping = False
 # ------------------ OBSTACLE ------------------
 obstacles = []
 obstacle_timer = 0
-obstacle_spawn_interval = 90  # frames between spawns
+obstacle_spawn_interval = 90  # simulation steps (1/60 s) between spawns
 min_spawn_interval = 40
 
 # ------------------ DAY/NIGHT CYCLE ------------------
@@ -60,90 +81,162 @@ base_speed = 6
 current_speed = base_speed
 
 # ------------------ MEDIAPIPE HAND ------------------
-mp_hands = mp.solutions.hands
-mp_drawing = mp.solutions.drawing_utils
-cap = cv2.VideoCapture(0)
-hands = mp_hands.Hands(max_num_hands=1,
+# MediaPipe, the camera and the model all load on the capture worker, so
+# the window is up (and the sprites below get painted) meanwhile.
+mp_hands = LazyModule("mediapipe.python.solutions.hands")
+mp_drawing = LazyModule("mediapipe.python.solutions.drawing_utils")
+
+def open_hand_tracker():
+    return open_tracker(args, "hands", max_items=1, report=startup,
                         min_detection_confidence=0.7,
                         min_tracking_confidence=0.7)
 
-# ------------------ DRAW FUNCTIONS ------------------
-def draw_dino(x, y):
-    """Draw a simple but better looking dino."""
-    color = (50, 150, 50) if not is_night else (100, 200, 100)
+# Capture and inference run on a background thread so the game loop keeps
+# its 60 FPS no matter how slow the camera or MediaPipe are.
+worker = CaptureWorker(open_hand_tracker, args.inference_rate, startup,
+                       preload=[mp_hands, mp_drawing])
+worker.start()
+
+# ------------------ SPRITE PAINTERS ------------------
+# These paint with pygame.draw primitives and only run once at startup to
+# fill the sprite atlas; the game loop just blits the results.
+SPRITE_KEY = (255, 0, 255)  # transparent colour key for sprites
+CACTUS_SIZES = [(w, h) for w in (30, 40) for h in (40, 50, 60)]
+CLOUD_POSITIONS = [(100, 80), (400, 50), (650, 90)]
+GROUND_TOP = ground_y + dino_h + 8  # first row of the ground strip
+
+def paint_dino(surface, x, y, night, leg_offset):
+    """Paint a simple but better looking dino."""
+    color = (50, 150, 50) if not night else (100, 200, 100)
     # Body
-    pygame.draw.rect(screen, color, (x, y, dino_w, dino_h))
+    pygame.draw.rect(surface, color, (x, y, dino_w, dino_h))
     # Head
-    pygame.draw.rect(screen, color, (x + dino_w - 15, y - 15, 25, 25))
+    pygame.draw.rect(surface, color, (x + dino_w - 15, y - 15, 25, 25))
     # Eye
-    eye_color = BLACK if not is_night else WHITE
-    pygame.draw.circle(screen, eye_color, (x + dino_w - 5, y - 8), 3)
+    eye_color = BLACK if not night else WHITE
+    pygame.draw.circle(surface, eye_color, (x + dino_w - 5, y - 8), 3)
     # Legs
-    leg_offset = 0 if is_jumping else (score // 5) % 2 * 5
-    pygame.draw.rect(screen, color, (x + 5, y + dino_h, 8, 10 + leg_offset))
-    pygame.draw.rect(screen, color, (x + dino_w - 13, y + dino_h, 8, 10 - leg_offset))
+    pygame.draw.rect(surface, color, (x + 5, y + dino_h, 8, 10 + leg_offset))
+    pygame.draw.rect(surface, color, (x + dino_w - 13, y + dino_h, 8, 10 - leg_offset))
 
-def draw_cactus(x, y, width, height):
-    """Draw a cactus obstacle."""
-    color = (34, 139, 34) if not is_night else (50, 100, 50)
-    detail_color = (50, 200, 50) if not is_night else (70, 130, 70)
+def paint_cactus(surface, x, y, width, height, night):
+    """Paint a cactus obstacle."""
+    color = (34, 139, 34) if not night else (50, 100, 50)
+    detail_color = (50, 200, 50) if not night else (70, 130, 70)
     # Main body
-    pygame.draw.rect(screen, color, (x, y, width, height))
+    pygame.draw.rect(surface, color, (x, y, width, height))
     # Arms
-    pygame.draw.rect(screen, color, (x - 8, y + 10, 8, 15))
-    pygame.draw.rect(screen, color, (x + width, y + 15, 8, 12))
+    pygame.draw.rect(surface, color, (x - 8, y + 10, 8, 15))
+    pygame.draw.rect(surface, color, (x + width, y + 15, 8, 12))
     # Details
     for i in range(3):
-        pygame.draw.line(screen, detail_color, 
+        pygame.draw.line(surface, detail_color, 
                         (x + width//2 - 2, y + 10 + i * 15),
                         (x + width//2 + 2, y + 10 + i * 15), 2)
 
+def paint_cloud(surface, x, cy, night):
+    """Paint one background cloud."""
+    cloud_color = WHITE if not night else (70, 70, 90)
+    pygame.draw.circle(surface, cloud_color, (x, cy), 20)
+    pygame.draw.circle(surface, cloud_color, (x + 25, cy), 25)
+    pygame.draw.circle(surface, cloud_color, (x + 50, cy), 20)
+    pygame.draw.ellipse(surface, cloud_color, (x - 10, cy + 10, 70, 30))
+
+def paint_moon(surface):
+    """Paint the moon for night mode."""
+    moon_x = GAME_WIDTH - 100
+    moon_y = 80
+    pygame.draw.circle(surface, MOON_COLOR, (moon_x, moon_y), 30)
+    # Moon craters
+    pygame.draw.circle(surface, (200, 200, 180), (moon_x - 8, moon_y - 5), 6)
+    pygame.draw.circle(surface, (200, 200, 180), (moon_x + 10, moon_y + 8), 4)
+
+def paint_ground(surface, y, night):
+    """Paint the ground line and one scroll period past the screen width of dashes."""
+    line_color = BLACK if not night else (200, 200, 200)
+    ground_line_color = (150, 150, 150) if not night else (100, 100, 100)
+    
+    pygame.draw.line(surface, line_color, (0, y), (surface.get_width(), y), 3)
+    for i in range(surface.get_width() // 40 + 1):
+        x = i * 40
+        pygame.draw.line(surface, ground_line_color, (x, y + 2), (x + 20, y + 2), 2)
+
+def sprite(width, height):
+    """Blank colour-keyed surface in the display's pixel format."""
+    surface = pygame.Surface((width, height)).convert()
+    surface.fill(SPRITE_KEY)
+    surface.set_colorkey(SPRITE_KEY, pygame.RLEACCEL)
+    return surface
+
+def build_atlas(night):
+    """Pre-render every sprite and background layer for one palette."""
+    sky_color = SKY_BLUE if not night else NIGHT_SKY
+    
+    # Sky layer, with the stars and moon baked in at night
+    sky = pygame.Surface((GAME_WIDTH, HEIGHT)).convert()
+    sky.fill(sky_color)
+    if night:
+        for star_x, star_y in stars:
+            pygame.draw.circle(sky, STAR_COLOR, (star_x, star_y), 1)
+        paint_moon(sky)
+    
+    # Dino: one frame per leg position (offset 0 when jumping, else 0 or 5)
+    dino = {}
+    for leg_offset in (0, 5):
+        dino[leg_offset] = sprite(dino_w + 10, dino_h + 30)
+        paint_dino(dino[leg_offset], 0, 15, night, leg_offset)
+    
+    cactus = {}
+    for width, height in CACTUS_SIZES:
+        # The lowest detail line pokes 2px below a 40px cactus
+        cactus[width, height] = sprite(width + 16, height + 2)
+        paint_cactus(cactus[width, height], 8, 0, width, height, night)
+    
+    cloud = sprite(90, 65)
+    paint_cloud(cloud, 20, 25, night)
+    
+    # Ground strip one dash period wider than the screen, so scrolling is
+    # just a different source rect
+    ground = pygame.Surface((GAME_WIDTH + 40, 8)).convert()
+    ground.fill(sky_color)
+    paint_ground(ground, ground_y + dino_h + 10 - GROUND_TOP, night)
+    
+    return {"sky": sky, "dino": dino, "cactus": cactus, "cloud": cloud, "ground": ground}
+
+ATLAS = {False: build_atlas(False), True: build_atlas(True)}
+
+# ------------------ DRAW FUNCTIONS ------------------
+def draw_sky():
+    """Draw the sky, plus stars and moon at night."""
+    screen.blit(ATLAS[is_night]["sky"], (0, 0))
+
+def draw_dino(x, y):
+    """Draw the dino frame for the current leg position."""
+    leg_offset = 0 if is_jumping else (score // 5) % 2 * 5
+    screen.blit(ATLAS[is_night]["dino"][leg_offset], (x, y - 15))
+
+def draw_cactus(x, y, width, height):
+    """Draw a cactus obstacle."""
+    screen.blit(ATLAS[is_night]["cactus"][width, height], (x - 8, y))
+
 def draw_ground():
     """Draw animated ground."""
-    line_color = BLACK if not is_night else (200, 200, 200)
-    ground_line_color = (150, 150, 150) if not is_night else (100, 100, 100)
-    
-    pygame.draw.line(screen, line_color, (0, ground_y + dino_h + 10), 
-                    (GAME_WIDTH, ground_y + dino_h + 10), 3)
-    # Moving ground lines
     offset = (score * 2) % 40
-    for i in range(-1, GAME_WIDTH // 40 + 1):
-        x = i * 40 - offset
-        pygame.draw.line(screen, ground_line_color, (x, ground_y + dino_h + 12),
-                        (x + 20, ground_y + dino_h + 12), 2)
+    screen.blit(ATLAS[is_night]["ground"], (0, GROUND_TOP), (offset, 0, GAME_WIDTH, 8))
 
 def draw_clouds():
     """Draw background clouds."""
-    cloud_positions = [(100, 80), (400, 50), (650, 90)]
     offset = (score // 2) % GAME_WIDTH
-    cloud_color = WHITE if not is_night else (70, 70, 90)
-    
-    for cx, cy in cloud_positions:
+    cloud = ATLAS[is_night]["cloud"]
+    for cx, cy in CLOUD_POSITIONS:
         x = (cx - offset) % GAME_WIDTH
-        # Simple cloud shape
-        pygame.draw.circle(screen, cloud_color, (x, cy), 20)
-        pygame.draw.circle(screen, cloud_color, (x + 25, cy), 25)
-        pygame.draw.circle(screen, cloud_color, (x + 50, cy), 20)
-        pygame.draw.ellipse(screen, cloud_color, (x - 10, cy + 10, 70, 30))
+        screen.blit(cloud, (x - 20, cy - 25))
 
 def draw_stars():
-    """Draw stars for night mode."""
+    """Twinkle a few stars on top of the pre-rendered night sky."""
     for star_x, star_y in stars:
-        brightness = (score % 30) / 30.0
         if random.random() > 0.98:  # Twinkling effect
-            size = 2
-        else:
-            size = 1
-        pygame.draw.circle(screen, STAR_COLOR, (star_x, star_y), size)
-
-def draw_moon():
-    """Draw moon for night mode."""
-    moon_x = GAME_WIDTH - 100
-    moon_y = 80
-    pygame.draw.circle(screen, MOON_COLOR, (moon_x, moon_y), 30)
-    # Moon craters
-    pygame.draw.circle(screen, (200, 200, 180), (moon_x - 8, moon_y - 5), 6)
-    pygame.draw.circle(screen, (200, 200, 180), (moon_x + 10, moon_y + 8), 4)
+            pygame.draw.circle(screen, STAR_COLOR, (star_x, star_y), 2)
 
 def jump():
     """Makes Dino jump."""
@@ -154,9 +247,10 @@ def jump():
 
 def reset_game():
     """Reset game state."""
-    global dino_y, velocity_y, is_jumping, obstacles, score, game_over
+    global dino_y, prev_dino_y, velocity_y, is_jumping, obstacles, score, game_over
     global obstacle_timer, current_speed, obstacle_spawn_interval, is_night, cycle_timer
     dino_y = ground_y
+    prev_dino_y = dino_y
     velocity_y = 0
     is_jumping = False
     obstacles = []
@@ -168,80 +262,15 @@ def reset_game():
     is_night = False
     cycle_timer = 0
 
-def show_game_over():
-    """Display game over screen."""
-    overlay = pygame.Surface((GAME_WIDTH, HEIGHT))
-    overlay.set_alpha(200)
-    overlay.fill(WHITE if not is_night else (40, 40, 60))
-    screen.blit(overlay, (0, 0))
-    
-    text_color = BLACK if not is_night else WHITE
-    game_over_text = font_large.render("GAME OVER!", True, text_color)
-    score_text = font_medium.render(f"Score: {score}", True, text_color)
-    high_score_text = font_medium.render(f"High Score: {high_score}", True, text_color)
-    restart_text = font_small.render("Raise your hand to restart", True, text_color)
-    
-    screen.blit(game_over_text, (GAME_WIDTH//2 - game_over_text.get_width()//2, HEIGHT//2 - 80))
-    screen.blit(score_text, (GAME_WIDTH//2 - score_text.get_width()//2, HEIGHT//2 - 20))
-    screen.blit(high_score_text, (GAME_WIDTH//2 - high_score_text.get_width()//2, HEIGHT//2 + 20))
-    screen.blit(restart_text, (GAME_WIDTH//2 - restart_text.get_width()//2, HEIGHT//2 + 70))
-
-# ------------------ GAME LOOP ------------------
-hand_up_frames = 0  # Debounce counter
-last_hand_up = False
-
-while True:
-    # ---------- PROCESS CAMERA ----------
-    ret, frame = cap.read()
-    if not ret:
-        continue
-        
-    frame = cv2.flip(frame, 1)
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = hands.process(rgb)
-    
-    
-    # Draw hand landmarks on frame
-    if results.multi_hand_landmarks:
-        for hand_landmarks in results.multi_hand_landmarks:
-            mp_drawing.draw_landmarks(
-                frame, 
-                hand_landmarks, 
-                mp_hands.HAND_CONNECTIONS,
-                mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
-                mp_drawing.DrawingSpec(color=(0, 255, 255), thickness=2)
-            )
-    
-    hand_up = False
-    if results.multi_hand_landmarks:
-        hand = results.multi_hand_landmarks[0]
-        wrist = hand.landmark[mp_hands.HandLandmark.WRIST]
-        
-        # Simplified: Hand is raised if wrist is in upper half of frame
-        if wrist.y < 0.5:
-            hand_up = True
-    
-    # Trigger jump/reset on hand raise (with debounce)
-    if hand_up and not last_hand_up:
-        if game_over:
-            reset_game()
-        else:
-            jump()
-    
-    last_hand_up = hand_up
+# ------------------ SIMULATION STEP ------------------
+def update_game():
+    """Advance the game by one fixed 1/60 s step."""
+    global dino_y, prev_dino_y, velocity_y, is_jumping, obstacles, score, game_over, high_score
+    global obstacle_timer, current_speed, obstacle_spawn_interval, is_night, cycle_timer
     
-    # ---------- GAME EVENTS ----------
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            cap.release()
-            pygame.quit()
-            sys.exit()
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_SPACE:
-                if game_over:
-                    reset_game()
-                else:
-                    jump()
+    prev_dino_y = dino_y
+    for obs in obstacles:
+        obs['prev_x'] = obs['x']
     
     if not game_over:
         # ---------- DAY/NIGHT CYCLE ----------
@@ -271,6 +300,7 @@ while True:
             obstacle_height = random.choice([40, 50, 60])
             obstacles.append({
                 'x': GAME_WIDTH,
+                'prev_x': GAME_WIDTH,
                 'y': ground_y + dino_h - obstacle_height + 10,
                 'width': random.choice([30, 40]),
                 'height': obstacle_height
@@ -291,33 +321,132 @@ while True:
             if dino_rect.colliderect(obs_rect):
                 game_over = True
                 high_score = max(high_score, score)
+
+def show_game_over():
+    """Display game over screen."""
+    overlay = pygame.Surface((GAME_WIDTH, HEIGHT))
+    overlay.set_alpha(200)
+    overlay.fill(WHITE if not is_night else (40, 40, 60))
+    screen.blit(overlay, (0, 0))
     
-    # ---------- DRAW EVERYTHING ----------
-    # Draw game area background
-    bg_color = SKY_BLUE if not is_night else NIGHT_SKY
-    pygame.draw.rect(screen, bg_color, (0, 0, GAME_WIDTH, HEIGHT))
+    text_color = BLACK if not is_night else WHITE
+    game_over_text = render_text(font_large, "GAME OVER!", text_color)
+    score_text = render_text(font_medium, f"Score: {score}", text_color)
+    high_score_text = render_text(font_medium, f"High Score: {high_score}", text_color)
+    restart_text = render_text(font_small, "Raise your hand to restart", text_color)
     
-    # Draw stars and moon if night
+    screen.blit(game_over_text, (GAME_WIDTH//2 - game_over_text.get_width()//2, HEIGHT//2 - 80))
+    screen.blit(score_text, (GAME_WIDTH//2 - score_text.get_width()//2, HEIGHT//2 - 20))
+    screen.blit(high_score_text, (GAME_WIDTH//2 - high_score_text.get_width()//2, HEIGHT//2 + 20))
+    screen.blit(restart_text, (GAME_WIDTH//2 - restart_text.get_width()//2, HEIGHT//2 + 70))
+
+# ------------------ GAME LOOP ------------------
+hand_up_frames = 0  # Debounce counter
+last_hand_up = False
+
+hand_up = False
+hand_present = False
+# Filtered wrist height; predicting it forward lets a fast raise trigger
+# the jump before the next tracking result arrives.
+wrist_filter = make_filter(args.filter)
+last_seq = 0
+preview = PreviewCompositor((CAMERA_WIDTH, HEIGHT), args.preview_rate)
+hand_bg = pygame.Surface((CAMERA_WIDTH - 20, 40)).convert()
+hand_bg.set_alpha(180)
+hand_bg.fill((0, 0, 0))
+# The run starts once tracking is up; until then, a loading screen.
+wait_until_ready(worker, screen, font_small, clock, NIGHT_SKY)
+stats = FrameStats.from_args(args)
+stats.startup = startup
+timestep = FixedTimestep()
+
+while stats.next_frame():
+    # ---------- PROCESS CAMERA ----------
+    # Only the newest result from the worker is used; when there is no new
+    # one this frame, the previous hand state carries over.
+    detection = worker.latest()
+    if detection is not None and detection.seq != last_seq:
+        last_seq = detection.seq
+        results = detection.results
+        stats.record("tracker", detection.duration)
+        
+        # Refresh the camera preview; landmarks are drawn on the small copy
+        if preview.update(detection.frame) and results.multi_hand_landmarks:
+            for hand_landmarks in results.multi_hand_landmarks:
+                mp_drawing.draw_landmarks(
+                    preview.pixels, 
+                    hand_landmarks, 
+                    mp_hands.HAND_CONNECTIONS,
+                    mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
+                    mp_drawing.DrawingSpec(color=(0, 255, 255), thickness=2)
+                )
+        
+        hand_present = bool(results.multi_hand_landmarks)
+        if hand_present:
+            hand = hand_frames(results, detection.frame_time)[0]
+            wrist_filter.update((hand[WRIST, 1],), hand.timestamp)
+        else:
+            wrist_filter.reset()
+    
+    # Simplified: Hand is raised if wrist is in upper half of frame
+    hand_up = False
+    if hand_present:
+        (wrist_y,) = wrist_filter.predict(time.monotonic() + args.predict_ms / 1000.0)
+        hand_up = wrist_y < 0.5
+    
+    # Trigger jump/reset on hand raise (with debounce)
+    if hand_up and not last_hand_up:
+        if game_over:
+            reset_game()
+        else:
+            jump()
+    
+    last_hand_up = hand_up
+    stats.lap("input")
+    
+    # ---------- GAME EVENTS ----------
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            worker.stop()
+            pygame.quit()
+            sys.exit()
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_SPACE:
+                if game_over:
+                    reset_game()
+                else:
+                    jump()
+    
+    # ---------- SIMULATION ----------
+    # Fixed 1/60 s steps on the monotonic clock, so the game runs at the
+    # same speed however fast frames are drawn.
+    for _ in range(timestep.steps()):
+        update_game()
+    
+    stats.lap("update")
+    
+    # ---------- DRAW EVERYTHING ----------
+    # Draw game area background (stars and moon included at night)
+    draw_sky()
     if is_night:
         draw_stars()
-        draw_moon()
     
     draw_clouds()
     draw_ground()
     
-    # Draw obstacles
+    # Draw obstacles and dino between their last two simulated positions
+    alpha = timestep.alpha
     for obs in obstacles:
-        draw_cactus(obs['x'], obs['y'], obs['width'], obs['height'])
+        draw_cactus(round(lerp(obs['prev_x'], obs['x'], alpha)), obs['y'], obs['width'], obs['height'])
     
-    # Draw dino
-    draw_dino(dino_x, dino_y)
+    draw_dino(dino_x, round(lerp(prev_dino_y, dino_y, alpha)))
     
     # Draw scores
     text_color = BLACK if not is_night else WHITE
-    score_text = font_small.render(f"Score: {score}", True, text_color)
-    high_score_text = font_small.render(f"High Score: {high_score}", True, text_color)
-    speed_text = font_small.render(f"Speed: {current_speed}", True, text_color)
-    cycle_text = font_small.render(f"Mode: {'Night' if is_night else 'Day'}", True, text_color)
+    score_text = render_text(font_small, f"Score: {score}", text_color)
+    high_score_text = render_text(font_small, f"High Score: {high_score}", text_color)
+    speed_text = render_text(font_small, f"Speed: {current_speed}", text_color)
+    cycle_text = render_text(font_small, f"Mode: {'Night' if is_night else 'Day'}", text_color)
     screen.blit(score_text, (10, 10))
     screen.blit(high_score_text, (10, 35))
     screen.blit(speed_text, (10, 60))
@@ -327,12 +456,14 @@ while True:
     if game_over:
         show_game_over()
     
+    stats.lap("render")
+    
     # ---------- DRAW CAMERA FEED ----------
     # Resize camera frame to fit sidebar
-    frame = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
-    camera_display = cv2.resize(frame, (CAMERA_WIDTH, HEIGHT))
-    camera_surface = pygame.surfarray.make_surface(camera_display.swapaxes(0, 1))
-    screen.blit(camera_surface, (GAME_WIDTH, 0))
+    if preview.has_frame:
+        screen.blit(preview.surface, (GAME_WIDTH, 0))
+    else:
+        pygame.draw.rect(screen, BLACK, (GAME_WIDTH, 0, CAMERA_WIDTH, HEIGHT))
     
     # Draw border around camera
     pygame.draw.rect(screen, BLACK if not is_night else WHITE, 
@@ -341,13 +472,17 @@ while True:
     # Hand status on camera feed
     hand_status = "HAND UP!" if hand_up else "Raise Hand"
     hand_color = (0, 255, 0) if hand_up else (255, 255, 255)
-    hand_bg = pygame.Surface((CAMERA_WIDTH - 20, 40))
-    hand_bg.set_alpha(180)
-    hand_bg.fill((0, 0, 0))
     screen.blit(hand_bg, (GAME_WIDTH + 10, HEIGHT - 50))
     
-    hand_text = font_small.render(hand_status, True, hand_color)
+    hand_text = render_text(font_small, hand_status, hand_color)
     screen.blit(hand_text, (GAME_WIDTH + CAMERA_WIDTH//2 - hand_text.get_width()//2, HEIGHT - 40))
     
+    stats.lap("camera")
+    
     pygame.display.update()
-    clock.tick(60)  # Increased to 60 FPS for smoother gameplay
\ No newline at end of file
+    stats.lap("present")
+    stats.tick(clock, args.fps)  # 60 FPS by default for smoother gameplay
+
+stats.finish()
+worker.stop()
+pygame.quit()
\ No newline at end of file
@@ -1,39 +1,63 @@
-import cv2
-import mediapipe as mp
+# First, so the startup report's clock covers the imports below.
+from startup import LazyModule, StartupReport, wait_until_ready
+
 import pygame
 import random
 import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from capture import CaptureWorker, add_tracking_arguments, open_tracker
+from landmarks import pose_frame
+from perf import FrameStats, add_benchmark_arguments
+from pose_actions import PoseActionClassifier
+from preview import PreviewCompositor
+from quality import QUALITY_LEVELS, QualityController, add_quality_arguments
+from rhythm import AudioClock, BeatMap, RhythmScheduler, load_beat_map
+from text_cache import render_text
+
+parser = argparse.ArgumentParser(description="Gesture Game")
+add_tracking_arguments(parser)
+add_benchmark_arguments(parser)
+add_quality_arguments(parser)
+parser.add_argument("--music", default="music.mp3",
+                    help="background track, looped (default music.mp3)")
+parser.add_argument("--audio-latency", type=float, default=0.0, metavar="MS",
+                    help="delay from the mixer to your speakers; raise it if "
+                         "deadlines feel early (default 0)")
+args = parser.parse_args()
+startup = StartupReport()
+startup.mark("imports")
 
 # ---------------------- SETUP ------------------------
-mp_drawing = mp.solutions.drawing_utils
-mp_pose = mp.solutions.pose
+# MediaPipe takes a second or so to import; the capture worker loads it
+# while the window is already up.
+mp_drawing = LazyModule("mediapipe.python.solutions.drawing_utils")
+mp_pose = LazyModule("mediapipe.python.solutions.pose")
 
 pygame.init()
 pygame.mixer.init()
 
-# Load background music
-pygame.mixer.music.load("music.mp3")   # place music.mp3 in same folder
-pygame.mixer.music.play(-1)
-
 # Game window
 WIDTH, HEIGHT = 900, 600
 win = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Gesture Game")
+clock = pygame.time.Clock()
+startup.mark("window")
 
 font = pygame.font.SysFont("Arial", 40)
 small_font = pygame.font.SysFont("Arial", 25)
 
-# Webcam
-cap = cv2.VideoCapture(0)
-
 # Game variables
 score = 0
 game_over = False
 current_action = None
-action_start_time = time.time()
-ACTION_DURATION = 5
+ACTION_DURATION = 5  # seconds, rounded to whole beats of the music
+# A result whose frame was captured before the deadline may still be in
+# inference when it passes; wait this long for it before failing.
+JUDGE_GRACE = 0.25
 
-# Simple actions suitable for sitting
+# Simple actions suitable for sitting (names from pose_actions.POSE_ACTIONS)
 ACTIONS = [
     "Raise Right Hand",
     "Raise Left Hand",
@@ -44,41 +68,6 @@ ACTIONS = [
 # ---------------------- FUNCTIONS ----------------------------
 # -------------------------------------------------------------
 
-def flip_lr(x):
-    """Fix mirror effect by flipping x-axis."""
-    return 1 - x
-
-def check_action(landmarks, action):
-    """Check if user completed the current action."""
-    if not landmarks:
-        return False
-
-    # Get landmarks
-    lh = landmarks[mp_pose.PoseLandmark.LEFT_WRIST]
-    rh = landmarks[mp_pose.PoseLandmark.RIGHT_WRIST]
-    ls = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER]
-    rs = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER]
-
-    # Fix left-right visually
-    lh_x = flip_lr(lh.x)
-    rh_x = flip_lr(rh.x)
-
-    # Hand raised logic
-    left_up = lh.y < ls.y
-    right_up = rh.y < rs.y
-
-    if action == "Raise Right Hand":
-        return right_up and not left_up
-
-    if action == "Raise Left Hand":
-        return left_up and not right_up
-
-    if action == "Raise Both Hands":
-        return left_up and right_up
-
-    return False
-
-
 def new_action():
     return random.choice(ACTIONS)
 
@@ -86,84 +75,176 @@ def new_action():
 # -------------------------------------------------------------
 # ----------------------- GAME LOOP ----------------------------
 # -------------------------------------------------------------
-with mp_pose.Pose(min_detection_confidence=0.5,
-                  min_tracking_confidence=0.5) as pose:
-
-    current_action = new_action()
-
-    while True:
-
-        ret, frame = cap.read()
-        if not ret:
-            continue
-
-        # Fix camera mirror
-        frame = cv2.flip(frame, 1)
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-        results = pose.process(rgb)
-
-        # Draw pose skeleton
-        if results.pose_landmarks:
-            mp_drawing.draw_landmarks(frame, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
-
-        # Convert camera frame to pygame
-        cam_surface = pygame.surfarray.make_surface(cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE))
-        cam_surface = pygame.transform.scale(cam_surface, (320, 240))
-
-        # ---------------- GAME LOGIC -----------------
-        if not game_over:
-
-            time_left = ACTION_DURATION - (time.time() - action_start_time)
-
-            # If completed
-            if results.pose_landmarks:
-                if check_action(results.pose_landmarks.landmark, current_action):
-                    score += 1
-                    current_action = new_action()
-                    action_start_time = time.time()
-
-            # Failed
-            if time_left <= 0:
-                game_over = True
-
-        # ------------------- UI ----------------------
-        win.fill((30, 30, 70))  # dark blue background
-
-        # Webcam on screen
-        win.blit(cam_surface, (20, 20))
-
-        score_text = font.render(f"Score: {score}", True, (255, 255, 255))
-        win.blit(score_text, (20, 280))
-
-        # If playing
-        if not game_over:
-            action_text = font.render(f"Do: {current_action}", True, (255, 215, 0))
-            timer_text = font.render(f"Time Left: {int(time_left)}", True, (255, 80, 80))
-            win.blit(action_text, (20, 340))
-            win.blit(timer_text, (20, 400))
-
-        # If lost
-        else:
-            over_text = font.render("GAME OVER!", True, (255, 0, 0))
-            restart_text = font.render("Press R to Restart", True, (255, 255, 255))
-            win.blit(over_text, (350, 260))
-            win.blit(restart_text, (300, 320))
-
-        pygame.display.update()
-
-        # ---------------- EVENT HANDLING --------------------
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                cap.release()
-                pygame.quit()
-                exit()
-
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r and game_over:
-                    # Reset everything
-                    score = 0
-                    game_over = False
-                    current_action = new_action()
-                    action_start_time = time.time()
-
+# Webcam (or a landmark recording) plus the pose graph, run on a
+# background thread so the game loop is paced by its own clock instead
+# of spinning on the camera. Opening them happens there too.
+def open_pose_tracker():
+    return open_tracker(args, "pose", report=startup,
+                        min_detection_confidence=0.5,
+                        min_tracking_confidence=0.5)
+worker = CaptureWorker(open_pose_tracker, args.inference_rate, startup,
+                       preload=[mp_drawing, mp_pose])
+worker.start()
+
+# Load background music and its beat map (analyzed on first use, then
+# cached next to the track) while tracking starts. Without music, actions
+# run on a steady beat.
+music_loaded = False
+try:
+    pygame.mixer.music.load(args.music)   # place music.mp3 in same folder
+    music_loaded = True
+except pygame.error as e:
+    print(f"Playing without music: {e}")
+
+def load_music_beats():
+    """The music's beat map, or a steady beat without one."""
+    if not music_loaded:
+        return BeatMap.steady(120.0)
+    try:
+        with startup.stage("music"):
+            return load_beat_map(args.music)
+    except pygame.error as e:
+        print(f"Could not analyze the music, using a steady beat: {e}")
+        return BeatMap.steady(120.0)
+
+# Loading screen until the camera, the model and the beat map are ready
+# (the analysis runs in the background so the screen keeps drawing); the
+# music and the first action start after it.
+with ThreadPoolExecutor(max_workers=1) as pool:
+    beat_map_job = pool.submit(load_music_beats)
+    wait_until_ready(worker, win, small_font, clock, pending=[beat_map_job])
+beat_map = beat_map_job.result()
+tracker = worker.tracker
+if music_loaded:
+    pygame.mixer.music.play(-1)
+
+# Tracking quality: fixed with --quality N, otherwise adjusted to keep the
+# frame budget. Replays have no model to adjust.
+set_quality = getattr(tracker, "set_quality", None)
+quality = None
+if set_quality is not None:
+    if args.quality == "auto":
+        quality = QualityController(1.0 / (args.fps or 60), args.max_load)
+    else:
+        set_quality(QUALITY_LEVELS[int(args.quality)])
+
+# Deadlines are on the audio clock, so they land on the music's beats.
+audio_clock = AudioClock(args.audio_latency / 1000.0)
+scheduler = RhythmScheduler(beat_map, ACTION_DURATION)
+current_action = new_action()
+scheduler.next_window(audio_clock.now())
+# Every action is scored on every result; one counts once it has been
+# held for a moment, so a single noisy frame cannot score.
+pose_actions = PoseActionClassifier()
+stats = FrameStats.from_args(args)
+stats.startup = startup
+preview = PreviewCompositor((320, 240), args.preview_rate)
+last_seq = 0
+pose = None
+time_left = ACTION_DURATION
+
+while stats.next_frame():
+    frame_start = time.perf_counter()
+
+    # Newest pose result from the worker, if there is a new one; stop
+    # once a replay or video has run out and its last result was used.
+    tracking_done = worker.finished.is_set()
+    detection = worker.latest()
+    new_result = detection is not None and detection.seq != last_seq
+    if tracking_done and not new_result:
+        break
+    if new_result:
+        last_seq = detection.seq
+        results = detection.results
+        stats.record("tracker", detection.duration)
+
+        # Camera preview, with the pose skeleton drawn on the small copy
+        if preview.update(detection.frame) and results.pose_landmarks:
+            mp_drawing.draw_landmarks(preview.pixels, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
+        pose = pose_frame(results, detection.frame_time)
+    stats.lap("camera")
+
+    # ---------------- GAME LOGIC -----------------
+    now = audio_clock.now()
+    if not game_over:
+
+        time_left = max(0.0, scheduler.deadline - now)
+
+        # If completed (each result is checked once, judged at the audio
+        # time its camera frame was captured)
+        if new_result and pose is not None:
+            pose_actions.update(pose)
+            if (audio_clock.at(detection.frame_time) <= scheduler.deadline
+                    and pose_actions.is_held(current_action)):
+                score += 1
+                current_action = new_action()
+                scheduler.next_window(now)
+                pose_actions.reset()
+
+        # Failed
+        if now > scheduler.deadline + JUDGE_GRACE:
+            game_over = True
+
+    stats.lap("update")
+
+    # ------------------- UI ----------------------
+    win.fill((30, 30, 70))  # dark blue background
+
+    # Webcam on screen
+    win.blit(preview.surface, (20, 20))
+
+    score_text = render_text(font, f"Score: {score}", (255, 255, 255))
+    win.blit(score_text, (20, 280))
+
+    # If playing
+    if not game_over:
+        action_text = render_text(font, f"Do: {current_action}", (255, 215, 0))
+        timer_text = render_text(font, f"Time Left: {int(time_left)}", (255, 80, 80))
+        win.blit(action_text, (20, 340))
+        win.blit(timer_text, (20, 400))
+
+        # Beat pulse: largest on the beat, shrinking until the next one
+        pulse = 1.0 - scheduler.beat_phase(now)
+        pygame.draw.circle(win, (255, 215, 0), (WIDTH - 60, 60), int(12 + 18 * pulse ** 2))
+
+    # If lost
+    else:
+        over_text = render_text(font, "GAME OVER!", (255, 0, 0))
+        restart_text = render_text(font, "Press R to Restart", (255, 255, 255))
+        win.blit(over_text, (350, 260))
+        win.blit(restart_text, (300, 320))
+
+    stats.lap("render")
+
+    pygame.display.update()
+    stats.lap("present")
+
+    # ---------------- EVENT HANDLING --------------------
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            worker.stop()
+            pygame.quit()
+            exit()
+
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_r and game_over:
+                # Reset everything
+                score = 0
+                game_over = False
+                current_action = new_action()
+                scheduler.next_window(audio_clock.now())
+                pose_actions.reset()
+
+    # ---------------- FRAME BUDGET --------------------
+    # Step tracking quality down while this frame's work or inference
+    # overruns its budget, and back up when there is room again.
+    if quality is not None:
+        quality.record_frame(time.perf_counter() - frame_start)
+        level = quality.update(time.monotonic(), tracker.busy_time)
+        if level is not None:
+            set_quality(level)
+
+    stats.tick(clock, args.fps)
+
+stats.finish()
+worker.stop()
@@ -0,0 +1,52 @@
+import numpy as np
+
+from landmarks import (INDEX_DIP, INDEX_MCP, INDEX_TIP, MIDDLE_MCP, MIDDLE_TIP,
+                       PINKY_MCP, PINKY_TIP, RING_TIP, THUMB_TIP, WRIST)
+
+# ------------------ GESTURE TABLE ------------------
+# (name, landmark, landmark, threshold): the gesture is on while the two
+# landmarks are closer than threshold * hand size. Earlier rows win when
+# several match, like an if/elif chain. A threshold of 0.25 is about the
+# old fixed 0.03 (normalized) at arm's length from a laptop camera.
+PINCH_GESTURES = [
+    ("click", THUMB_TIP, INDEX_TIP, 0.25),
+    ("right_click", THUMB_TIP, MIDDLE_TIP, 0.25),
+    ("select_all", THUMB_TIP, INDEX_DIP, 0.25),
+    ("copy", THUMB_TIP, PINKY_TIP, 0.25),
+    ("paste", THUMB_TIP, RING_TIP, 0.25),
+]
+
+
+# ------------------ CLASSIFIER ------------------
+class GestureClassifier:
+    """Matches a HandFrame (or its (21, 3) array) against a gesture table.
+
+    Every landmark pair in the table, plus the two that give the hand size
+    (palm length and knuckle width, whichever is larger), is measured with
+    one fancy-index and one hypot. Distances are divided by the hand size,
+    so thresholds hold whether the hand is near the camera or far from
+    it. Adding a row to the table adds one element to those arrays, not
+    another pass. Only x and y are used; MediaPipe's z is too noisy.
+    """
+
+    def __init__(self, table=PINCH_GESTURES):
+        self.names = [row[0] for row in table]
+        self.first = np.array([row[1] for row in table] + [MIDDLE_MCP, PINKY_MCP], dtype=np.intp)
+        self.second = np.array([row[2] for row in table] + [WRIST, INDEX_MCP], dtype=np.intp)
+        self.thresholds = np.array([row[3] for row in table], dtype=np.float32)
+        self._all = np.zeros(len(self.first), dtype=np.float32)
+        self.distances = self._all[:len(table)]
+
+    def measure(self, hand):
+        """Distances of every table pair, in hand sizes."""
+        delta = hand[self.first, :2] - hand[self.second, :2]
+        np.hypot(delta[:, 0], delta[:, 1], out=self._all)
+        self.distances /= max(self._all[-2:].max(), 1e-6)
+        return self.distances
+
+    def classify(self, hand):
+        """Name of the first gesture in the table that matches, or None."""
+        matches = self.measure(hand) < self.thresholds
+        if not matches.any():
+            return None
+        return self.names[int(np.argmax(matches))]
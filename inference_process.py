@@ -0,0 +1,205 @@
+"""Out-of-process MediaPipe inference.
+
+Camera frames are handed to a child process through a preallocated
+shared-memory ring buffer, and landmarks come back through a small
+fixed-layout shared array, so nothing is pickled per frame and inference
+runs on its own core instead of fighting the game loop for the GIL.
+"""
+import importlib
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from capture import FramePreprocessor, build_graph
+from frame_sources import open_source
+from landmarks import LANDMARK_SHAPES, array_to_results, results_to_array
+
+# Control words shared between parent and child.
+CTRL_SEQ = 0       # number of frames written by the parent
+CTRL_NEWEST = 1    # ring slot holding the newest frame
+CTRL_READING = 2   # ring slot the child is currently reading, or -1
+CTRL_STOP = 3      # set to 1 to ask the child to exit
+CTRL_WORDS = 4
+
+# Result header: [result seq, timestamp, item count, frame seq].
+RESULT_HEADER = 4
+
+# Capture times kept for matching results to the frame they came from;
+# the child never lags the parent by anywhere near this many frames.
+FRAME_TIME_HISTORY = 64
+
+
+# ------------------ SHARED BUFFERS ------------------
+class SharedBuffers:
+    """Frame ring, control words and landmark result block in shared memory."""
+
+    def __init__(self, kind, frame_shape, slots=3, max_items=1):
+        self.kind = kind
+        self.frame_shape = tuple(frame_shape)
+        self.slots = slots
+        self.max_items = max_items
+        self.result_shape = (max_items,) + LANDMARK_SHAPES[kind]
+
+        frame_bytes = slots * int(np.prod(self.frame_shape))
+        ctrl_bytes = CTRL_WORDS * 8
+        result_bytes = RESULT_HEADER * 8 + int(np.prod(self.result_shape)) * 4
+        self._blocks = [
+            shared_memory.SharedMemory(create=True, size=frame_bytes),
+            shared_memory.SharedMemory(create=True, size=ctrl_bytes),
+            shared_memory.SharedMemory(create=True, size=result_bytes),
+        ]
+
+        self.frames = np.ndarray((slots,) + self.frame_shape, dtype=np.uint8,
+                                 buffer=self._blocks[0].buf)
+        self.ctrl = np.ndarray((CTRL_WORDS,), dtype=np.int64, buffer=self._blocks[1].buf)
+        self.header = np.ndarray((RESULT_HEADER,), dtype=np.float64,
+                                 buffer=self._blocks[2].buf)
+        self.landmarks = np.ndarray(self.result_shape, dtype=np.float32,
+                                    buffer=self._blocks[2].buf, offset=RESULT_HEADER * 8)
+        self.ctrl[:] = (0, -1, -1, 0)
+        self.header[:] = 0
+
+    def close(self):
+        # Drop the array views first; SharedMemory refuses to close while
+        # buffers exported from it are still alive.
+        self.frames = self.ctrl = self.header = self.landmarks = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+
+
+# ------------------ CHILD PROCESS ------------------
+def _inference_main(buffers, options, lock, frame_ready):
+    """Child process: run the graph on the newest frame in the ring.
+
+    The shared mappings are inherited through fork, so the child uses the
+    parent's SharedBuffers directly and leaves unlinking to the parent.
+    """
+    kind = buffers.kind
+    graph = build_graph(kind, buffers.max_items, **options)
+    scratch = np.zeros(buffers.result_shape, dtype=np.float32)
+    result_seq = 0
+    try:
+        while True:
+            if not frame_ready.wait(0.1):
+                if buffers.ctrl[CTRL_STOP]:
+                    break
+                continue
+            frame_ready.clear()
+            with lock:
+                if buffers.ctrl[CTRL_STOP]:
+                    break
+                slot = int(buffers.ctrl[CTRL_NEWEST])
+                frame_seq = int(buffers.ctrl[CTRL_SEQ])
+                buffers.ctrl[CTRL_READING] = slot
+
+            frame = buffers.frames[slot]
+            frame.flags.writeable = False
+            results = graph.process(frame)
+            count = results_to_array(kind, results, scratch)
+            result_seq += 1
+
+            with lock:
+                buffers.ctrl[CTRL_READING] = -1
+                buffers.landmarks[:count] = scratch[:count]
+                buffers.header[:] = (result_seq, time.monotonic(), count, frame_seq)
+    finally:
+        graph.close()
+
+
+# ------------------ PARENT-SIDE TRACKER ------------------
+class ProcessTracker:
+    """Tracker that reads frames here and runs MediaPipe in a child process.
+
+    Has the same read()/close() interface as capture.CameraTracker. read()
+    never waits for inference: it pushes the frame into the ring and pairs
+    it with the newest landmarks the child has produced, or returns None
+    if the child has produced none since the last call, so each result is
+    handed out once. The ring holds RGB frames at the inference
+    resolution, written in place.
+    """
+
+    def __init__(self, kind, max_items=1, source="camera:0", slots=3, inference_width=0,
+                 **options):
+        self.kind = kind
+        self.source = open_source(source)
+        self.prep = FramePreprocessor(inference_width)
+        frame = self.prep.read(self.source)
+        if frame is None:
+            self.source.release()
+            raise RuntimeError("frame source %r returned no frame" % (source,))
+
+        shape = self.prep.inference_shape(frame.shape)
+        self.buffers = SharedBuffers(kind, shape, slots, max_items)
+        self._local = np.zeros(self.buffers.result_shape, dtype=np.float32)
+        self._frame_times = np.zeros(FRAME_TIME_HISTORY)
+        self.frame_time = time.monotonic()
+        self._result_seq = 0
+
+        # "fork" so the child does not re-import the game script (the games
+        # open their window and start playing at import time). Finish
+        # importing MediaPipe first: a game may be loading it on another
+        # thread, and a child forked mid-import would wait forever on that
+        # thread's import lock.
+        importlib.import_module("mediapipe")
+        ctx = multiprocessing.get_context("fork")
+        self._lock = ctx.Lock()
+        self._frame_ready = ctx.Event()
+        self.process = ctx.Process(
+            target=_inference_main,
+            args=(self.buffers, options, self._lock, self._frame_ready),
+            daemon=True,
+        )
+        self.process.start()
+
+    @property
+    def finished(self):
+        return self.source.finished
+
+    def _free_slot(self):
+        ctrl = self.buffers.ctrl
+        busy = (ctrl[CTRL_NEWEST], ctrl[CTRL_READING])
+        for slot in range(self.buffers.slots):
+            if slot not in busy:
+                return slot
+
+    def read(self):
+        """Return (frame, results) for the next camera frame, or None
+        when there is no frame or no new result."""
+        raw = self.prep.read(self.source)
+        if raw is None:
+            return None
+        now = self.source.frame_time
+        frame = self.prep.mirror(raw)
+
+        with self._lock:
+            slot = self._free_slot()
+        self.prep.to_rgb(frame, dst=self.buffers.frames[slot])
+        with self._lock:
+            self.buffers.ctrl[CTRL_NEWEST] = slot
+            self.buffers.ctrl[CTRL_SEQ] += 1
+            self._frame_times[self.buffers.ctrl[CTRL_SEQ] % FRAME_TIME_HISTORY] = now
+            result_seq, _, count, frame_seq = self.buffers.header
+            if result_seq != self._result_seq:
+                count = int(count)
+                self._local[:count] = self.buffers.landmarks[:count]
+        self._frame_ready.set()
+
+        if result_seq == self._result_seq:
+            return None
+        self._result_seq = result_seq
+        # Results come from an earlier frame than the one returned.
+        self.frame_time = self._frame_times[int(frame_seq) % FRAME_TIME_HISTORY]
+        return frame, array_to_results(self.kind, self._local, count)
+
+    def close(self):
+        with self._lock:
+            self.buffers.ctrl[CTRL_STOP] = 1
+        self._frame_ready.set()
+        self.process.join(timeout=2.0)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.source.release()
+        self.buffers.close()
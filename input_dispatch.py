@@ -0,0 +1,117 @@
+import queue
+import threading
+import time
+
+from capture import LatestValue
+
+
+# ------------------ EDGE TRIGGER ------------------
+class EdgeTrigger:
+    """Turns a per-frame gesture state into one event per press.
+
+    The state has to hold for `hold` seconds before the event fires, which
+    filters out single-frame misdetections, and has to be gone for
+    `release` seconds before it can fire again, so a pinch that flickers
+    while held still counts as one click.
+    """
+
+    def __init__(self, hold=0.05, release=0.15):
+        self.hold = hold
+        self.release = release
+        self.pressed = False
+        self._active_since = None
+        self._inactive_since = None
+
+    def update(self, active, now):
+        """Feed this frame's state; return True on the frame a press fires."""
+        if active:
+            self._inactive_since = None
+            if self._active_since is None:
+                self._active_since = now
+            if not self.pressed and now - self._active_since >= self.hold:
+                self.pressed = True
+                return True
+        else:
+            self._active_since = None
+            if self.pressed:
+                if self._inactive_since is None:
+                    self._inactive_since = now
+                if now - self._inactive_since >= self.release:
+                    self.pressed = False
+        return False
+
+
+# ------------------ INPUT DISPATCHER ------------------
+class InputDispatcher(threading.Thread):
+    """Injects mouse and keyboard input from a background thread.
+
+    The tracking loop only calls move() and send(), which never block.
+    Moves are coalesced: only the newest position is kept, and it is sent
+    at most `move_rate` times per second. Discrete actions go through a
+    queue in order, each sent after any pending move so clicks land where
+    the cursor was last put. `backend` is the pyautogui module; its PAUSE
+    sleep after every call is switched off, since pacing happens here.
+    """
+
+    def __init__(self, backend, move_rate=60):
+        super().__init__(daemon=True)
+        self.backend = backend
+        backend.PAUSE = 0
+        self.min_interval = 1.0 / move_rate if move_rate else 0.0
+        self.actions = {
+            "click": backend.click,
+            "right_click": backend.rightClick,
+            "select_all": lambda: backend.hotkey("ctrl", "a"),
+            "copy": lambda: backend.hotkey("ctrl", "c"),
+            "paste": lambda: backend.hotkey("ctrl", "v"),
+        }
+        self._target = LatestValue()
+        self._events = queue.Queue()
+        self._wake = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+        self._sent = None
+        self._last_move = 0.0
+
+    def move(self, x, y):
+        """Move the cursor to (x, y) soon; replaces any move not yet sent."""
+        self._target.publish((x, y))
+        self._wake.set()
+
+    def send(self, action):
+        """Queue one of the named actions in self.actions."""
+        self._events.put(action)
+        self._wake.set()
+
+    def _flush_move(self):
+        target = self._target.get()
+        if target is None or target == self._sent:
+            return
+        self.backend.moveTo(*target)
+        self._sent = target
+        self._last_move = time.monotonic()
+
+    def run(self):
+        while self._running.is_set():
+            self._wake.wait(0.1)
+            self._wake.clear()
+
+            # Rate-limit moves; anything published meanwhile coalesces.
+            wait = self._last_move + self.min_interval - time.monotonic()
+            if wait > 0 and self._events.empty():
+                time.sleep(wait)
+            self._flush_move()
+
+            while True:
+                try:
+                    action = self._events.get_nowait()
+                except queue.Empty:
+                    break
+                self._flush_move()
+                self.actions[action]()
+
+    def stop(self):
+        self._running.clear()
+        self._wake.set()
+        if self.is_alive():
+            self.join(timeout=1.0)
@@ -0,0 +1,244 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from startup import LazyModule
+
+# Importing mediapipe takes about a second; only replays and the daemon
+# client build landmark lists themselves, and they do it off the game loop.
+landmark_pb2 = LazyModule("mediapipe.framework.formats.landmark_pb2")
+
+# Fixed per-item layouts: 21 hand landmarks (x, y, z) and 33 pose
+# landmarks (x, y, z, visibility).
+HAND_SHAPE = (21, 3)
+POSE_SHAPE = (33, 4)
+LANDMARK_SHAPES = {"hands": HAND_SHAPE, "pose": POSE_SHAPE}
+
+# Hand landmark indices (same numbering as mp.solutions.hands.HandLandmark)
+WRIST = 0
+THUMB_TIP = 4
+INDEX_MCP = 5
+INDEX_DIP = 7
+INDEX_TIP = 8
+MIDDLE_MCP = 9
+MIDDLE_TIP = 12
+RING_TIP = 16
+PINKY_MCP = 17
+PINKY_TIP = 20
+
+# Pose landmark indices (same numbering as mp.solutions.pose.PoseLandmark)
+NOSE = 0
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+LEFT_ELBOW = 13
+RIGHT_ELBOW = 14
+LEFT_WRIST = 15
+RIGHT_WRIST = 16
+LEFT_HIP = 23
+RIGHT_HIP = 24
+
+
+# ------------------ RESULTS -> ARRAYS ------------------
+# Serialized NormalizedLandmark: a length-delimited entry (tag 0x0a) per
+# landmark holding fixed32 floats x, y, z, visibility, presence (fields
+# 1-5), each a one-byte tag and four little-endian bytes.
+_LANDMARK_TAG = 0x0A
+_FLOAT_FIELD = 5
+
+def _decode_landmarks(landmark_list, out):
+    """Copy a NormalizedLandmarkList into `out` (n, 3 or 4) in one pass.
+
+    Serializes the list once and copies each coordinate column out of the
+    bytes with a strided NumPy view, instead of one protobuf attribute
+    lookup per coordinate. Falls back to attribute access if the landmarks
+    do not all carry the same fields (the fixed record layout this needs).
+    """
+    data = landmark_list.SerializeToString()
+    count = len(out)
+    stride, extra = divmod(len(data), count)
+    if not extra and stride > 2 and (stride - 2) % _FLOAT_FIELD == 0:
+        same = data[0::stride] == bytes((_LANDMARK_TAG,)) * count
+        same = same and data[1::stride] == bytes((stride - 2,)) * count
+        offsets = range(2, stride, _FLOAT_FIELD)
+        for offset in offsets:
+            same = same and data[offset::stride] == data[offset:offset + 1] * count
+        if same:
+            if len(offsets) < out.shape[1]:
+                out.fill(0)  # unset fields read as 0, like the protobuf defaults
+            for offset in offsets:
+                column = (data[offset] >> 3) - 1
+                if column < out.shape[1]:
+                    out[:, column] = np.ndarray((count,), "<f4", data, offset + 1, (stride,))
+            return
+
+    width = out.shape[1]
+    for j, lm in enumerate(landmark_list.landmark):
+        row = out[j]
+        row[0] = lm.x
+        row[1] = lm.y
+        row[2] = lm.z
+        if width > 3:
+            row[3] = lm.visibility
+
+
+def results_to_array(kind, results, out):
+    """Copy landmarks from MediaPipe results into `out`; return item count.
+
+    `out` has shape (max_items,) + LANDMARK_SHAPES[kind]. Hands beyond
+    max_items are dropped; results without this kind of landmarks give 0.
+    """
+    if kind == "hands":
+        items = getattr(results, "multi_hand_landmarks", None) or []
+    else:
+        pose = getattr(results, "pose_landmarks", None)
+        items = [pose] if pose else []
+    count = min(len(items), len(out))
+    for i in range(count):
+        _decode_landmarks(items[i], out[i])
+    return count
+
+
+# ------------------ ARRAYS -> RESULTS ------------------
+def _landmark_list(arr):
+    """Build a NormalizedLandmarkList from an (n, 3) or (n, 4) array."""
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for row in arr:
+        lm = landmark_list.landmark.add()
+        lm.x, lm.y, lm.z = float(row[0]), float(row[1]), float(row[2])
+        if len(row) > 3:
+            lm.visibility = float(row[3])
+    return landmark_list
+
+
+def array_to_results(kind, arr, count):
+    """Rebuild a MediaPipe-style results object from a landmark array.
+
+    The returned object has the same `multi_hand_landmarks` /
+    `pose_landmarks` attributes the games read, so code that draws or
+    inspects results works unchanged.
+    """
+    if kind == "hands":
+        hands = [_landmark_list(arr[i]) for i in range(count)]
+        return SimpleNamespace(multi_hand_landmarks=hands or None)
+    return SimpleNamespace(pose_landmarks=_landmark_list(arr[0]) if count else None)
+
+
+# ------------------ RENDER-TIME SAMPLING ------------------
+class LandmarkTrack:
+    """The last two timestamped landmark arrays, sampled at any time.
+
+    Inference delivers results at 15-30 Hz while the games draw at 60;
+    sample(t) gives the landmarks for a render timestamp by linear
+    interpolation between the last two results, or by extrapolating along
+    them when t is past the newest one. Extrapolation stops
+    max_extrapolation seconds past the newest result so a stalled tracker
+    does not fling the hand off screen.
+    """
+
+    def __init__(self, shape, max_extrapolation=0.1):
+        self.max_extrapolation = max_extrapolation
+        self.times = np.zeros(2)
+        self.poses = np.zeros((2,) + tuple(shape), dtype=np.float32)
+        self.count = 0
+        self._out = np.zeros(shape, dtype=np.float32)
+
+    def push(self, t, pose):
+        """Add the landmarks of a result whose frame was captured at time t."""
+        if self.count and t <= self.times[1]:
+            if t == self.times[1]:
+                self.poses[1] = pose
+            return
+        self.times[0] = self.times[1]
+        self.poses[0] = self.poses[1]
+        self.times[1] = t
+        self.poses[1] = pose
+        self.count = min(self.count + 1, 2)
+
+    def restart(self, index):
+        """Hold items `index` (along the first landmark axis) at their newest
+        values instead of moving from older ones, e.g. a hand that just
+        came back into view, while the other items keep interpolating.
+        """
+        self.poses[0, index] = self.poses[1, index]
+
+    def sample(self, t, out=None):
+        """Landmarks at time t, written into `out` (or a reused array)."""
+        if self.count == 0:
+            return None
+        out = self._out if out is None else out
+        if self.count == 1:
+            out[...] = self.poses[1]
+            return out
+        t0, t1 = self.times
+        t = min(max(t, t0), t1 + self.max_extrapolation)
+        np.subtract(self.poses[1], self.poses[0], out=out)
+        out *= (t - t0) / (t1 - t0)
+        out += self.poses[0]
+        return out
+
+
+# ------------------ FRAME TYPES ------------------
+class HandFrame:
+    """One tracked hand, decoded from MediaPipe once per result.
+
+    points is a float32 (21, 3) array of normalized x, y, z; index the
+    frame with the constants above (hand[WRIST] is a (3,) view, so
+    hand[WRIST, 1] is the wrist height). timestamp is when the camera
+    frame was read, handedness "Left"/"Right" (None for replays) and score
+    the handedness confidence.
+    """
+
+    __slots__ = ("points", "timestamp", "handedness", "score")
+
+    def __init__(self, points, timestamp=0.0, handedness=None, score=1.0):
+        self.points = points
+        self.timestamp = timestamp
+        self.handedness = handedness
+        self.score = score
+
+    def __getitem__(self, index):
+        return self.points[index]
+
+
+class PoseFrame:
+    """One tracked body, decoded from MediaPipe once per result.
+
+    points is a float32 (33, 4) array of normalized x, y, z and
+    visibility, indexed like HandFrame; score is the mean visibility.
+    """
+
+    __slots__ = ("points", "timestamp", "score")
+
+    def __init__(self, points, timestamp=0.0, score=1.0):
+        self.points = points
+        self.timestamp = timestamp
+        self.score = score
+
+    def __getitem__(self, index):
+        return self.points[index]
+
+
+def hand_frames(results, timestamp=0.0):
+    """HandFrames for every hand in a MediaPipe result (empty if none)."""
+    hands = getattr(results, "multi_hand_landmarks", None) or []
+    handedness = getattr(results, "multi_handedness", None) or []
+    frames = []
+    for i, landmark_list in enumerate(hands):
+        points = np.empty(HAND_SHAPE, dtype=np.float32)
+        _decode_landmarks(landmark_list, points)
+        label, score = None, 1.0
+        if i < len(handedness):
+            category = handedness[i].classification[0]
+            label, score = category.label, category.score
+        frames.append(HandFrame(points, timestamp, label, score))
+    return frames
+
+
+def pose_frame(results, timestamp=0.0):
+    """PoseFrame for a MediaPipe pose result, or None without a body."""
+    landmark_list = getattr(results, "pose_landmarks", None)
+    if not landmark_list:
+        return None
+    points = np.empty(POSE_SHAPE, dtype=np.float32)
+    _decode_landmarks(landmark_list, points)
+    return PoseFrame(points, timestamp, float(points[:, 3].mean()))
@@ -0,0 +1,117 @@
+import json
+import resource
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+
+
+def add_benchmark_arguments(parser, fps=True):
+    """Add the options bench.py uses to drive a game headlessly."""
+    if fps:
+        parser.add_argument("--fps", type=int, default=60,
+                            help="frame rate cap, 0 for uncapped (default 60)")
+    parser.add_argument("--max-frames", type=int, default=0,
+                        help="exit after this many frames (default: run until closed)")
+    parser.add_argument("--stats", metavar="PATH",
+                        help="write frame and stage timings to PATH as JSON on exit")
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KiB."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux KiB.
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def summarize(samples):
+    """p50/p95/p99/mean/max of a list of durations, in milliseconds."""
+    if not samples:
+        return {"count": 0}
+    ms = np.asarray(samples) * 1000.0
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "count": len(ms),
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+        "mean": round(float(ms.mean()), 3),
+        "max": round(float(ms.max()), 3),
+    }
+
+
+# ------------------ FRAME STATS ------------------
+class FrameStats:
+    """Per-frame and per-stage timings for a game loop.
+
+    Call next_frame() at the top of every loop iteration and lap(stage)
+    after each stage, and cap the frame rate with tick(), which keeps its
+    sleep out of the frame time. Timings are only kept when a stats path
+    is given, so the calls cost almost nothing in normal play.
+    """
+
+    def __init__(self, path=None, max_frames=0):
+        self.path = path
+        self.enabled = path is not None
+        self.max_frames = max_frames
+        self.frame = 0
+        self.frames = []
+        self.stages = defaultdict(list)
+        self.startup = None  # a startup.StartupReport, reported alongside
+        self._frame_start = None
+        self._last = None
+        self._work_end = None
+        self._started = time.perf_counter()
+
+    @classmethod
+    def from_args(cls, args):
+        return cls(args.stats, args.max_frames)
+
+    def next_frame(self):
+        """Close the previous frame; return False once max_frames is reached."""
+        now = time.perf_counter()
+        if self.enabled and self._frame_start is not None:
+            self.frames.append((self._work_end or now) - self._frame_start)
+        self._frame_start = self._last = now
+        self._work_end = None
+        if self.max_frames and self.frame >= self.max_frames:
+            return False
+        self.frame += 1
+        return True
+
+    def lap(self, stage):
+        """Charge the time since the previous lap to `stage`."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.stages[stage].append(now - self._last)
+        self._last = now
+
+    def tick(self, clock, fps):
+        """clock.tick(fps), ending the frame's work where its sleep begins."""
+        self._work_end = time.perf_counter()
+        return clock.tick(fps)
+
+    def record(self, stage, seconds):
+        """Add a duration measured elsewhere, e.g. on a worker thread."""
+        if self.enabled:
+            self.stages[stage].append(seconds)
+
+    def report(self):
+        report = {
+            "frames": len(self.frames),
+            "wall_s": round(time.perf_counter() - self._started, 3),
+            "frame_ms": summarize(self.frames),
+            "stages_ms": {name: summarize(v) for name, v in self.stages.items()},
+            "peak_rss_kb": peak_rss_kb(),
+        }
+        if self.startup is not None:
+            report["startup_s"] = self.startup.summary()
+        return report
+
+    def finish(self):
+        """Write the report to the stats path, if one was given."""
+        if self.enabled:
+            with open(self.path, "w") as f:
+                json.dump(self.report(), f, indent=2)
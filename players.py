@@ -0,0 +1,193 @@
+import numpy as np
+
+from filters import make_filter
+from landmarks import MIDDLE_TIP, WRIST, LandmarkTrack
+
+MAX_PLAYERS = 4
+TRAIL_LENGTH = 15  # tracking results kept in each player's trail
+SWEEP_LENGTH = 16  # drawn cursor positions kept between simulation steps
+
+# Landmarks each player is tracked by: the wrist is the cursor, and a
+# hand is raised when the middle fingertip is above the wrist.
+KEYPOINTS = [WRIST, MIDDLE_TIP]
+
+
+# ------------------ PLAYERS ------------------
+class HandPlayers:
+    """Up to `capacity` players in front of one camera, one hand each.
+
+    Every per-player value is a row of a NumPy array, so smoothing,
+    trails and collision segments are computed for all players together
+    and the per-frame cost barely grows with the player count:
+
+    - identity: each detected hand goes to the player whose wrist was
+      nearest in the previous result (within max_jump, in normalized
+      units). A player who drops out keeps their slot for `hold` seconds,
+      so a missed detection or two does not swap players around. A hand
+      that is further than max_jump from every player (a fast swipe, or
+      a re-detection elsewhere) takes a free slot, or failing that the
+      nearest slot no other hand claimed.
+    - smoothing: one LandmarkTrack and one filter over (players, ...)
+      arrays; a player who (re)appears restarts only their own rows.
+    - trails and sweeps: (players, length, 2) pixel rings with counts.
+    """
+
+    def __init__(self, capacity, width, height, filter_name="one-euro",
+                 max_jump=0.25, hold=1.0):
+        self.capacity = capacity
+        self.size = np.array([width, height], dtype=np.float32)
+        self.max_jump = max_jump
+        self.hold = hold
+
+        self.active = np.zeros(capacity, dtype=bool)  # in the latest result
+        self.raised = np.zeros(capacity, dtype=bool)
+        self.cursor = np.zeros((capacity, 2), dtype=np.int32)
+        self.cursor[:] = self.size / 2
+        # Slots with a last-known cursor: everyone seen so far, and player
+        # 1 from the start, in the middle, as the one-player game always
+        # had a player on screen.
+        self.placed = np.zeros(capacity, dtype=bool)
+        self.placed[0] = True
+        self.anchor = np.zeros((capacity, 2), dtype=np.float32)  # last raw wrist
+        self.last_seen = np.full(capacity, -np.inf)
+        self._keypoints = np.zeros((capacity, len(KEYPOINTS), 2), dtype=np.float32)
+        self._fresh = np.zeros(capacity, dtype=bool)  # got a new result since last update
+        self.track = LandmarkTrack(self._keypoints.shape)
+        self.filter = make_filter(filter_name)
+
+        self.trail = np.zeros((capacity, TRAIL_LENGTH, 2), dtype=np.int32)
+        self.trail_count = np.zeros(capacity, dtype=np.intp)
+        self.sweep = np.zeros((capacity, SWEEP_LENGTH, 2), dtype=np.int32)
+        self.sweep_count = np.zeros(capacity, dtype=np.intp)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.active))
+
+    def indices(self):
+        """Slot numbers of the players in view."""
+        return np.flatnonzero(self.active)
+
+    def placed_indices(self):
+        """Slot numbers of the players with a cursor, in view or not."""
+        return np.flatnonzero(self.placed)
+
+    # ---------- tracking results ----------
+    def _match(self, wrists, t):
+        """Slot for each detected wrist, or -1 when every slot is taken."""
+        reserved = self.last_seen >= t - self.hold
+        dist = np.hypot(*(wrists[:, np.newaxis] - self.anchor).transpose(2, 0, 1))
+        nearest = dist.copy()
+        dist[:, ~reserved] = np.inf
+        slots = np.full(len(wrists), -1)
+        # Closest pairs first; at most a handful of hands, so this is cheap.
+        for _ in range(min(len(wrists), self.capacity)):
+            hand, slot = np.unravel_index(np.argmin(dist), dist.shape)
+            if dist[hand, slot] > self.max_jump:
+                break
+            slots[hand] = slot
+            dist[hand, :] = np.inf
+            dist[:, slot] = np.inf
+        taken = np.zeros(self.capacity, dtype=bool)
+        taken[slots[slots >= 0]] = True
+        free = np.flatnonzero(~reserved).tolist()
+        for hand in np.flatnonzero(slots < 0):
+            if free:
+                slot = free.pop(0)
+            else:
+                # Every slot is reserved: a hand in view wins over a
+                # player who is not.
+                stale = np.flatnonzero(~taken)
+                if not stale.size:
+                    break
+                slot = stale[np.argmin(nearest[hand, stale])]
+            slots[hand] = slot
+            taken[slot] = True
+        return slots
+
+    def observe(self, hands, t):
+        """Take the HandFrames of one tracking result, captured at time t."""
+        seen = np.zeros(self.capacity, dtype=bool)
+        if hands:
+            points = np.stack([hand.points for hand in hands])
+            slots = self._match(points[:, WRIST, :2], t)
+            found = slots >= 0
+            slots = slots[found]
+            self._keypoints[slots] = points[found][:, KEYPOINTS, :2]
+            self.anchor[slots] = points[found][:, WRIST, :2]
+            self.last_seen[slots] = t
+            seen[slots] = True
+
+        joined = seen & ~self.active
+        left = self.active & ~seen
+        self.active = seen
+        self.placed |= seen
+        self.raised &= seen
+        self._fresh |= seen
+        self.trail_count[left | joined] = 0
+        self.sweep_count[left | joined] = 0
+        if seen.any():
+            self.track.push(t, self._keypoints)
+            if joined.any():
+                self.track.restart(joined)
+                self.filter.reset(joined)
+
+    # ---------- per rendered frame ----------
+    def update(self, now, sample_time):
+        """Place every cursor at `sample_time`; call once per rendered frame."""
+        active = self.active
+        if not active.any():
+            return
+        keypoints = self.track.sample(sample_time)
+        smoothed = self.filter.update(keypoints[:, 0], now)
+        # Normalized -> game pixels (NO FLIP - direct mapping)
+        self.cursor[active] = (smoothed[active] * self.size).astype(np.int32)
+        wrist_y, tip_y = keypoints[:, 0, 1], keypoints[:, 1, 1]
+        self.raised = active & (wrist_y < 0.5) & (tip_y < wrist_y)
+
+        # Hits are checked along every drawn cursor position...
+        n = self.sweep_count
+        full = active & (n == SWEEP_LENGTH)
+        self.sweep[full, :-1] = self.sweep[full, 1:]
+        n[full] -= 1
+        rows = np.flatnonzero(active)
+        self.sweep[rows, n[rows]] = self.cursor[rows]
+        n[rows] += 1
+
+        # ...while trails keep one point per tracking result.
+        fresh = active & self._fresh
+        self.trail[fresh, :-1] = self.trail[fresh, 1:]
+        self.trail[fresh, -1] = self.cursor[fresh]
+        self.trail_count[fresh] = np.minimum(self.trail_count[fresh] + 1, TRAIL_LENGTH)
+        self._fresh[:] = False
+
+    def trail_points(self, slot):
+        """A player's trail as a list of (x, y), oldest first."""
+        return self.trail[slot, TRAIL_LENGTH - self.trail_count[slot]:].tolist()
+
+    # ---------- collision ----------
+    def sweep_segments(self):
+        """Start, end and owner of every sweep segment of the players in view.
+
+        A player with a single swept point gives one zero-length segment.
+        """
+        n = self.sweep_count[:, np.newaxis]
+        j = np.arange(SWEEP_LENGTH - 1)
+        valid = self.active[:, np.newaxis] & (n > 0) & (j < np.maximum(n - 1, 1))
+        ends = np.where((j + 1 < n)[..., np.newaxis], self.sweep[:, 1:], self.sweep[:, :-1])
+        owners = np.nonzero(valid)[0]
+        return self.sweep[:, :-1][valid], ends[valid], owners
+
+    def position_segments(self):
+        """Zero-length segments at every player's cursor, for point checks.
+
+        Players out of view are where they were last seen.
+        """
+        owners = self.placed_indices()
+        points = self.cursor[owners]
+        return points, points, owners
+
+    def clear_sweeps(self):
+        """Keep only the last swept point; call after simulation steps ran."""
+        rows = np.flatnonzero(self.sweep_count > 1)
+        self.sweep[rows, 0] = self.sweep[rows, self.sweep_count[rows] - 1]
+        self.sweep_count[rows] = 1
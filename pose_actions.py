@@ -0,0 +1,155 @@
+import numpy as np
+
+from landmarks import (LEFT_ELBOW, LEFT_HIP, LEFT_SHOULDER, LEFT_WRIST, NOSE, RIGHT_ELBOW,
+                       RIGHT_HIP, RIGHT_SHOULDER, RIGHT_WRIST)
+
+# ------------------ FEATURE TABLE ------------------
+# (name, landmark, landmark, axis): the offset from the second landmark to
+# the first, in shoulder widths. "up" is up the image, "left" is towards
+# the person's left shoulder (so it holds for mirrored and unmirrored
+# cameras alike) and "dist" is the plain distance.
+POSE_FEATURES = [
+    ("left_wrist_up", LEFT_WRIST, LEFT_SHOULDER, "up"),
+    ("right_wrist_up", RIGHT_WRIST, RIGHT_SHOULDER, "up"),
+    ("left_elbow_up", LEFT_ELBOW, LEFT_SHOULDER, "up"),
+    ("right_elbow_up", RIGHT_ELBOW, RIGHT_SHOULDER, "up"),
+    ("left_wrist_out", LEFT_WRIST, LEFT_SHOULDER, "left"),
+    ("right_wrist_out", RIGHT_SHOULDER, RIGHT_WRIST, "left"),
+    ("left_wrist_over_head", LEFT_WRIST, NOSE, "up"),
+    ("right_wrist_over_head", RIGHT_WRIST, NOSE, "up"),
+    ("wrist_gap", LEFT_WRIST, RIGHT_WRIST, "dist"),
+    ("head_left", NOSE, RIGHT_SHOULDER, "left"),
+    ("head_right", LEFT_SHOULDER, NOSE, "left"),
+    ("left_wrist_to_hip", LEFT_WRIST, LEFT_HIP, "dist"),
+    ("right_wrist_to_hip", RIGHT_WRIST, RIGHT_HIP, "dist"),
+]
+
+# ------------------ ACTION TABLE ------------------
+# (name, {feature: (low, high)}): the action matches while every listed
+# feature is within its bounds (None for no bound). Features an action
+# does not list are ignored. The first three are game1.py's actions; the
+# rest follow the browser dance game's moves.
+POSE_ACTIONS = [
+    ("Raise Right Hand", {"right_wrist_up": (0.0, None), "left_wrist_up": (None, 0.0)}),
+    ("Raise Left Hand", {"left_wrist_up": (0.0, None), "right_wrist_up": (None, 0.0)}),
+    ("Raise Both Hands", {"left_wrist_up": (0.0, None), "right_wrist_up": (0.0, None)}),
+    ("Arms Up", {"left_wrist_over_head": (0.3, None), "right_wrist_over_head": (0.3, None),
+                 "wrist_gap": (0.8, None)}),
+    ("Hands Together Overhead", {"left_wrist_over_head": (0.3, None),
+                                 "right_wrist_over_head": (0.3, None),
+                                 "wrist_gap": (None, 0.5)}),
+    ("Left Arm Out", {"left_wrist_out": (1.0, None), "left_wrist_up": (-0.5, 0.5),
+                      "right_wrist_out": (None, 0.5)}),
+    ("Right Arm Out", {"right_wrist_out": (1.0, None), "right_wrist_up": (-0.5, 0.5),
+                       "left_wrist_out": (None, 0.5)}),
+    ("T Pose", {"left_wrist_out": (1.0, None), "right_wrist_out": (1.0, None),
+                "left_wrist_up": (-0.4, 0.4), "right_wrist_up": (-0.4, 0.4)}),
+    ("Clap", {"wrist_gap": (None, 0.4), "left_wrist_up": (-1.5, 0.5),
+              "right_wrist_up": (-1.5, 0.5)}),
+    ("Elbows Up", {"left_elbow_up": (0.2, None), "right_elbow_up": (0.2, None),
+                   "wrist_gap": (None, 1.0)}),
+    ("Hands On Hips", {"left_wrist_to_hip": (None, 0.5), "right_wrist_to_hip": (None, 0.5)}),
+    ("Look Left", {"head_left": (0.8, None)}),
+    ("Look Right", {"head_right": (0.8, None)}),
+]
+
+AXES = ["up", "left", "dist"]
+
+
+# ------------------ CLASSIFIER ------------------
+class PoseActionClassifier:
+    """Recognizes held poses from a stream of PoseFrames.
+
+    Each result is turned into one feature vector (one fancy-index over
+    the feature table's landmark pairs) and checked against every action
+    at once: the action table is compiled into (actions, features) lower
+    and upper bound matrices. The per-action outcome goes into a ring
+    buffer of the last `window` results, and an action counts as held
+    once it matched in at least `agreement` of the results from the last
+    `hold` seconds, with at least `min_results` of them and results
+    going back at least that far. So one noisy
+    frame cannot score, and a dozen more actions cost a few more matrix
+    rows rather than another branch per frame. Landmarks MediaPipe sees
+    with less than `min_visibility` fail the bounds that use them, except
+    an "up" feature bounded only from above: a hand out of view is
+    usually down below the frame, so it counts as not raised.
+    """
+
+    def __init__(self, table=POSE_ACTIONS, features=POSE_FEATURES, hold=0.3,
+                 agreement=0.8, min_results=3, window=32, min_visibility=0.5):
+        self.names = [row[0] for row in table]
+        self.feature_names = [row[0] for row in features]
+        self.first = np.array([row[1] for row in features], dtype=np.intp)
+        self.second = np.array([row[2] for row in features], dtype=np.intp)
+        self.axis = np.array([AXES.index(row[3]) for row in features], dtype=np.intp)
+        self.hold = hold
+        self.agreement = agreement
+        self.min_results = min_results
+        self.min_visibility = min_visibility
+
+        column = {name: i for i, name in enumerate(self.feature_names)}
+        self.low = np.full((len(table), len(features)), -np.inf, dtype=np.float32)
+        self.high = np.full((len(table), len(features)), np.inf, dtype=np.float32)
+        for i, (_, bounds) in enumerate(table):
+            for feature, (low, high) in bounds.items():
+                if low is not None:
+                    self.low[i, column[feature]] = low
+                if high is not None:
+                    self.high[i, column[feature]] = high
+        self.free = np.isinf(self.low) & np.isinf(self.high)
+        self.hidden_passes = np.isinf(self.low) & (self.axis == AXES.index("up"))
+        self._index = {name: i for i, name in enumerate(self.names)}
+
+        self.features = np.zeros(len(features), dtype=np.float32)
+        self.times = np.full(window, -np.inf)
+        self.matches = np.zeros((window, len(table)), dtype=bool)
+        self.held = np.zeros(len(table), dtype=bool)
+        self._next = 0
+        self._since = None  # time of the first result since the last reset
+
+    def measure(self, pose):
+        """Feature vector of one PoseFrame (or (33, 4) array), in shoulder widths."""
+        points = pose[:, :2]
+        across = points[LEFT_SHOULDER] - points[RIGHT_SHOULDER]
+        width = max(float(np.hypot(*across)), 1e-6)
+        basis = np.array([[0.0, -1.0], across / width, [0.0, 0.0]], dtype=np.float32)
+        delta = points[self.first] - points[self.second]
+        values = np.einsum("ij,ij->i", delta, basis[self.axis])
+        dist = self.axis == 2
+        values[dist] = np.hypot(delta[dist, 0], delta[dist, 1])
+        self.features[:] = values / width
+        visible = np.minimum(pose[self.first, 3], pose[self.second, 3]) >= self.min_visibility
+        self.features[~visible] = np.nan
+        return self.features
+
+    def update(self, pose):
+        """Add one PoseFrame; return the held mask, aligned with self.names."""
+        features = self.measure(pose)
+        # NaN features fail both comparisons, so hidden landmarks only
+        # fail the actions that use them, and not even those where
+        # "not raised" is all that is asked.
+        matched = (((features >= self.low) & (features <= self.high)) | self.free
+                   | (np.isnan(features) & self.hidden_passes))
+        row = self._next % len(self.times)
+        self._next += 1
+        self.matches[row] = matched.all(axis=1)
+        self.times[row] = pose.timestamp
+        if self._since is None:
+            self._since = pose.timestamp
+
+        recent = self.times > pose.timestamp - self.hold
+        count = np.count_nonzero(recent)
+        if count < self.min_results or pose.timestamp - self._since < self.hold:
+            self.held[:] = False
+        else:
+            self.held[:] = self.matches[recent].sum(axis=0) >= self.agreement * count
+        return self.held
+
+    def is_held(self, name):
+        return bool(self.held[self._index[name]])
+
+    def reset(self):
+        """Forget the window, e.g. after an action was scored."""
+        self.times[:] = -np.inf
+        self.held[:] = False
+        self._since = None
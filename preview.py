@@ -0,0 +1,37 @@
+import time
+
+import cv2
+import numpy as np
+import pygame
+
+
+# ------------------ CAMERA PREVIEW ------------------
+class PreviewCompositor:
+    """Camera preview panel backed by one preallocated pixel buffer.
+
+    The Surface is created once with pygame.image.frombuffer over a BGR
+    NumPy array, so cv2.resize writes straight into the pixels pygame blits
+    and no per-frame array or Surface is allocated. Overlays (landmarks)
+    are drawn on `pixels` after update() returns True, i.e. on the small
+    preview instead of the full camera frame. Refreshes are capped at
+    `rate` per second, independent of the game's frame rate.
+    """
+
+    def __init__(self, size, rate=30):
+        self.size = size
+        width, height = size
+        self.pixels = np.zeros((height, width, 3), dtype=np.uint8)
+        self.surface = pygame.image.frombuffer(self.pixels, size, "BGR")
+        self.min_interval = 1.0 / rate if rate else 0.0
+        self.has_frame = False
+        self._last = None
+
+    def update(self, frame, now=None):
+        """Resize a BGR frame into the preview; return True if it refreshed."""
+        now = time.monotonic() if now is None else now
+        if self._last is not None and now - self._last < self.min_interval:
+            return False
+        self._last = now
+        cv2.resize(frame, self.size, dst=self.pixels)
+        self.has_frame = True
+        return True
@@ -0,0 +1,102 @@
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+# One step of the tracking quality ladder: MediaPipe model_complexity,
+# inference input width in pixels (0 for the camera's own) and how many
+# camera frames there are per inference (2 = every other frame).
+QualityLevel = namedtuple("QualityLevel", ["model_complexity", "inference_width", "infer_every"])
+
+# Best first. Each step roughly trims a quarter to a half off the
+# tracking cost; skipping frames comes last since it costs latency.
+QUALITY_LEVELS = [
+    QualityLevel(1, 0, 1),
+    QualityLevel(1, 640, 1),
+    QualityLevel(0, 640, 1),
+    QualityLevel(0, 480, 1),
+    QualityLevel(0, 480, 2),
+    QualityLevel(0, 320, 2),
+    QualityLevel(0, 320, 3),
+]
+
+
+# ------------------ QUALITY CONTROLLER ------------------
+class QualityController:
+    """Trades tracking quality for frame time, in both directions.
+
+    The game loop reports how long each frame's own work took
+    (record_frame) and the tracker's total inference time so far; once
+    per `interval` seconds update() compares the 90th percentile frame
+    time with frame_budget and the share of a core spent on inference
+    with max_load. If either is over, tracking drops one level; only
+    after `raise_after` intervals in a row with both under `headroom` of
+    their budget does it climb back, so it does not oscillate around a
+    budget it only just meets.
+    """
+
+    def __init__(self, frame_budget, max_load=0.5, levels=QUALITY_LEVELS, start=0,
+                 interval=1.0, headroom=0.6, raise_after=3):
+        self.frame_budget = frame_budget
+        self.max_load = max_load
+        self.levels = levels
+        self.level = start
+        self.interval = interval
+        self.headroom = headroom
+        self.raise_after = raise_after
+        self._frames = []
+        self._calm = 0
+        self._window_start = None
+        self._busy_start = 0.0
+
+    @property
+    def quality(self):
+        return self.levels[self.level]
+
+    def record_frame(self, seconds):
+        self._frames.append(seconds)
+
+    def update(self, now, busy_time):
+        """Return the new QualityLevel if the level changed, else None.
+
+        busy_time is the tracker's running total of inference seconds.
+        """
+        if self._window_start is None:
+            self._window_start, self._busy_start = now, busy_time
+            return None
+        elapsed = now - self._window_start
+        if elapsed < self.interval or not self._frames:
+            return None
+
+        frame_time = float(np.percentile(self._frames, 90))
+        load = (busy_time - self._busy_start) / elapsed
+        self._frames.clear()
+        self._window_start, self._busy_start = now, busy_time
+
+        over = frame_time > self.frame_budget or load > self.max_load
+        calm = (frame_time < self.frame_budget * self.headroom
+                and load < self.max_load * self.headroom)
+        self._calm = self._calm + 1 if calm else 0
+        if over and self.level < len(self.levels) - 1:
+            self.level += 1
+        elif self._calm >= self.raise_after and self.level > 0:
+            self.level -= 1
+            self._calm = 0
+        else:
+            return None
+        print(f"tracking quality {self.level}: {self.quality} "
+              f"(frame p90 {frame_time * 1000:.1f} ms, inference load {load:.0%})",
+              file=sys.stderr)
+        return self.quality
+
+
+def add_quality_arguments(parser):
+    """Add --quality and --max-load to a game's argument parser."""
+    parser.add_argument("--quality", default="auto",
+                        choices=["auto"] + [str(i) for i in range(len(QUALITY_LEVELS))],
+                        help="tracking quality level, 0 best; auto (default) lowers it "
+                             "while frames miss their budget and raises it again when "
+                             "there is headroom")
+    parser.add_argument("--max-load", type=float, default=0.5, metavar="CORES",
+                        help="auto quality: most of a CPU core inference may use "
+                             "(default 0.5)")
@@ -0,0 +1,185 @@
+"""Compact landmark recordings and a deterministic replay tracker.
+
+File layout: a 16-byte header followed by fixed-size little-endian records,
+one per tracking result, so a recording can be memory-mapped straight into
+a NumPy structured array:
+
+    header  magic b"HLMK", uint16 version, uint16 max_hands, 8 bytes reserved
+    record  float64 t, uint8 hand_count, uint8 pose_present,
+            float32 hands[max_hands][21][3], float32 pose[33][4]
+"""
+import os
+import struct
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from landmarks import HAND_SHAPE, POSE_SHAPE, array_to_results, results_to_array
+
+MAGIC = b"HLMK"
+VERSION = 1
+HEADER = struct.Struct("<4sHH8x")
+
+
+def record_dtype(max_hands):
+    """Structured dtype of one record for a file holding up to max_hands hands."""
+    return np.dtype([
+        ("t", "<f8"),
+        ("hand_count", "u1"),
+        ("pose_present", "u1"),
+        ("hands", "<f4", (max_hands,) + HAND_SHAPE),
+        ("pose", "<f4", POSE_SHAPE),
+    ])
+
+
+def load_recording(path):
+    """Memory-map a recording and return its records as a structured array."""
+    with open(path, "rb") as f:
+        magic, version, max_hands = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("%s is not a landmark recording" % path)
+    return np.memmap(path, dtype=record_dtype(max_hands), mode="r", offset=HEADER.size)
+
+
+def fill_record(rec, timestamp, results):
+    """Store a timestamp and MediaPipe results in a zero-dimensional record."""
+    rec["t"] = timestamp
+    rec["hand_count"] = results_to_array("hands", results, rec["hands"])
+    rec["pose_present"] = results_to_array("pose", results, rec["pose"][np.newaxis])
+
+
+def record_results(rec):
+    """Rebuild MediaPipe-style results (hands and pose) from one record."""
+    hands = array_to_results("hands", rec["hands"], int(rec["hand_count"]))
+    pose = array_to_results("pose", rec["pose"][np.newaxis], int(rec["pose_present"]))
+    return SimpleNamespace(multi_hand_landmarks=hands.multi_hand_landmarks,
+                           pose_landmarks=pose.pose_landmarks)
+
+
+# ------------------ RECORDER ------------------
+class LandmarkRecorder:
+    """Appends one record per tracking result to a recording file.
+
+    With resume=True an existing recording with the same max_hands is
+    kept and appended to, minus any record cut short at its end; `count`
+    is the number of records in the file.
+    """
+
+    def __init__(self, path, max_hands=1, resume=False):
+        self._record = np.zeros((), dtype=record_dtype(max_hands))
+        self.count = 0
+        if resume and self._reopen(path, max_hands):
+            return
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, max_hands))
+
+    def _reopen(self, path, max_hands):
+        try:
+            f = open(path, "r+b")
+        except FileNotFoundError:
+            return False
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size or HEADER.unpack(header) != (MAGIC, VERSION, max_hands):
+            f.close()
+            return False
+        size = f.seek(0, os.SEEK_END) - HEADER.size
+        self.count = size // self._record.itemsize
+        f.truncate(HEADER.size + self.count * self._record.itemsize)
+        f.seek(0, os.SEEK_END)
+        self.file = f
+        return True
+
+    def write(self, timestamp, results):
+        fill_record(self._record, timestamp, results)
+        self.file.write(self._record.tobytes())
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecordingTracker:
+    """Wraps a tracker and records every result it produces."""
+
+    def __init__(self, tracker, recorder):
+        self.tracker = tracker
+        self.recorder = recorder
+
+    @property
+    def finished(self):
+        return self.tracker.finished
+
+    @property
+    def frame_time(self):
+        return self.tracker.frame_time
+
+    def __getattr__(self, name):
+        # Anything else (set_quality, busy_time, ...) is the wrapped tracker's.
+        return getattr(self.tracker, name)
+
+    def read(self):
+        item = self.tracker.read()
+        if item is not None:
+            self.recorder.write(time.monotonic(), item[1])
+        return item
+
+    def close(self):
+        self.tracker.close()
+        self.recorder.close()
+
+
+# ------------------ REPLAY ------------------
+class ReplayTracker:
+    """Plays a recording back in place of the camera and MediaPipe.
+
+    Has the same read()/close() interface as capture.CameraTracker. With
+    realtime=True results are paced by their recorded timestamps, otherwise
+    they are returned as fast as they are read. Frames are blank, so the
+    games still have something to draw the landmarks on. wait_time adds
+    up the seconds spent pacing.
+    """
+
+    def __init__(self, path, realtime=True, loop=False, frame_shape=(480, 640, 3)):
+        self.records = load_recording(path)
+        self.realtime = realtime
+        self.loop = loop
+        self.frame_shape = frame_shape
+        self.index = 0
+        self.finished = len(self.records) == 0
+        self.frame_time = time.monotonic()
+        self.wait_time = 0.0
+        self._start = None
+
+    def read(self):
+        """Return (frame, results) for the next record, or None at the end."""
+        if self.index >= len(self.records):
+            if not self.loop or len(self.records) == 0:
+                self.finished = True
+                return None
+            self.index = 0
+            self._start = None
+        rec = self.records[self.index]
+
+        if self.realtime:
+            now = time.monotonic()
+            if self._start is None:
+                self._start = now - (rec["t"] - self.records[0]["t"])
+            delay = self._start + (rec["t"] - self.records[0]["t"]) - now
+            if delay > 0:
+                time.sleep(delay)
+                self.wait_time += delay
+        self.index += 1
+        self.frame_time = time.monotonic()
+
+        return np.zeros(self.frame_shape, dtype=np.uint8), record_results(rec)
+
+    def close(self):
+        # Drop the memory map; later reads just report the end.
+        self.records = np.zeros(0, dtype=self.records.dtype)
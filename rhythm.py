@@ -0,0 +1,322 @@
+"""Beat maps for music tracks and a scheduler that runs on the audio clock.
+
+A track is decoded and analyzed once; the result is cached next to it as
+`<track>.beats.json`, keyed by the SHA-1 of the track's bytes, so later
+launches only hash the file. Pre-analyze with:
+
+    python rhythm.py music.mp3
+"""
+import argparse
+import hashlib
+import json
+import sys
+import time
+
+import numpy as np
+import pygame
+
+CACHE_VERSION = 1
+HOP = 512          # samples between onset envelope frames
+WINDOW = 1024      # FFT size
+MIN_BPM, MAX_BPM = 60.0, 180.0
+
+
+# ------------------ BEAT MAP ------------------
+class BeatMap:
+    """Beat times (seconds from the start of the track) and its length.
+
+    Times are for one pass through the track; beat(i) continues them
+    across loops, since the games loop their music.
+    """
+
+    def __init__(self, beats, duration, tempo):
+        self.beats = np.asarray(beats, dtype=np.float64)
+        self.duration = float(duration)
+        self.tempo = float(tempo)
+
+    @classmethod
+    def steady(cls, tempo, duration=60.0):
+        """A fixed-tempo grid, for playing without music."""
+        period = 60.0 / tempo
+        return cls(np.arange(0.0, duration, period), duration, tempo)
+
+    @property
+    def period(self):
+        return 60.0 / self.tempo
+
+    def beat(self, index):
+        """Time of beat `index`, counting on through repeats of the track."""
+        loop, i = divmod(index, len(self.beats))
+        return loop * self.duration + self.beats[i]
+
+    def next_beat(self, t):
+        """Index of the first beat at or after time t."""
+        loop = int(t // self.duration)
+        i = int(np.searchsorted(self.beats, t - loop * self.duration))
+        return loop * len(self.beats) + i
+
+    def to_json(self, digest):
+        return {
+            "version": CACHE_VERSION,
+            "sha1": digest,
+            "duration": round(self.duration, 4),
+            "tempo": round(self.tempo, 3),
+            "beats": np.round(self.beats, 4).tolist(),
+        }
+
+
+# ------------------ ANALYSIS ------------------
+def decode(path):
+    """A track as mono float32 samples in [-1, 1] plus their rate, via pygame.mixer."""
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+    rate, size = pygame.mixer.get_init()[:2]
+    samples = pygame.sndarray.array(pygame.mixer.Sound(path))
+    floats = samples.dtype.kind == "f"  # a float32 mixer (size -32)
+    samples = samples.astype(np.float32)
+    if samples.ndim == 2:
+        samples = samples.mean(axis=1)
+    if floats:
+        return samples, rate
+    # Integer samples of abs(size) bits, unsigned for a positive size.
+    half = float(2 ** (abs(size) - 1))
+    if size > 0:
+        samples -= half
+    return samples / half, rate
+
+
+def onset_envelope(samples, rate):
+    """Spectral flux per HOP samples: how much louder each band just got."""
+    count = max(0, (len(samples) - WINDOW) // HOP + 1)
+    window = np.hanning(WINDOW).astype(np.float32)
+    # Roughly mel weighting: each octave counts about the same, so a kick
+    # drum's few low bins are not drowned out by a hi-hat's hundreds.
+    freqs = np.fft.rfftfreq(WINDOW, 1.0 / rate)
+    weights = (1.0 / np.maximum(freqs, 200.0)).astype(np.float32)
+    envelope = np.zeros(count, dtype=np.float32)
+    previous = None
+    # Blocks of frames keep the STFT's memory bounded on long tracks.
+    for start in range(0, count, 2048):
+        stop = min(count, start + 2048)
+        frames = np.lib.stride_tricks.as_strided(
+            samples[start * HOP:], shape=(stop - start, WINDOW),
+            strides=(HOP * samples.strides[0], samples.strides[0]))
+        spectrum = np.log1p(100.0 * np.abs(np.fft.rfft(frames * window, axis=1)))
+        if previous is not None:
+            spectrum = np.vstack([previous, spectrum])
+        flux = np.maximum(np.diff(spectrum, axis=0), 0.0) @ weights
+        envelope[start + (previous is None):stop] = flux
+        previous = spectrum[-1:]
+    # Remove the local mean (about half a second) so loud passages do not
+    # outweigh quiet ones.
+    width = max(1, int(0.5 * rate / HOP))
+    local = np.convolve(envelope, np.ones(width) / width, mode="same")
+    return np.maximum(envelope - local, 0.0)
+
+
+def estimate_period(envelope, rate):
+    """Beat period in envelope frames, from its autocorrelation."""
+    env = envelope - envelope.mean()
+    spectrum = np.fft.rfft(env, 2 * len(env))
+    corr = np.fft.irfft(spectrum * np.conj(spectrum))[:len(env)]
+    frames_per_second = rate / HOP
+    lags = np.arange(len(corr), dtype=np.float64)
+    lo = int(frames_per_second * 60.0 / MAX_BPM)
+    hi = min(len(corr) - 2, int(frames_per_second * 60.0 / MIN_BPM) + 1)
+    # Lean towards ~120 BPM, where octave errors are least likely.
+    bpm = 60.0 * frames_per_second / np.maximum(lags, 1.0)
+    weighted = corr * np.exp(-0.5 * np.log2(bpm / 120.0) ** 2)
+    lag = lo + int(np.argmax(weighted[lo:hi]))
+    # Parabolic peak interpolation for a sub-frame period.
+    a, b, c = corr[lag - 1], corr[lag], corr[lag + 1]
+    shift = 0.5 * (a - c) / (a - 2 * b + c) if a - 2 * b + c < 0 else 0.0
+    return lag + float(np.clip(shift, -0.5, 0.5))
+
+
+def fit_grid(envelope, period):
+    """Best (period, phase) of an evenly spaced beat grid near `period`.
+
+    Every period within a frame of the estimate, in hundredths of a
+    frame, and every phase, in half frames, is scored by the mean onset
+    strength under its beats. That keeps a long track's grid on its beats
+    where a period off by a fraction of a frame would drift off them.
+    """
+    smooth = np.convolve(envelope, np.ones(3) / 3, mode="same")
+    best = (-1.0, period, 0.0)
+    for candidate in period + np.linspace(-1.0, 1.0, 201):
+        count = int(len(smooth) / candidate) - 1
+        phases = np.arange(0.0, candidate, 0.5)
+        index = np.rint(phases[:, np.newaxis] + candidate * np.arange(count)).astype(np.intp)
+        scores = smooth[index].mean(axis=1)
+        i = int(np.argmax(scores))
+        if scores[i] > best[0]:
+            best = (float(scores[i]), float(candidate), float(phases[i]))
+    return best[1], best[2]
+
+
+def analyze(samples, rate):
+    """Tempo and beat grid of a decoded track.
+
+    Autocorrelation gives a rough period, fit_grid a precise period and
+    phase; a least-squares fit to the strongest onset near each beat then
+    takes out what is left of the error.
+    """
+    duration = len(samples) / rate
+    envelope = onset_envelope(samples, rate)
+    if len(envelope) < 4 * rate / HOP or not envelope.any():
+        return BeatMap.steady(120.0, duration)
+
+    period, phase = fit_grid(envelope, estimate_period(envelope, rate))
+    grid = phase + period * np.arange(int((len(envelope) - phase) / period))
+
+    # Strongest onset within an eighth of a beat of each grid point.
+    reach = max(1, int(period / 8))
+    peaks = []
+    for index, position in enumerate(grid):
+        lo = max(0, int(round(position)) - reach)
+        window = envelope[lo:int(round(position)) + reach + 1]
+        if window.size and window.max() > 0:
+            peaks.append((index, lo + int(np.argmax(window))))
+    if len(peaks) >= 8:
+        index, position = np.array(peaks, dtype=np.float64).T
+        period, phase = np.polyfit(index, position, 1)
+
+    seconds_per_frame = HOP / rate
+    # Envelope frame k is centred on sample k * HOP + WINDOW / 2.
+    first = phase * seconds_per_frame + WINDOW / 2 / rate
+    step = period * seconds_per_frame
+    first -= step * np.floor(first / step)
+    beats = np.arange(first, duration, step)
+    return BeatMap(beats, duration, 60.0 / step)
+
+
+# ------------------ CACHE ------------------
+def cache_path(path):
+    return path + ".beats.json"
+
+
+def file_digest(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_beat_map(path):
+    """The track's beat map, from its cache when the track is unchanged.
+
+    Analyzes and writes the cache otherwise; a read-only folder only
+    means the analysis runs again next time.
+    """
+    digest = file_digest(path)
+    try:
+        with open(cache_path(path)) as f:
+            cached = json.load(f)
+        if (cached.get("version") == CACHE_VERSION and cached.get("sha1") == digest
+                and cached["beats"] and cached["duration"] > 0):
+            return BeatMap(cached["beats"], cached["duration"], cached["tempo"])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    start = time.perf_counter()
+    beat_map = analyze(*decode(path))
+    print(f"analyzed {path}: {beat_map.tempo:.1f} BPM, {len(beat_map.beats)} beats "
+          f"in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+    try:
+        with open(cache_path(path), "w") as f:
+            json.dump(beat_map.to_json(digest), f)
+    except OSError as e:
+        print(f"could not cache beat map: {e}", file=sys.stderr)
+    return beat_map
+
+
+# ------------------ AUDIO CLOCK ------------------
+class AudioClock:
+    """Playback position of pygame.mixer.music in seconds, read smoothly.
+
+    get_pos() only moves when the mixer hands the sound card another
+    buffer, in steps of 10-50 ms, and each reading is already a little
+    stale. The clock runs on time.monotonic() between readings, jumps
+    forward to any reading that is ahead of it and drifts slowly towards
+    readings that are behind, so it follows the latest buffer edge
+    without stepping by a whole buffer every few frames. `latency` is how
+    long sound takes from the mixer to the speakers; it is subtracted so
+    the clock says what the player is hearing. Until the music plays (or
+    with no music at all) the clock counts from its creation.
+    """
+
+    RESYNC = 0.1  # seconds of disagreement treated as a seek or restart
+
+    def __init__(self, latency=0.0, get_pos=None):
+        self.latency = latency
+        self._get_pos = get_pos or pygame.mixer.music.get_pos
+        self._offset = -time.monotonic()  # audio position minus monotonic time
+        self._last_pos = None
+        self._synced = False
+
+    def _sync(self, mono):
+        pos = self._get_pos()
+        if pos < 0 or pos == self._last_pos:
+            return
+        self._last_pos = pos
+        estimate = pos / 1000.0 - mono
+        if not self._synced or abs(estimate - self._offset) > self.RESYNC:
+            self._offset = estimate
+            self._synced = True
+        elif estimate > self._offset:
+            self._offset = estimate
+        else:
+            self._offset += 0.02 * (estimate - self._offset)
+
+    def now(self):
+        mono = time.monotonic()
+        self._sync(mono)
+        return self.at(mono)
+
+    def at(self, mono):
+        """Audio position heard at monotonic time `mono`, e.g. a frame's capture time."""
+        return mono + self._offset - self.latency
+
+
+# ------------------ SCHEDULER ------------------
+class RhythmScheduler:
+    """Action windows that start and end on beats.
+
+    Each action gets the whole number of beats closest to
+    `action_seconds`; its window opens on the next beat and closes
+    beats_per_action beats later. All times are audio clock seconds.
+    """
+
+    def __init__(self, beat_map, action_seconds=5.0):
+        self.beat_map = beat_map
+        self.beats_per_action = max(1, int(round(action_seconds / beat_map.period)))
+        self.start = self.deadline = 0.0
+
+    def next_window(self, t):
+        """Open the next action window after time t; return its deadline."""
+        first = self.beat_map.next_beat(t)
+        self.start = self.beat_map.beat(first)
+        self.deadline = self.beat_map.beat(first + self.beats_per_action)
+        return self.deadline
+
+    def beat_phase(self, t):
+        """0 on a beat, rising to 1 just before the next one."""
+        index = self.beat_map.next_beat(t)
+        nxt = self.beat_map.beat(index)
+        prev = self.beat_map.beat(index - 1) if index > 0 else nxt - self.beat_map.period
+        return 1.0 - (nxt - t) / max(nxt - prev, 1e-6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a music track and cache its beat map.")
+    parser.add_argument("tracks", nargs="+", help="audio files pygame.mixer can load")
+    args = parser.parse_args()
+    for path in args.tracks:
+        beat_map = load_beat_map(path)
+        print(f"{path}: {beat_map.tempo:.1f} BPM, {len(beat_map.beats)} beats, "
+              f"{beat_map.duration:.1f} s -> {cache_path(path)}")
+
+
+if __name__ == "__main__":
+    main()
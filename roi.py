@@ -0,0 +1,87 @@
+import cv2
+import numpy as np
+
+
+# ------------------ ROI HAND TRACKING ------------------
+class RoiHands:
+    """Single-hand graph that runs inference on a crop around the last hand.
+
+    After a frame with a confident hand, the next frame is cut down to a
+    padded square around that hand's landmarks and scaled to crop_size
+    pixels, so the crop graph only ever sees a small image. Its landmarks
+    are mapped back to full-frame normalized coordinates. If the crop finds
+    no hand, or its score drops below min_score, the same frame is run
+    through the full-frame graph instead. Has the same process()/close()
+    interface as a MediaPipe Hands graph.
+    """
+
+    def __init__(self, full_graph, crop_graph, crop_size=256, padding=0.5, min_score=0.5):
+        self.full_graph = full_graph
+        self.crop_graph = crop_graph
+        self.crop_size = crop_size
+        self.padding = padding
+        self.min_score = min_score
+        self.crop = np.zeros((crop_size, crop_size, 3), dtype=np.uint8)
+        self._crop_view = self.crop.view()
+        self._crop_view.flags.writeable = False
+        self._box = None  # (x0, y0, side) in pixels of the last hand
+        self.crop_frames = 0
+        self.full_frames = 0
+
+    def _confident(self, results):
+        if not results.multi_hand_landmarks:
+            return False
+        handedness = getattr(results, "multi_handedness", None)
+        if handedness:
+            return handedness[0].classification[0].score >= self.min_score
+        return True
+
+    def _track(self, results, width, height):
+        """Remember the padded square around the first hand, in pixels."""
+        landmarks = results.multi_hand_landmarks[0].landmark
+        xs = [lm.x * width for lm in landmarks]
+        ys = [lm.y * height for lm in landmarks]
+        left, right, top, bottom = min(xs), max(xs), min(ys), max(ys)
+        side = max(right - left, bottom - top) * (1 + 2 * self.padding)
+        side = max(side, self.crop_size / 4)
+        cx, cy = (left + right) / 2, (top + bottom) / 2
+        self._box = (cx - side / 2, cy - side / 2, side)
+
+    def _process_crop(self, rgb):
+        x0, y0, side = self._box
+        scale = self.crop_size / side
+        warp = np.float32([[scale, 0, -x0 * scale], [0, scale, -y0 * scale]])
+        # Parts of the box outside the frame come out black.
+        cv2.warpAffine(rgb, warp, (self.crop_size, self.crop_size), dst=self.crop,
+                       flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT)
+        return self.crop_graph.process(self._crop_view)
+
+    def _to_full_frame(self, results, width, height):
+        x0, y0, side = self._box
+        for hand in results.multi_hand_landmarks:
+            for lm in hand.landmark:
+                lm.x = (x0 + lm.x * side) / width
+                lm.y = (y0 + lm.y * side) / height
+                lm.z = lm.z * side / width
+
+    def process(self, rgb):
+        height, width = rgb.shape[:2]
+        if self._box is not None:
+            results = self._process_crop(rgb)
+            if self._confident(results):
+                self.crop_frames += 1
+                self._to_full_frame(results, width, height)
+                self._track(results, width, height)
+                return results
+
+        self.full_frames += 1
+        results = self.full_graph.process(rgb)
+        if self._confident(results):
+            self._track(results, width, height)
+        else:
+            self._box = None
+        return results
+
+    def close(self):
+        self.full_graph.close()
+        self.crop_graph.close()
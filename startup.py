@@ -0,0 +1,136 @@
+"""Startup timing, lazy imports and the loading screen shared by the games.
+
+Import this module before anything heavy: the startup report's clock
+starts when it is imported, so its "imports" mark covers the script's
+own imports.
+"""
+import importlib
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+IMPORTED = time.perf_counter()
+
+STAGE_LABELS = {
+    "mediapipe": "Loading MediaPipe",
+    "camera": "Opening camera",
+    "model": "Building tracking model",
+    "warm-up": "Warming up",
+    "music": "Analyzing music",
+}
+
+
+# ------------------ LAZY MODULES ------------------
+class LazyModule:
+    """Stands in for a module until it is first used.
+
+    load() imports it ahead of time, e.g. on a background thread while
+    the window is already up.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+
+# ------------------ STARTUP REPORT ------------------
+class StartupReport:
+    """Times the phases of a game's startup.
+
+    Stages (camera, model, ...) can run on any thread, side by side, and
+    record how long they took; marks (window, first frame) record when
+    something happened, in seconds since this module was imported.
+    lines() describes what is done and what is still running, for a
+    loading screen.
+    """
+
+    def __init__(self, start=IMPORTED):
+        self.start = start
+        self.marks = {}
+        self.stages = {}
+        self.active = []
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        """Record the first time `name` happened."""
+        self.marks.setdefault(name, time.perf_counter() - self.start)
+
+    @contextmanager
+    def stage(self, name):
+        begin = time.perf_counter()
+        with self._lock:
+            self.active.append(name)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.active.remove(name)
+                self.stages[name] = time.perf_counter() - begin
+
+    def lines(self):
+        with self._lock:
+            done = list(self.stages.items())
+            active = list(self.active)
+        lines = [f"{STAGE_LABELS.get(name, name)}: {seconds:.1f} s" for name, seconds in done]
+        lines += [f"{STAGE_LABELS.get(name, name)}..." for name in active]
+        return lines
+
+    def summary(self):
+        """Marks and stage durations in seconds, for --stats."""
+        with self._lock:
+            stages = dict(self.stages)
+        return {
+            "marks": {name: round(t, 3) for name, t in self.marks.items()},
+            "stages": {name: round(t, 3) for name, t in stages.items()},
+        }
+
+    def print(self, file=sys.stderr):
+        summary = self.summary()
+        marks = ", ".join(f"{name} at {t:.2f} s" for name, t in summary["marks"].items())
+        stages = ", ".join(f"{name} {t:.2f} s" for name, t in summary["stages"].items())
+        print(f"startup: {marks}; {stages}", file=file)
+
+
+# ------------------ LOADING SCREEN ------------------
+def draw_loading(surface, rect, font, report, title="Starting camera...",
+                 color=(255, 255, 255)):
+    """Draw the report's progress lines centred in `rect`."""
+    from text_cache import render_text
+    lines = [title] + report.lines()
+    height = font.get_linesize()
+    y = rect.centery - height * len(lines) // 2
+    for i, line in enumerate(lines):
+        text = render_text(font, line, color if i == 0 else (180, 180, 180))
+        surface.blit(text, (rect.centerx - text.get_width() // 2, y))
+        y += height
+
+
+def wait_until_ready(worker, surface, font, clock, background=(30, 30, 70), pending=()):
+    """Keep the window painted and responsive until the worker's tracker is up.
+
+    Also waits for the `pending` futures, other loading done in the
+    background. Exits if the window is closed; re-raises an error from
+    opening the tracker.
+    """
+    import pygame
+    while not worker.ready.is_set() or not all(job.done() for job in pending):
+        worker.check()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                worker.stop()
+                pygame.quit()
+                sys.exit()
+        surface.fill(background)
+        draw_loading(surface, surface.get_rect(), font, worker.report)
+        pygame.display.update()
+        clock.tick(30)
+    worker.check()
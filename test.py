@@ -4,32 +4,25 @@ import numpy as np
 import uuid
 import os
 
+from capture import FramePreprocessor
+from frame_sources import open_source
 
 mp_drawing = mp.solutions.drawing_utils
 mp_hands = mp.solutions.hands
-cap = cv2.VideoCapture(0)
+cap = open_source("camera:0")
+prep = FramePreprocessor()
 
 with mp_hands.Hands(min_detection_confidence=0.8, min_tracking_confidence=0.5) as hands: 
-    while cap.isOpened():
-        ret, frame = cap.read()
-        
-        # BGR 2 RGB
-        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Flip on horizontal
-        image = cv2.flip(image, 1)
-        
-        # Set flag
-        image.flags.writeable = False
-        
-        # Detections
-        results = hands.process(image)
+    while not cap.finished:
+        frame = prep.read(cap)
+        if frame is None:
+            break
         
-        # Set flag to true
-        image.flags.writeable = True
+        # Flip on horizontal (BGR, drawn on below)
+        image = prep.mirror(frame)
         
-        # RGB 2 BGR
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        # Detections on a read-only RGB view, no per-frame copies
+        results = hands.process(prep.to_rgb(image))
         
         # Detections
         print(results)
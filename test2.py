@@ -1,86 +1,135 @@
-import cv2
-import mediapipe as mp
-import pyautogui
-import numpy as np
+# First, so the startup report's clock covers the imports below.
+from startup import LazyModule, StartupReport
 
-mp_hands = mp.solutions.hands
-mp_drawing = mp.solutions.drawing_utils
+import cv2
+import argparse
+import time
+from contextlib import closing
+
+from capture import add_tracking_arguments, open_tracker
+from filters import add_filter_arguments, make_filter
+from gestures import GestureClassifier
+from input_dispatch import EdgeTrigger, InputDispatcher
+from landmarks import INDEX_TIP, hand_frames
+from perf import FrameStats, add_benchmark_arguments
+
+parser = argparse.ArgumentParser(description="Hand Mouse Control")
+add_tracking_arguments(parser)
+add_benchmark_arguments(parser, fps=False)
+add_filter_arguments(parser)
+parser.add_argument("--headless", action="store_true",
+                    help="open no window and send no mouse or keyboard input")
+parser.add_argument("--mouse-rate", type=float, default=60, metavar="HZ",
+                    help="most cursor moves sent per second (default 60)")
+args = parser.parse_args()
+startup = StartupReport()
+startup.mark("imports")
+
+# Only needed to draw the preview, so not imported for --headless runs
+# that track through a replay or the daemon.
+mp_hands = LazyModule("mediapipe.python.solutions.hands")
+mp_drawing = LazyModule("mediapipe.python.solutions.drawing_utils")
 # Screen resolution
-screen_w, screen_h = pyautogui.size()
-
-cap = cv2.VideoCapture(0)
-
-with mp_hands.Hands(
-        max_num_hands=1,
+if args.headless:
+    # No display to control; pretend to drive a 1080p screen.
+    pyautogui = None
+    screen_w, screen_h = 1920, 1080
+else:
+    import pyautogui
+    screen_w, screen_h = pyautogui.size()
+
+# Mouse and keyboard input is sent from a background thread, so the
+# tracking loop never waits on the OS.
+dispatcher = None
+if pyautogui is not None:
+    dispatcher = InputDispatcher(pyautogui, args.mouse_rate)
+    dispatcher.start()
+
+# Each gesture fires once per pinch, not on every frame it is held
+GESTURE_MESSAGES = {
+    "click": "click",
+    "right_click": "right click",
+    "select_all": "selected all",
+    "copy": "copied",
+    "paste": "pasted",
+}
+triggers = {name: EdgeTrigger() for name in GESTURE_MESSAGES}
+classifier = GestureClassifier()
+
+with closing(open_tracker(
+        args, "hands",
+        max_items=1,
+        report=startup,
         min_detection_confidence=0.8,
-        min_tracking_confidence=0.5) as hands:
-
-    while True:
-        ret, frame = cap.read()
-        frame = cv2.flip(frame, 1)
+        min_tracking_confidence=0.5)) as tracker:
+    warm_up = getattr(tracker, "warm_up", None)
+    if warm_up is not None:
+        with startup.stage("warm-up"):
+            warm_up()
+
+    stats = FrameStats.from_args(args)
+    stats.startup = startup
+    # Smooths the cursor without the lag of a moving average
+    cursor_filter = make_filter(args.filter)
+
+    while stats.next_frame():
+        item = tracker.read()
+        if item is None:
+            if tracker.finished:
+                break
+            continue
+        frame, results = item
+        if "first frame" not in startup.marks:
+            startup.mark("first frame")
+            startup.print()
+        stats.lap("tracker")
         h, w, _ = frame.shape
 
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(rgb)
-
+        gesture = None
         if results.multi_hand_landmarks:
-            hand = results.multi_hand_landmarks[0]
-
-            # Index finger tip landmark
-            index_tip = hand.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-            thumb_tip=hand.landmark[mp_hands.HandLandmark.THUMB_TIP]
-            middle_tip=hand.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_TIP]
-            little_tip=hand.landmark[mp_hands.HandLandmark.PINKY_TIP]
-            index_dip=hand.landmark[mp_hands.HandLandmark.INDEX_FINGER_DIP]
-            ring_tip=hand.landmark[mp_hands.HandLandmark.RING_FINGER_TIP]
-
-            # Calculate distances
-
-            dist=np.hypot((thumb_tip.x-index_tip.x),(thumb_tip.y-index_tip.y))
-            dist1=np.hypot((thumb_tip.x-middle_tip.x),(thumb_tip.y-middle_tip.y))
-            dist2=np.hypot((thumb_tip.x-little_tip.x),(thumb_tip.y-little_tip.y ))
-            dist3=np.hypot((thumb_tip.x-index_dip.x),(thumb_tip.y-index_dip.y ))
-            dist4=np.hypot((thumb_tip.x-ring_tip.x),(thumb_tip.y-ring_tip.y ))
-
-
-            # Convert to screen coordinates
-            x = int(index_tip.x * screen_w)
-            y = int(index_tip.y * screen_h)
+            # Decoded once per detection; every pinch in the gesture table
+            # is measured from it in one pass
+            hand = hand_frames(results, tracker.frame_time)[0]
+            gesture = classifier.classify(hand)
+
+            # Filter the index finger tip, then convert to screen coordinates
+            now = time.monotonic()
+            cursor_filter.update(hand[INDEX_TIP, :2], now)
+            fx, fy = cursor_filter.predict(now + args.predict_ms / 1000.0)
+            x = int(fx * screen_w)
+            y = int(fy * screen_h)
 
             if results.multi_hand_landmarks:
-                for num, hand in enumerate(results.multi_hand_landmarks):
-                    mp_drawing.draw_landmarks(frame, hand, mp_hands.HAND_CONNECTIONS, 
+                for num, hand_landmarks in enumerate(results.multi_hand_landmarks):
+                    mp_drawing.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS, 
                                             mp_drawing.DrawingSpec(color=(121, 22, 76), thickness=2, circle_radius=4),
                                             mp_drawing.DrawingSpec(color=(250, 44, 250), thickness=2, circle_radius=2),
                                             )
+        else:
+            cursor_filter.reset()
 
-            # Move mouse
-            pyautogui.moveTo(x, y)
-
-            #other functions
-
-            if dist < 0.03:
-                pyautogui.click()
-                print("click")
-            elif dist1 < 0.03:
-                pyautogui.rightClick()
-                print("right click")
-            elif dist3 < 0.03:
-                pyautogui.typewrite(['ctrl','a'])
-                print("selected all")
-            elif dist2 < 0.03:
-                pyautogui.typewrite(['ctrl','c'])
-                print("copied")
-            elif dist4<0.03:
-                pyautogui.typewrite(['ctrl','v'])
-                print("pasted")
-            
+        stats.lap("gesture")
 
+        if results.multi_hand_landmarks and dispatcher is not None:
+            # Move mouse
+            dispatcher.move(x, y)
 
+        now = time.monotonic()
+        for name, trigger in triggers.items():
+            if trigger.update(gesture == name, now) and dispatcher is not None:
+                dispatcher.send(name)
+                print(GESTURE_MESSAGES[name])
+        stats.lap("input")
 
+        if args.headless:
+            continue
         cv2.imshow("Hand Mouse Control", frame)
-        if cv2.waitKey(10) & 0xFF == ('q'): 
+        if cv2.waitKey(1) & 0xFF == ('q'): 
             break
 
-cap.release()
-cv2.destroyAllWindows()
+    stats.finish()
+
+if dispatcher is not None:
+    dispatcher.stop()
+if not args.headless:
+    cv2.destroyAllWindows()
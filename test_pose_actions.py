@@ -0,0 +1,54 @@
+import numpy as np
+
+from landmarks import (LEFT_ELBOW, LEFT_HIP, LEFT_SHOULDER, LEFT_WRIST, NOSE, POSE_SHAPE,
+                       PoseFrame, RIGHT_ELBOW, RIGHT_HIP, RIGHT_SHOULDER, RIGHT_WRIST)
+from pose_actions import PoseActionClassifier
+
+
+def make_pose(right_wrist_y=0.7, left_wrist_y=0.7, hidden=()):
+    """A standing body, shoulders at y 0.4, with both wrists at the given heights."""
+    points = np.zeros(POSE_SHAPE, dtype=np.float32)
+    points[:, 3] = 1.0
+    points[NOSE, :2] = (0.5, 0.3)
+    points[LEFT_SHOULDER, :2] = (0.6, 0.4)
+    points[RIGHT_SHOULDER, :2] = (0.4, 0.4)
+    points[LEFT_ELBOW, :2] = (0.62, 0.55)
+    points[RIGHT_ELBOW, :2] = (0.38, 0.55)
+    points[LEFT_HIP, :2] = (0.57, 0.7)
+    points[RIGHT_HIP, :2] = (0.43, 0.7)
+    points[LEFT_WRIST, :2] = (0.62, left_wrist_y)
+    points[RIGHT_WRIST, :2] = (0.38, right_wrist_y)
+    for landmark in hidden:
+        points[landmark] = (0.0, 0.0, 0.0, 0.0)
+    return points
+
+
+def held_after(points, seconds=0.5, rate=30.0):
+    classifier = PoseActionClassifier()
+    for t in np.arange(0.0, seconds, 1.0 / rate):
+        classifier.update(PoseFrame(points, t))
+    return classifier
+
+
+def test_raise_one_hand():
+    classifier = held_after(make_pose(right_wrist_y=0.2))
+    assert classifier.is_held("Raise Right Hand")
+    assert not classifier.is_held("Raise Left Hand")
+    assert not classifier.is_held("Raise Both Hands")
+
+
+def test_raise_one_hand_with_the_other_out_of_view():
+    classifier = held_after(make_pose(right_wrist_y=0.2, hidden=[LEFT_WRIST]))
+    assert classifier.is_held("Raise Right Hand")
+    assert not classifier.is_held("Raise Both Hands")
+
+
+def test_hidden_hand_is_not_raised():
+    classifier = held_after(make_pose(hidden=[LEFT_WRIST, RIGHT_WRIST]))
+    assert not classifier.held.any()
+
+
+def test_single_frame_does_not_count():
+    classifier = PoseActionClassifier()
+    classifier.update(PoseFrame(make_pose(right_wrist_y=0.2), 0.0))
+    assert not classifier.is_held("Raise Right Hand")
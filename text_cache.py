@@ -0,0 +1,48 @@
+from collections import OrderedDict
+
+
+# ------------------ TEXT CACHE ------------------
+class TextCache:
+    """Bounded LRU cache of rendered text surfaces.
+
+    Keyed on (font, text, color), so HUD strings that do not change between
+    frames are rasterized once. The least recently used entry is dropped
+    once maxsize is reached, so counters that change every frame cannot
+    grow the cache without bound. Returned surfaces are shared: blit them,
+    never draw on them.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color):
+        key = (font, text, tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, True, color)
+        # Match the display's pixel format once so every later blit is a
+        # plain alpha copy.
+        surface = surface.convert_alpha()
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+
+
+text_cache = TextCache()
+
+
+def render_text(font, text, color):
+    """Render antialiased text through the shared cache."""
+    return text_cache.render(font, text, color)
@@ -0,0 +1,49 @@
+import time
+
+# Speeds, gravity and timers in the games were tuned for one update per
+# frame at 60 FPS, so one simulation step is 1/60 s and keeps them as is.
+SIM_RATE = 60
+
+
+# ------------------ FIXED TIMESTEP ------------------
+class FixedTimestep:
+    """Turns monotonic wall-clock time into fixed-size simulation steps.
+
+    Call steps() once per rendered frame and run the simulation that many
+    times. Time left over is carried to the next frame, and alpha is the
+    fraction of a step it amounts to, for drawing moving objects between
+    their last two simulated positions. Game speed and timers therefore
+    follow the clock however fast frames are drawn. A stall longer than
+    max_steps steps is dropped rather than caught up on, so one long
+    hitch cannot snowball into a burst of catch-up steps.
+    """
+
+    def __init__(self, rate=SIM_RATE, max_steps=8):
+        self.dt = 1.0 / rate
+        self.max_steps = max_steps
+        self.reset()
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self._last = None
+
+    def steps(self, now=None):
+        """Number of simulation steps due since the previous call."""
+        now = time.monotonic() if now is None else now
+        if self._last is not None:
+            self.accumulator += now - self._last
+        self._last = now
+        count = int(self.accumulator / self.dt)
+        if count > self.max_steps:
+            count = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= count * self.dt
+        self.alpha = self.accumulator / self.dt
+        return count
+
+
+def lerp(a, b, alpha):
+    """Linear interpolation from a to b (scalars or arrays)."""
+    return a + (b - a) * alpha
@@ -0,0 +1,417 @@
+"""Tracking daemon: one process owns the camera and MediaPipe graph and
+publishes landmarks to any number of local subscribers.
+
+Each result is sent as one record in the landmark recording format
+(recording.record_dtype), after the same 16-byte header a recording file
+starts with, over a Unix socket (or TCP on platforms without one). The
+games subscribe with --connect ADDRESS. A WebSocket bridge sends the same
+results to browser clients as JSON shaped like MediaPipe JS results
+({"t", "poseLandmarks", "multiHandLandmarks"}); open
+index.html?tracker=ws://localhost:8765 to play dance-game.js from it.
+
+Delivery is newest-wins: every subscriber has its own sender thread and a
+single-slot mailbox, so a subscriber that falls behind skips stale results
+instead of queuing them, and never slows down the others.
+
+    python tracking_daemon.py --kind hands pose
+    python tracking_daemon.py --replay session.lmk --loop
+    python game.py --connect /tmp/hand-tracking.sock
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import signal
+import socket
+import stat
+import struct
+import sys
+import tempfile
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+
+from capture import CameraTracker, LatestValue, build_graph
+from recording import HEADER, MAGIC, VERSION, fill_record, record_dtype, record_results
+
+if hasattr(socket, "AF_UNIX"):
+    DEFAULT_ADDRESS = os.path.join(tempfile.gettempdir(), "hand-tracking.sock")
+else:
+    DEFAULT_ADDRESS = "127.0.0.1:8764"
+DEFAULT_WEBSOCKET_PORT = 8765
+
+WEBSOCKET_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+# ------------------ ADDRESSES ------------------
+def _tcp_address(address):
+    """(host, port) for "host:port" or ":port", or None for a socket path."""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and os.sep not in host:
+        return host or "127.0.0.1", int(port)
+    return None
+
+
+def open_listener(address):
+    """Listening socket for a Unix socket path or a "host:port" address."""
+    tcp = _tcp_address(address)
+    if tcp is None:
+        # A socket file left behind by a daemon that did not exit cleanly.
+        if os.path.exists(address) and stat.S_ISSOCK(os.stat(address).st_mode):
+            os.unlink(address)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        address = tcp
+    listener.bind(address)
+    listener.listen()
+    return listener
+
+
+def connect(address):
+    """Socket connected to a daemon listening on address."""
+    tcp = _tcp_address(address)
+    if tcp is None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(address)
+    else:
+        sock = socket.create_connection(tcp)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+# ------------------ PROTOCOLS ------------------
+class LandmarkProtocol:
+    """Native subscribers: recording header, then one raw record per result."""
+
+    def __init__(self, max_hands):
+        self.header = HEADER.pack(MAGIC, VERSION, max_hands)
+
+    def greet(self, sock):
+        sock.sendall(self.header)
+
+    def encode(self, rec):
+        return rec.tobytes()
+
+
+class WebSocketProtocol:
+    """Browser subscribers: RFC 6455 handshake, then one JSON text message
+    per result. Messages from the browser are never read; a closed page
+    shows up as a failed send.
+    """
+
+    def greet(self, sock):
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = sock.recv(4096)
+            if not chunk or len(request) > 65536:
+                raise ConnectionError("incomplete WebSocket handshake")
+            request += chunk
+        key = None
+        for line in request.split(b"\r\n")[1:]:
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"sec-websocket-key":
+                key = value.strip()
+        if key is None:
+            sock.sendall(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            raise ConnectionError("not a WebSocket request")
+        accept = base64.b64encode(hashlib.sha1(key + WEBSOCKET_GUID).digest())
+        sock.sendall(b"HTTP/1.1 101 Switching Protocols\r\n"
+                     b"Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                     b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+
+    def encode(self, rec):
+        hands = rec["hands"][:int(rec["hand_count"])]
+        message = {
+            "t": float(rec["t"]),
+            "multiHandLandmarks": [[dict(zip("xyz", point)) for point in hand.tolist()]
+                                   for hand in hands],
+            "poseLandmarks": None,
+        }
+        if rec["pose_present"]:
+            message["poseLandmarks"] = [dict(zip(("x", "y", "z", "visibility"), point))
+                                        for point in rec["pose"].tolist()]
+        payload = json.dumps(message, separators=(",", ":")).encode()
+        if len(payload) < 126:
+            head = struct.pack("!BB", 0x81, len(payload))
+        elif len(payload) < 65536:
+            head = struct.pack("!BBH", 0x81, 126, len(payload))
+        else:
+            head = struct.pack("!BBQ", 0x81, 127, len(payload))
+        return head + payload
+
+
+# ------------------ PUBLISHING ------------------
+class Subscriber(threading.Thread):
+    """Sends the newest payload to one connected client.
+
+    offer() never blocks: it replaces whatever has not been sent yet. The
+    thread ends when the client goes away.
+    """
+
+    def __init__(self, sock, protocol, on_close):
+        super().__init__(daemon=True)
+        self.sock = sock
+        self.protocol = protocol
+        self.on_close = on_close
+        self._slot = LatestValue()
+        self._wake = threading.Event()
+        self._running = True
+
+    def offer(self, payload):
+        self._slot.publish(payload)
+        self._wake.set()
+
+    def run(self):
+        sent = None
+        try:
+            self.sock.settimeout(5.0)
+            self.protocol.greet(self.sock)
+            self.sock.settimeout(None)
+            while self._running:
+                self._wake.wait()
+                self._wake.clear()
+                payload = self._slot.get()
+                if payload is not None and payload is not sent:
+                    self.sock.sendall(payload)
+                    sent = payload
+        except OSError:
+            pass
+        finally:
+            self.sock.close()
+            self.on_close(self)
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+
+
+class SubscriberServer(threading.Thread):
+    """Accepts subscribers on one listening socket and fans results out."""
+
+    def __init__(self, listener, protocol, label):
+        super().__init__(daemon=True)
+        self.listener = listener
+        self.protocol = protocol
+        self.label = label
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def run(self):
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except OSError:
+                break  # listener closed
+            subscriber = Subscriber(sock, self.protocol, self._remove)
+            with self._lock:
+                self._subscribers.add(subscriber)
+                count = len(self._subscribers)
+            print(f"{self.label}: subscriber connected ({count})", file=sys.stderr)
+            subscriber.start()
+
+    def _remove(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+            count = len(self._subscribers)
+        print(f"{self.label}: subscriber left ({count})", file=sys.stderr)
+
+    def publish(self, rec):
+        """Offer one result to every subscriber; encoded once, if anyone listens."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if subscribers:
+            payload = self.protocol.encode(rec)
+            for subscriber in subscribers:
+                subscriber.offer(payload)
+
+    def close(self):
+        self.listener.close()
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.stop()
+
+
+# ------------------ SUBSCRIBER TRACKER ------------------
+def _recv_exact(sock, view):
+    """Fill view from sock; False if the connection closed first."""
+    while len(view):
+        count = sock.recv_into(view)
+        if not count:
+            return False
+        view = view[count:]
+    return True
+
+
+class DaemonTracker:
+    """Takes landmarks from a running tracking daemon instead of a camera.
+
+    Has the same read()/close() interface as capture.CameraTracker. A
+    background thread keeps only the newest record, so read() returns the
+    latest result and skips any that arrived while the caller was busy.
+    frame_time is the daemon's capture time; time.monotonic() is one clock
+    for every process on the machine, so it compares with local times.
+    Frames are blank, as with a replay.
+    """
+
+    finished = False
+
+    def __init__(self, address, frame_shape=(480, 640, 3)):
+        self.sock = connect(address)
+        header = bytearray(HEADER.size)
+        if not _recv_exact(self.sock, memoryview(header)):
+            raise ConnectionError("tracking daemon closed the connection")
+        magic, version, max_hands = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("%s is not a tracking daemon" % address)
+        self.dtype = record_dtype(max_hands)
+        self.frame_shape = frame_shape
+        self.frame_time = 0.0
+        self._slot = LatestValue()
+        self._new = threading.Event()
+        self._closed = False
+        self._seq = 0
+        self._reader = threading.Thread(target=self._receive, daemon=True)
+        self._reader.start()
+
+    def _receive(self):
+        buffer = bytearray(self.dtype.itemsize)
+        seq = 0
+        try:
+            while _recv_exact(self.sock, memoryview(buffer)):
+                seq += 1
+                self._slot.publish((seq, np.frombuffer(bytes(buffer), dtype=self.dtype)[0]))
+                self._new.set()
+        except OSError:
+            pass
+        self._closed = True
+        self._new.set()
+
+    def read(self):
+        """Return (frame, results) for the newest result not yet read, or None."""
+        if not self._new.wait(0.1):
+            return None
+        self._new.clear()
+        seq, rec = self._slot.get() or (0, None)
+        if seq == self._seq:
+            if self._closed:
+                self.finished = True
+            return None
+        self._seq = seq
+        self.frame_time = float(rec["t"])
+        return np.zeros(self.frame_shape, dtype=np.uint8), record_results(rec)
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+# ------------------ DAEMON ------------------
+class CombinedGraph:
+    """Runs several MediaPipe graphs on each frame and merges their results."""
+
+    def __init__(self, graphs):
+        self.graphs = graphs
+
+    def process(self, rgb):
+        merged = SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None,
+                                 pose_landmarks=None)
+        for graph in self.graphs:
+            results = graph.process(rgb)
+            for name in vars(merged):
+                value = getattr(results, name, None)
+                if value is not None:
+                    setattr(merged, name, value)
+        return merged
+
+    def close(self):
+        for graph in self.graphs:
+            graph.close()
+
+
+def open_daemon_tracker(args):
+    """Camera (with the requested graphs) or replay tracker for the daemon."""
+    if args.replay:
+        from recording import ReplayTracker
+        tracker = ReplayTracker(args.replay, realtime=not args.replay_fast, loop=args.loop)
+    else:
+        graphs = [build_graph(kind, args.max_hands, roi=args.roi) for kind in args.kind]
+        graph = graphs[0] if len(graphs) == 1 else CombinedGraph(graphs)
+        tracker = CameraTracker(graph, args.source, inference_width=args.inference_width)
+    if args.record:
+        from recording import LandmarkRecorder, RecordingTracker
+        tracker = RecordingTracker(tracker, LandmarkRecorder(args.record, args.max_hands))
+    return tracker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish webcam landmarks to local subscribers")
+    parser.add_argument("--kind", nargs="+", choices=["hands", "pose"], default=["hands"],
+                        help="graphs to run on every frame (default hands)")
+    parser.add_argument("--max-hands", type=int, default=2, help="hands to track (default 2)")
+    parser.add_argument("--source", default="camera:0", metavar="URI",
+                        help="frame source URI, as for the games (default camera:0)")
+    parser.add_argument("--inference-width", type=int, default=0, metavar="PX",
+                        help="downscale frames to this width before inference")
+    parser.add_argument("--roi", action="store_true",
+                        help="hand tracking with --max-hands 1: run inference on a crop "
+                             "around the last hand")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="publish a landmark recording instead of using the camera")
+    parser.add_argument("--replay-fast", action="store_true",
+                        help="replay as fast as possible instead of in real time")
+    parser.add_argument("--loop", action="store_true", help="restart the replay at its end")
+    parser.add_argument("--record", metavar="PATH", help="also record every result to PATH")
+    parser.add_argument("--listen", default=DEFAULT_ADDRESS, metavar="ADDRESS",
+                        help="Unix socket path or host:port for native subscribers "
+                             "(default %s)" % DEFAULT_ADDRESS)
+    parser.add_argument("--websocket", type=int, default=DEFAULT_WEBSOCKET_PORT, metavar="PORT",
+                        help="localhost port for browser subscribers, 0 to disable "
+                             "(default %d)" % DEFAULT_WEBSOCKET_PORT)
+    args = parser.parse_args()
+    if args.roi and (args.max_hands != 1 or "hands" not in args.kind):
+        parser.error("--roi needs --kind hands and --max-hands 1")
+
+    servers = [SubscriberServer(open_listener(args.listen), LandmarkProtocol(args.max_hands),
+                                args.listen)]
+    if args.websocket:
+        address = "127.0.0.1:%d" % args.websocket
+        servers.append(SubscriberServer(open_listener(address), WebSocketProtocol(),
+                                        "ws://localhost:%d" % args.websocket))
+    for server in servers:
+        server.start()
+        print(f"publishing on {server.label}", file=sys.stderr)
+
+    tracker = open_daemon_tracker(args)
+    rec = np.zeros((), dtype=record_dtype(args.max_hands))
+    # Clean up (and remove the socket file) when stopped with kill, too.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        while True:
+            item = tracker.read()
+            if item is None:
+                if tracker.finished:
+                    break
+                continue
+            fill_record(rec, tracker.frame_time, item[1])
+            for server in servers:
+                server.publish(rec)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for server in servers:
+            server.close()
+        tracker.close()
+        if _tcp_address(args.listen) is None and os.path.exists(args.listen):
+            os.unlink(args.listen)
+
+
+if __name__ == "__main__":
+    main()